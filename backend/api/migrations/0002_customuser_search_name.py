@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:42
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        # Trigram GIN index: serves both "starts with" and "a word starts with" LIKE patterns
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute(
+            'CREATE INDEX api_customuser_search_name_idx ON api_customuser USING gin (search_name gin_trgm_ops)'
+        )
+    elif vendor == 'sqlite':
+        # SQLite's LIKE is case-insensitive, so only a NOCASE index can serve prefix matches
+        schema_editor.execute(
+            'CREATE INDEX api_customuser_search_name_idx ON api_customuser (search_name COLLATE NOCASE)'
+        )
+    else:
+        schema_editor.execute('CREATE INDEX api_customuser_search_name_idx ON api_customuser (search_name)')
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute('DROP INDEX api_customuser_search_name_idx ON api_customuser')
+    else:
+        schema_editor.execute('DROP INDEX api_customuser_search_name_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='search_name',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.Lower(django.db.models.functions.text.Concat('first_name', models.Value(' '), 'last_name', models.Value(' '), 'username')), output_field=models.TextField()),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -4,7 +4,8 @@ from django.db import models
 from datetime import timedelta
 from django.utils import timezone
 from enum import Enum
-from django.db.models import Q
+from django.db.models import Q, Value
+from django.db.models.functions import Concat, Lower
 
 # Define user roles
 class UserRole(Enum):
@@ -19,6 +20,12 @@ class CustomUser(AbstractUser):
     email = models.EmailField(blank=True, null=True) 
     role = models.CharField(max_length=10, choices=[(role.value, role.name) for role in UserRole],) # Add user role field
     branch_name = models.CharField(max_length=50, blank=True, null=True) # Add school branch name field
+    # Lowercased "first last username", kept up to date by the database, for account search
+    search_name = models.GeneratedField(
+        expression=Lower(Concat('first_name', Value(' '), 'last_name', Value(' '), 'username')),
+        output_field=models.TextField(),
+        db_persist=True,
+    )
 
     def set_password(self, raw_password):
         self.password = make_password(raw_password)
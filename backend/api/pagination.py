@@ -0,0 +1,108 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    """Encode the ordering values of the last row on a page into an opaque token"""
+    payload = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, length):
+    """Decode a token produced by encode_cursor, checking it carries `length` values"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor("Invalid cursor")
+    if not isinstance(values, list) or len(values) != length:
+        raise InvalidCursor("Invalid cursor")
+    return values
+
+
+def keyset_filter(ordering, values):
+    """
+    Build the Q that selects rows strictly after `values` for the given ordering,
+    e.g. ('-created_at', '-id') -> created_at < v0 OR (created_at = v0 AND id < v1).
+    """
+    condition = Q()
+    for index, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        clause = {ordering[i].lstrip('-'): values[i] for i in range(index)}
+        clause[f'{name}__{lookup}'] = values[index]
+        condition |= Q(**clause)
+    return condition
+
+
+def _ordering_field(queryset, name):
+    if name in queryset.query.annotations:
+        return queryset.query.annotations[name].output_field
+    return queryset.model._meta.get_field(name)
+
+
+def cursor_filter(queryset, ordering, token):
+    """
+    Restrict a queryset to the rows after a cursor for the given ordering.
+
+    Cursor values are cleaned by the fields they are compared with, so a token
+    that decodes but holds the wrong types raises InvalidCursor rather than a
+    database or validation error.
+    """
+    values = decode_cursor(token, len(ordering))
+    try:
+        values = [
+            _ordering_field(queryset, field.lstrip('-')).clean(value, None)
+            for field, value in zip(ordering, values)
+        ]
+    except (ValidationError, TypeError, ValueError):
+        raise InvalidCursor("Invalid cursor")
+    return queryset.filter(keyset_filter(ordering, values))
+
+
+def get_page_size(request, default=DEFAULT_PAGE_SIZE):
+    try:
+        page_size = int(request.query_params.get('page_size', default))
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(page_size, MAX_PAGE_SIZE))
+
+
+def paginate_keyset(queryset, ordering, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Order a queryset by a unique key and return (rows, next_cursor) for one page.
+
+    The cursor pins the position by value rather than offset, so each page is an
+    index range scan regardless of how deep the client has paged.
+    """
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        queryset = cursor_filter(queryset, ordering, cursor)
+
+    rows = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor([_ordering_value(rows[-1], field) for field in ordering])
+    return rows, next_cursor
+
+
+def _ordering_value(row, field):
+    name = field.lstrip('-')
+    if isinstance(row, dict):
+        return row[name]
+    value = row
+    for part in name.split('__'):
+        value = getattr(value, part)
+    return value
@@ -1,3 +1,44 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from api.models import CustomUser
+from api.pagination import encode_cursor
+from user_admin.models.account_models import StudentInfo, TeacherInfo, UserInfo
+
+
+class CursorValidationTests(TestCase):
+    """A cursor that decodes but holds the wrong types is a bad request on every keyset endpoint"""
+    bad_cursor = encode_cursor(['notadate', 1])
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create(username='admin', role='admin', is_staff=True)
+        cls.teacher = CustomUser.objects.create(username='teacher', role='teacher')
+        TeacherInfo.objects.create(teacher_info=UserInfo.objects.create(user=cls.teacher))
+        cls.student = CustomUser.objects.create(username='student', role='student')
+        StudentInfo.objects.create(student_info=UserInfo.objects.create(user=cls.student))
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def get(self, user, url, cursor):
+        self.client.force_authenticate(user)
+        return self.client.get(url, {'cursor': cursor})
+
+    def test_quiz_statistics(self):
+        response = self.get(self.teacher, '/user-teacher/analytics/quiz-statistics/', self.bad_cursor)
+        self.assertEqual(response.status_code, 400)
+
+    def test_student_quizzes(self):
+        response = self.get(self.student, '/api/user-student/quizzes/', self.bad_cursor)
+        self.assertEqual(response.status_code, 400)
+
+    def test_account_list(self):
+        response = self.get(self.admin, '/user-admin/teacher-list/', self.bad_cursor)
+        self.assertEqual(response.status_code, 400)
+        response = self.get(self.admin, '/user-admin/teacher-list/', encode_cursor(['2026-01-01T00:00:00+00:00', 'x']))
+        self.assertEqual(response.status_code, 400)
+
+    def test_valid_cursor_still_pages(self):
+        response = self.get(self.admin, '/user-admin/teacher-list/', encode_cursor(['2026-01-01T00:00:00+00:00', 1]))
+        self.assertEqual(response.status_code, 200)
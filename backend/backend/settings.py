@@ -215,6 +215,28 @@ MEDIA_URL = '/media/'
 PROFILE_IMAGES_STORAGE = 'django.core.files.storage.FileSystemStorage'
 PROFILE_IMAGES_LOCATION = os.path.join(MEDIA_ROOT, 'profile_images')
 
+# Shared by every worker process: cached answer keys, quiz papers, analytics and the
+# question bank are invalidated by bumping version counters here, so a per-process
+# cache would leave other workers serving stale data. Redis when REDIS_URL is set,
+# otherwise a database table (created by the api migrations).
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache',
+        }
+    }
+
+# Generated usernames look like stu-24-000123; the suffix is zero-padded to this many digits
+USERNAME_SUFFIX_DIGITS = 6
+
 # File Storage Settings
 # if not DEBUG:
 #     DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import AssessmentCategory, Question, StudentAssessment, AssessmentResponse
+from .models import (
+    AssessmentCategory, Question, StudentAssessment, AssessmentResponse, StudentCategoryScore,
+    ScreeningSnapshot, StudentScreeningResult
+)
 
 @admin.register(AssessmentCategory)
 class AssessmentCategoryAdmin(admin.ModelAdmin):
@@ -22,3 +25,24 @@ class StudentAssessmentAdmin(admin.ModelAdmin):
 class AssessmentResponseAdmin(admin.ModelAdmin):
     list_display = ('assessment', 'question', 'response', 'created_at')
     list_filter = ('response', 'assessment__category')
+
+@admin.register(StudentCategoryScore)
+class StudentCategoryScoreAdmin(admin.ModelAdmin):
+    list_display = ('student', 'question_category', 'score_sum', 'response_count', 'updated_at')
+    list_filter = ('question_category',)
+    search_fields = ('student__student_info__user__first_name', 'student__student_info__user__last_name')
+    readonly_fields = ('student', 'question_category', 'score_sum', 'response_count', 'updated_at')
+
+@admin.register(ScreeningSnapshot)
+class ScreeningSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('id', 'branch_name', 'grade_level', 'student_count', 'flagged_count', 'created_by', 'created_at')
+    list_filter = ('branch_name', 'grade_level', 'created_at')
+    readonly_fields = ('branch_name', 'grade_level', 'created_by', 'created_at', 'student_count', 'flagged_count')
+
+@admin.register(StudentScreeningResult)
+class StudentScreeningResultAdmin(admin.ModelAdmin):
+    list_display = ('snapshot', 'student', 'total_assessments', 'dominant_category', 'flagged')
+    list_filter = ('flagged', 'snapshot')
+    search_fields = ('student__student_info__user__first_name', 'student__student_info__user__last_name')
+    readonly_fields = ('snapshot', 'student', 'total_assessments', 'category_percentages',
+                       'dominant_category', 'diagnosis_results', 'flagged')
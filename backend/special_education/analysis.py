@@ -0,0 +1,153 @@
+import numpy as np
+
+from .scoring import DIAGNOSIS_CRITERIA, response_score
+
+# Scores run 0-3; this scales an average score to a percentage
+PERCENT_PER_POINT = 100 / 3
+
+
+def score_array(responses):
+    """Map response values to scores, looking each distinct value up once"""
+    values, inverse = np.unique(np.asarray(responses, dtype=object).astype(str), return_inverse=True)
+    lookup = np.array([response_score(value) for value in values], dtype=float)
+    return lookup[inverse.reshape(-1)]
+
+
+def group_means(group_index, scores, group_count):
+    """Return (means, counts) of scores per group; means are NaN for empty groups"""
+    sums = np.bincount(group_index, weights=scores, minlength=group_count)
+    counts = np.bincount(group_index, minlength=group_count)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+    return means, counts
+
+
+def diagnosis_results(category_percentages):
+    """Evaluate the diagnosis thresholds against the categories a student has scores for"""
+    results = {}
+    for diagnosis, criteria in DIAGNOSIS_CRITERIA.items():
+        relevant_scores = [
+            category_percentages[cat]
+            for cat in criteria['categories']
+            if cat in category_percentages
+        ]
+        if relevant_scores:
+            avg_score = sum(relevant_scores) / len(relevant_scores)
+            probability = (avg_score / criteria['threshold']) * 100
+            results[diagnosis] = {
+                'probability': min(probability, 100),
+                'relevant_categories': relevant_scores,
+                'threshold_met': avg_score >= criteria['threshold']
+            }
+    return results
+
+
+def analyze_assessments(assessments, responses):
+    """
+    Compute category percentages, the per-assessment timeline and progress trends.
+
+    `assessments` is a list of dicts (id, date, assessment_number) in date order and
+    `responses` a list of (assessment_id, question_category, response) tuples in the
+    same order. Everything is grouped with array operations instead of per-row loops.
+    """
+    position = {assessment['id']: index for index, assessment in enumerate(assessments)}
+    category_percentages = {}
+    timeline_scores = [{} for _ in assessments]
+    progress_trend = {}
+
+    if responses:
+        assessment_ids, categories, values = zip(*responses)
+        assessment_index = np.array([position[assessment_id] for assessment_id in assessment_ids])
+        category_names, category_index = np.unique(np.array(categories, dtype=str), return_inverse=True)
+        category_index = category_index.reshape(-1)
+        category_count = len(category_names)
+        scores = score_array(values)
+
+        # Overall mean per category
+        means, counts = group_means(category_index, scores, category_count)
+        category_percentages = {
+            str(name): float(mean * PERCENT_PER_POINT)
+            for name, mean, count in zip(category_names, means, counts) if count
+        }
+
+        # Mean per (assessment, category) cell
+        cell_means, cell_counts = group_means(
+            assessment_index * category_count + category_index, scores, len(assessments) * category_count
+        )
+        cell_means = cell_means.reshape(len(assessments), category_count) * PERCENT_PER_POINT
+        cell_counts = cell_counts.reshape(len(assessments), category_count)
+        for row, (row_means, row_counts) in enumerate(zip(cell_means, cell_counts)):
+            timeline_scores[row] = {
+                str(category_names[column]): float(row_means[column])
+                for column in np.flatnonzero(row_counts)
+            }
+
+        # Every response's score per category, keeping response order
+        assessment_numbers = np.array([assessment['assessment_number'] for assessment in assessments])
+        order = np.argsort(category_index, kind='stable')
+        boundaries = np.cumsum(counts)[:-1]
+        for name, selection in zip(category_names, np.split(order, boundaries)):
+            if len(selection):
+                progress_trend[str(name)] = [
+                    {'assessment_number': number, 'score': score}
+                    for number, score in zip(
+                        assessment_numbers[assessment_index[selection]].tolist(),
+                        (scores[selection] * PERCENT_PER_POINT).tolist()
+                    )
+                ]
+
+    if category_percentages:
+        dominant_category = max(category_percentages.items(), key=lambda x: x[1])[0]
+    else:
+        dominant_category = None
+
+    return {
+        'category_percentages': category_percentages,
+        'dominant_category': dominant_category,
+        'assessment_timeline': [
+            {
+                'id': assessment['id'],
+                'date': assessment['date'],
+                'assessment_number': assessment['assessment_number'],
+                'scores': averages
+            }
+            for assessment, averages in zip(assessments, timeline_scores)
+        ],
+        'progress_trend': progress_trend,
+        'diagnosis_results': diagnosis_results(category_percentages),
+    }
+
+
+def category_matrix(owner_ids, categories, score_sums, counts):
+    """
+    Lay out per owner (e.g. student) and question category score totals as percentages.
+
+    Returns (owners, category_names, percentages) where percentages is an
+    owners x categories array that is NaN where an owner has no responses.
+    """
+    owners, owner_index = np.unique(np.asarray(owner_ids), return_inverse=True)
+    category_names, category_index = np.unique(np.array(categories, dtype=str), return_inverse=True)
+    percentages = np.full((len(owners), len(category_names)), np.nan)
+    percentages[owner_index.reshape(-1), category_index.reshape(-1)] = (
+        np.asarray(score_sums, dtype=float) / np.asarray(counts) * PERCENT_PER_POINT
+    )
+    return owners, category_names, percentages
+
+
+def diagnosis_matrix(category_names, percentages):
+    """
+    Evaluate every diagnosis for every row of a category_matrix at once.
+
+    Returns {diagnosis: (average, columns)}: the per-row mean over the criteria
+    categories the row has scores for (NaN when none), and the columns used.
+    """
+    column = {str(name): index for index, name in enumerate(category_names)}
+    results = {}
+    for diagnosis, criteria in DIAGNOSIS_CRITERIA.items():
+        columns = [column[cat] for cat in criteria['categories'] if cat in column]
+        selected = percentages[:, columns]
+        present = ~np.isnan(selected)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            average = np.where(present, selected, 0).sum(axis=1) / present.sum(axis=1)
+        results[diagnosis] = (average, columns)
+    return results
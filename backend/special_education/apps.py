@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class SpecialEducationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'special_education'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from special_education.models import StudentAssessment
+from special_education.scoring import backfill_category_scores
+
+
+class Command(BaseCommand):
+    help = 'Store category score vectors for completed assessments that do not have one yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Recompute every completed assessment, not only missing ones')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Assessments updated per query')
+
+    def handle(self, *args, **options):
+        assessments = StudentAssessment.objects.all()
+        if not options['all']:
+            assessments = assessments.filter(category_scores__isnull=True)
+
+        stored = backfill_category_scores(assessments, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Successfully stored category scores for {stored} assessments'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from special_education.models import ScreeningSnapshot
+from special_education.screening import process_pending_screenings
+
+
+class Command(BaseCommand):
+    help = 'Run pending cohort screenings, e.g. ones left behind when the server restarted'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requeue-running',
+            action='store_true',
+            help='Reset screenings stuck in "running" (their worker died) back to pending first',
+        )
+
+    def handle(self, *args, **options):
+        if options['requeue_running']:
+            requeued = ScreeningSnapshot.objects.filter(status='running').update(status='pending')
+            self.stdout.write(f'Requeued {requeued} running screenings')
+
+        pending = ScreeningSnapshot.objects.filter(status='pending').count()
+        process_pending_screenings()
+        self.stdout.write(self.style.SUCCESS(f'Processed {pending} screenings'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from special_education.scoring import rebuild_student_category_scores
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-student category score totals from completed assessment responses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--student', type=int, action='append', help='Only rebuild this StudentInfo id (repeatable)')
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_student_category_scores(options['student'])
+        self.stdout.write(self.style.SUCCESS(f'Successfully rebuilt {rebuilt} category score rows'))
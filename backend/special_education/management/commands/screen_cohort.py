@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from special_education.screening import screen_cohort
+
+
+class Command(BaseCommand):
+    help = 'Compute category percentages and diagnosis flags for every student of a branch and/or grade level'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--branch', help='Only students of this branch')
+        parser.add_argument('--grade-level', help='Only students of this grade level')
+
+    def handle(self, *args, **options):
+        snapshot = screen_cohort(branch_name=options['branch'], grade_level=options['grade_level'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Screening snapshot {snapshot.id}: {snapshot.flagged_count} of {snapshot.student_count} students flagged'
+        ))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('special_education', '0009_question_question_text_tl'),
+        ('user_admin', '0013_remove_parentinfo_has_special_needs_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentCategoryScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_category', models.CharField(choices=[('Attention', 'Attention'), ('Hyperactivity', 'Hyperactivity'), ('Impulsivity', 'Impulsivity'), ('Social Communication', 'Social Communication'), ('Behavior Patterns', 'Behavior Patterns'), ('Social Understanding', 'Social Understanding'), ('Emotional Understanding', 'Emotional Understanding'), ('Academic Performance', 'Academic Performance'), ('Cognitive Skills', 'Cognitive Skills'), ('Language Development', 'Language Development'), ('Speech Production', 'Speech Production'), ('Social Skills', 'Social Skills')], max_length=50)),
+                ('score_sum', models.IntegerField(default=0)),
+                ('response_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_scores', to='user_admin.studentinfo')),
+            ],
+            options={
+                'unique_together': {('student', 'question_category')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('special_education', '0010_studentcategoryscore'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentassessment',
+            name='category_scores',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
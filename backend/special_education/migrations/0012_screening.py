@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('special_education', '0011_studentassessment_category_scores'),
+        ('user_admin', '0013_remove_parentinfo_has_special_needs_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScreeningSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('branch_name', models.CharField(blank=True, max_length=50)),
+                ('grade_level', models.CharField(blank=True, max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('student_count', models.PositiveIntegerField(default=0)),
+                ('flagged_count', models.PositiveIntegerField(default=0)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentScreeningResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_assessments', models.PositiveIntegerField(default=0)),
+                ('category_percentages', models.JSONField(default=dict)),
+                ('dominant_category', models.CharField(blank=True, max_length=50, null=True)),
+                ('diagnosis_results', models.JSONField(default=dict)),
+                ('flagged', models.BooleanField(default=False)),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='special_education.screeningsnapshot')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='screening_results', to='user_admin.studentinfo')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['snapshot', 'flagged'], name='special_edu_snapsho_7e3799_idx')],
+                'unique_together': {('snapshot', 'student')},
+            },
+        ),
+    ]
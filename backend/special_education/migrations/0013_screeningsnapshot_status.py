@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('special_education', '0012_screening'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='screeningsnapshot',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='screeningsnapshot',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='screeningsnapshot',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        # Snapshots taken before screenings ran in the background are already complete
+        migrations.AddField(
+            model_name='screeningsnapshot',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='completed', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='screeningsnapshot',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='screeningsnapshot',
+            index=models.Index(fields=['status', 'created_at'], name='special_edu_status_bb61b5_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+from django.db import migrations
+from django.db.models import Case, Count, IntegerField, Sum, Value, When
+
+# Frozen copy of scoring.RESPONSE_SCORES, so later changes don't alter this migration
+RESPONSE_SCORES = {
+    'never': 0,
+    'sometimes': 1,
+    'often': 2,
+    'very_often': 3
+}
+CHUNK_SIZE = 500
+
+
+def backfill_category_scores(apps, schema_editor):
+    """Store score vectors for assessments completed before category_scores existed"""
+    StudentAssessment = apps.get_model('special_education', 'StudentAssessment')
+    AssessmentResponse = apps.get_model('special_education', 'AssessmentResponse')
+    score = Case(
+        *[When(response=response, then=Value(points)) for response, points in RESPONSE_SCORES.items()],
+        default=Value(0),
+        output_field=IntegerField()
+    )
+
+    ids = list(StudentAssessment.objects
+        .filter(completed=True, category_scores__isnull=True)
+        .values_list('id', flat=True))
+    for start in range(0, len(ids), CHUNK_SIZE):
+        chunk_ids = ids[start:start + CHUNK_SIZE]
+        scores = {assessment_id: {} for assessment_id in chunk_ids}
+        rows = (AssessmentResponse.objects
+            .filter(assessment_id__in=chunk_ids)
+            .values('assessment_id', 'question__question_category')
+            .annotate(score_sum=Sum(score), response_count=Count('id'))
+            .order_by())
+        for row in rows:
+            # 3 is the max score per question
+            scores[row['assessment_id']][row['question__question_category']] = round(
+                row['score_sum'] / (row['response_count'] * 3) * 100, 1
+            )
+
+        StudentAssessment.objects.bulk_update(
+            [StudentAssessment(id=assessment_id, category_scores=category_scores)
+             for assessment_id, category_scores in scores.items()],
+            ['category_scores'],
+            batch_size=CHUNK_SIZE
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('special_education', '0013_screeningsnapshot_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_category_scores, migrations.RunPython.noop),
+    ]
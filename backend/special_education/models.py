@@ -85,6 +85,8 @@ class StudentAssessment(models.Model):
     completed = models.BooleanField(default=False)
     results_available_date = models.DateTimeField(null=True, blank=True)
     assessment_number = models.PositiveIntegerField(default=1)
+    # {question_category: percentage}, stored when the assessment is completed
+    category_scores = models.JSONField(null=True, blank=True)
 
     class Meta:
         ordering = ['-date']
@@ -117,43 +119,12 @@ class StudentAssessment(models.Model):
         if not self.completed:
             return None
 
-        responses = AssessmentResponse.objects.filter(assessment=self)
-        if not responses:
-            return None
-
-        # Define score mapping
-        score_mapping = {
-            'never': 0,
-            'sometimes': 1,
-            'often': 2,
-            'very_often': 3
-        }
-
-        # Initialize category scores
-        category_scores = {}
-        category_counts = {}
-
-        # Calculate scores for each category
-        for response in responses:
-            category = response.question.question_category
-            score = score_mapping.get(response.response, 0)
-            
-            if category not in category_scores:
-                category_scores[category] = 0
-                category_counts[category] = 0
-            
-            category_scores[category] += score
-            category_counts[category] += 1
-
-        # Calculate percentages
-        results = {}
-        for category in category_scores:
-            max_possible = category_counts[category] * 3  # 3 is max score per question
-            if max_possible > 0:
-                percentage = (category_scores[category] / max_possible) * 100
-                results[category] = round(percentage, 1)
+        if self.category_scores is None:
+            # Not backfilled yet (see backfill_assessment_scores); reads never write
+            from .scoring import compute_category_scores
+            return compute_category_scores(self) or None
 
-        return results
+        return self.category_scores or None
 
     @classmethod
     def get_completion_analysis(cls, student_id):
@@ -239,3 +210,69 @@ class AssessmentResponse(models.Model):
 
     def __str__(self):
         return f"{self.assessment} - {self.question}: {self.response}"
+
+class StudentCategoryScore(models.Model):
+    """Running response score totals per student and question category over completed assessments"""
+    student = models.ForeignKey(StudentInfo, on_delete=models.CASCADE, related_name='category_scores')
+    question_category = models.CharField(max_length=50, choices=Question.CATEGORY_CHOICES)
+    score_sum = models.IntegerField(default=0)
+    response_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['student', 'question_category']
+
+    def __str__(self):
+        return f"{self.student} - {self.question_category}: {self.score_sum}/{self.response_count}"
+
+    @property
+    def percentage(self):
+        # Average response score normalized to 0-100 (3 is the max score per question)
+        return (self.score_sum / self.response_count) * (100/3) if self.response_count > 0 else 0
+
+class ScreeningSnapshot(models.Model):
+    """One cohort-wide run of the diagnosis screening, for a branch and/or grade level"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    branch_name = models.CharField(max_length=50, blank=True)
+    grade_level = models.CharField(max_length=20, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    student_count = models.PositiveIntegerField(default=0)
+    flagged_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        cohort = ' / '.join(filter(None, [self.branch_name, self.grade_level])) or 'All students'
+        return f"Screening of {cohort} on {self.created_at:%Y-%m-%d %H:%M}"
+
+class StudentScreeningResult(models.Model):
+    snapshot = models.ForeignKey(ScreeningSnapshot, on_delete=models.CASCADE, related_name='results')
+    student = models.ForeignKey(StudentInfo, on_delete=models.CASCADE, related_name='screening_results')
+    total_assessments = models.PositiveIntegerField(default=0)
+    category_percentages = models.JSONField(default=dict)
+    dominant_category = models.CharField(max_length=50, null=True, blank=True)
+    diagnosis_results = models.JSONField(default=dict)
+    flagged = models.BooleanField(default=False)  # Any diagnosis threshold met
+
+    class Meta:
+        unique_together = ['snapshot', 'student']
+        indexes = [
+            models.Index(fields=['snapshot', 'flagged']),
+        ]
+
+    def __str__(self):
+        return f"{self.snapshot} - {self.student}"
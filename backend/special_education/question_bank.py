@@ -0,0 +1,130 @@
+import random
+import threading
+import time
+
+from django.core.cache import cache
+
+from .models import AssessmentCategory, Question
+from .serializers import CategorySerializer, QuestionSerializer
+
+LANGUAGES = ('en', 'tl')
+VERSION_CACHE_KEY = 'question_bank:version'
+# A process serves its bank this many seconds before reading the shared version
+# again, so most requests make no cache round trip; other processes pick up an
+# invalidation within this window.
+VERSION_CHECK_INTERVAL = 5
+# A process rebuilds its bank after this many seconds even when the version looks
+# current, so a missed invalidation can't live forever.
+LOCAL_BANK_TTL = 300
+
+_bank = None
+_lock = threading.Lock()
+
+
+class QuestionBank:
+    """
+    Pre-serialized categories and questions in every language, held per process.
+
+    Sampling picks list indexes, so serving questions never touches the database.
+    """
+
+    def __init__(self, version, categories, questions):
+        self.version = version
+        self.loaded_at = self.checked_at = time.monotonic()
+        self.categories = {}
+        for category in categories:
+            self.categories[category.id] = {
+                'is_active': category.is_active,
+                'payload': {
+                    language: CategorySerializer(category, context={'language': language}).data
+                    for language in LANGUAGES
+                },
+            }
+
+        self.questions = {category_id: {'payload': {language: [] for language in LANGUAGES}, 'active': []}
+                          for category_id in self.categories}
+        for question in questions:
+            bank = self.questions.get(question.category_id)
+            if bank is None:
+                continue
+            if question.is_active:
+                bank['active'].append(len(bank['payload']['en']))
+            for language in LANGUAGES:
+                bank['payload'][language].append(QuestionSerializer(question, context={'language': language}).data)
+
+    def active_category_ids(self):
+        return [category_id for category_id, category in self.categories.items() if category['is_active']]
+
+    def category(self, category_id, language='en'):
+        category = self.categories.get(category_id)
+        return category['payload'][_language(language)] if category else None
+
+    def question_count(self, category_id, active_only=False):
+        bank = self.questions.get(category_id)
+        if bank is None:
+            return 0
+        return len(bank['active']) if active_only else len(bank['payload']['en'])
+
+    def sample(self, category_id, count, language='en', active_only=False):
+        """Return up to `count` random serialized questions of a category"""
+        bank = self.questions.get(category_id)
+        if bank is None:
+            return []
+        indexes = bank['active'] if active_only else range(len(bank['payload']['en']))
+        payload = bank['payload'][_language(language)]
+        return [payload[index] for index in random.sample(indexes, min(count, len(indexes)))]
+
+
+def _language(language):
+    # Serializers fall back to English for anything but Tagalog
+    return 'tl' if language == 'tl' else 'en'
+
+
+def _get_version():
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        # Seeded from the clock so an evicted counter never reuses an old version
+        cache.add(VERSION_CACHE_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_CACHE_KEY)
+    return version
+
+
+def _is_current(bank, version):
+    return bank is not None and bank.version == version and time.monotonic() - bank.loaded_at <= LOCAL_BANK_TTL
+
+
+def _recently_checked(bank):
+    now = time.monotonic()
+    return bank is not None and now - bank.checked_at <= VERSION_CHECK_INTERVAL and now - bank.loaded_at <= LOCAL_BANK_TTL
+
+
+def get_question_bank():
+    """Return this process's question bank, rebuilding it when another process invalidated it"""
+    global _bank
+    bank = _bank
+    if _recently_checked(bank):
+        return bank
+
+    version = _get_version()
+    if _is_current(bank, version):
+        bank.checked_at = time.monotonic()
+        return bank
+
+    with _lock:
+        if not _is_current(_bank, version):
+            _bank = QuestionBank(
+                version,
+                AssessmentCategory.objects.order_by('id'),
+                Question.objects.order_by('id'),
+            )
+        return _bank
+
+
+def invalidate_question_bank():
+    """Make every process rebuild its bank after a question or category changed"""
+    global _bank
+    try:
+        cache.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        cache.set(VERSION_CACHE_KEY, time.time_ns(), timeout=None)
+    _bank = None
@@ -0,0 +1,188 @@
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Sum, Value, When
+from django.utils import timezone
+
+from .models import AssessmentResponse, StudentAssessment, StudentCategoryScore
+
+RESPONSE_SCORES = {
+    'never': 0,
+    'sometimes': 1,
+    'often': 2,
+    'very_often': 3
+}
+
+# Average category percentage at which each diagnosis is flagged
+DIAGNOSIS_CRITERIA = {
+    'ASD': {
+        'categories': ['Social', 'Behavioral', 'Communication'],
+        'threshold': 70
+    },
+    'ADHD': {
+        'categories': ['Attention', 'Hyperactivity', 'Impulsivity'],
+        'threshold': 65
+    },
+    'Learning Disability': {
+        'categories': ['Academic', 'Cognitive', 'Processing'],
+        'threshold': 60
+    }
+}
+
+
+def response_score(response):
+    return RESPONSE_SCORES.get(response.lower(), 0)
+
+
+def response_score_expression(field='response'):
+    """Database-side equivalent of response_score for aggregating over AssessmentResponse"""
+    return Case(
+        *[When(**{field: response}, then=Value(score)) for response, score in RESPONSE_SCORES.items()],
+        default=Value(0),
+        output_field=IntegerField()
+    )
+
+
+def _category_totals(responses):
+    return {
+        row['question__question_category']: (row['score_sum'], row['response_count'])
+        for row in responses
+        .values('question__question_category')
+        .annotate(score_sum=Sum(response_score_expression()), response_count=Count('id'))
+        .order_by()
+    }
+
+
+def _apply_totals(student_id, totals, sign=1):
+    if not totals:
+        return
+    StudentCategoryScore.objects.bulk_create(
+        [StudentCategoryScore(student_id=student_id, question_category=category) for category in totals],
+        ignore_conflicts=True
+    )
+    StudentCategoryScore.objects.filter(student_id=student_id, question_category__in=totals).update(
+        score_sum=F('score_sum') + Case(
+            *[When(question_category=category, then=Value(sign * score_sum))
+              for category, (score_sum, _) in totals.items()],
+            default=Value(0)
+        ),
+        response_count=F('response_count') + Case(
+            *[When(question_category=category, then=Value(sign * count))
+              for category, (_, count) in totals.items()],
+            default=Value(0)
+        ),
+        updated_at=timezone.now()
+    )
+
+
+def category_percentages(totals):
+    """Turn {category: (score_sum, count)} into {category: percentage of the max score}"""
+    return {
+        category: round(score_sum / (count * 3) * 100, 1)  # 3 is max score per question
+        for category, (score_sum, count) in totals.items()
+        if count > 0
+    }
+
+
+def compute_category_scores(assessment, totals=None):
+    """Return the category score vector of an assessment without storing it"""
+    if totals is None:
+        totals = _category_totals(assessment.responses.all())
+    return category_percentages(totals)
+
+
+def store_category_scores(assessment, totals=None):
+    """Persist the category score vector of a completed assessment"""
+    assessment.category_scores = compute_category_scores(assessment, totals)
+    StudentAssessment.objects.filter(pk=assessment.pk).update(category_scores=assessment.category_scores)
+
+
+def record_completed_assessment(assessment, sign=1):
+    """
+    Add a newly completed assessment's responses to the student's category totals
+    and store its score vector, or remove them with sign=-1 when it is reopened or deleted.
+    """
+    totals = _category_totals(assessment.responses.all())
+    _apply_totals(assessment.student_id, totals, sign)
+    if sign > 0:
+        store_category_scores(assessment, totals)
+    else:
+        assessment.category_scores = None
+        StudentAssessment.objects.filter(pk=assessment.pk).update(category_scores=None)
+
+
+def record_responses(assessment, response_ids):
+    """Add responses saved after their assessment was already completed"""
+    if assessment.completed and response_ids:
+        _apply_totals(
+            assessment.student_id,
+            _category_totals(AssessmentResponse.objects.filter(id__in=response_ids))
+        )
+        store_category_scores(assessment)
+
+
+def get_student_category_scores(student_id):
+    """Return {question_category: percentage} over all of a student's completed assessments"""
+    return {
+        score.question_category: score.percentage
+        for score in StudentCategoryScore.objects.filter(student_id=student_id, response_count__gt=0)
+    }
+
+
+@transaction.atomic
+def rebuild_student_category_scores(student_ids=None):
+    """Recompute the totals from AssessmentResponse rows, for every student or only the given ones"""
+    responses = AssessmentResponse.objects.filter(assessment__completed=True)
+    scores = StudentCategoryScore.objects.all()
+    if student_ids is not None:
+        responses = responses.filter(assessment__student_id__in=student_ids)
+        scores = scores.filter(student_id__in=student_ids)
+
+    rows = (responses
+        .values('assessment__student_id', 'question__question_category')
+        .annotate(score_sum=Sum(response_score_expression()), response_count=Count('id'))
+        .order_by())
+    now = timezone.now()
+    rebuilt = [
+        StudentCategoryScore(
+            student_id=row['assessment__student_id'],
+            question_category=row['question__question_category'],
+            score_sum=row['score_sum'],
+            response_count=row['response_count'],
+            updated_at=now
+        )
+        for row in rows
+    ]
+    # Categories with no completed responses left are reset rather than kept stale
+    scores.update(score_sum=0, response_count=0, updated_at=now)
+    StudentCategoryScore.objects.bulk_create(
+        rebuilt,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['student', 'question_category'],
+        update_fields=['score_sum', 'response_count', 'updated_at']
+    )
+    return len(rebuilt)
+
+
+def backfill_category_scores(assessments, chunk_size=500):
+    """Store score vectors for completed assessments, one grouped query per chunk"""
+    stored = 0
+    ids = list(assessments.filter(completed=True).values_list('id', flat=True))
+    for start in range(0, len(ids), chunk_size):
+        chunk_ids = ids[start:start + chunk_size]
+        totals = {assessment_id: {} for assessment_id in chunk_ids}
+        rows = (AssessmentResponse.objects
+            .filter(assessment_id__in=chunk_ids)
+            .values('assessment_id', 'question__question_category')
+            .annotate(score_sum=Sum(response_score_expression()), response_count=Count('id'))
+            .order_by())
+        for row in rows:
+            totals[row['assessment_id']][row['question__question_category']] = (row['score_sum'], row['response_count'])
+
+        StudentAssessment.objects.bulk_update(
+            [StudentAssessment(id=assessment_id, category_scores=category_percentages(assessment_totals))
+             for assessment_id, assessment_totals in totals.items()],
+            ['category_scores'],
+            batch_size=chunk_size
+        )
+        stored += len(chunk_ids)
+    return stored
@@ -0,0 +1,160 @@
+import logging
+import threading
+
+import numpy as np
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from user_admin.models.account_models import StudentInfo
+from .analysis import category_matrix, diagnosis_matrix
+from .models import ScreeningSnapshot, StudentAssessment, StudentCategoryScore, StudentScreeningResult
+from .scoring import DIAGNOSIS_CRITERIA
+
+logger = logging.getLogger(__name__)
+
+
+def cohort_students(branch_name=None, grade_level=None):
+    students = StudentInfo.objects.all()
+    if branch_name:
+        students = students.filter(student_info__user__branch_name=branch_name)
+    if grade_level:
+        students = students.filter(grade_level=grade_level)
+    return students
+
+
+def screen_snapshot(snapshot):
+    """
+    Screen every student of a snapshot's branch and/or grade level and store the results.
+
+    Category percentages come from the students' StudentCategoryScore totals and are
+    scored as one student x category matrix, with the same percentages and thresholds
+    as AssessmentAnalysisView applies to a single student.
+    """
+    students = cohort_students(snapshot.branch_name, snapshot.grade_level)
+    student_ids = list(students.values_list('id', flat=True))
+    assessment_counts = dict(
+        StudentAssessment.objects.filter(student__in=students, completed=True)
+        .values('student_id')
+        .annotate(total=Count('id'))
+        .values_list('student_id', 'total')
+    )
+    rows = list(
+        StudentCategoryScore.objects.filter(student__in=students, response_count__gt=0)
+        .values_list('student_id', 'question_category', 'score_sum', 'response_count')
+    )
+
+    results = {student_id: StudentScreeningResult(
+        student_id=student_id,
+        total_assessments=assessment_counts.get(student_id, 0)
+    ) for student_id in student_ids}
+
+    if rows:
+        owner_ids, categories, score_sums, counts = zip(*rows)
+        owners, category_names, percentages = category_matrix(owner_ids, categories, score_sums, counts)
+        diagnoses = diagnosis_matrix(category_names, percentages)
+        has_scores = ~np.isnan(percentages)
+        dominant = np.argmax(np.where(has_scores, percentages, -1), axis=1)
+
+        for row, student_id in enumerate(owners.tolist()):
+            result = results.get(student_id)
+            if result is None:
+                continue
+            result.category_percentages = {
+                str(category_names[column]): float(percentages[row, column])
+                for column in np.flatnonzero(has_scores[row])
+            }
+            result.dominant_category = str(category_names[dominant[row]]) if has_scores[row].any() else None
+
+            for diagnosis, (average, columns) in diagnoses.items():
+                if np.isnan(average[row]):
+                    continue
+                threshold = DIAGNOSIS_CRITERIA[diagnosis]['threshold']
+                result.diagnosis_results[diagnosis] = {
+                    'probability': min(float(average[row]) / threshold * 100, 100),
+                    'relevant_categories': [
+                        float(percentages[row, column]) for column in columns if has_scores[row, column]
+                    ],
+                    'threshold_met': bool(average[row] >= threshold)
+                }
+            result.flagged = any(diagnosis['threshold_met'] for diagnosis in result.diagnosis_results.values())
+
+    with transaction.atomic():
+        for result in results.values():
+            result.snapshot = snapshot
+        StudentScreeningResult.objects.bulk_create(results.values(), batch_size=1000)
+        snapshot.student_count = len(results)
+        snapshot.flagged_count = sum(1 for result in results.values() if result.flagged)
+        snapshot.status = 'completed'
+        snapshot.finished_at = timezone.now()
+        snapshot.save(update_fields=['student_count', 'flagged_count', 'status', 'finished_at'])
+    return snapshot
+
+
+def screen_cohort(branch_name=None, grade_level=None, created_by=None):
+    """Screen a branch and/or grade level right away, e.g. from the screen_cohort command"""
+    snapshot = ScreeningSnapshot.objects.create(
+        branch_name=branch_name or '',
+        grade_level=grade_level or '',
+        created_by=created_by,
+        status='running',
+        started_at=timezone.now()
+    )
+    return screen_snapshot(snapshot)
+
+
+def enqueue_screening(branch_name=None, grade_level=None, created_by=None):
+    """
+    Queue the screening of a branch and/or grade level as a pending snapshot and
+    start a worker once the current transaction commits.
+    """
+    snapshot = ScreeningSnapshot.objects.create(
+        branch_name=branch_name or '',
+        grade_level=grade_level or '',
+        created_by=created_by
+    )
+    transaction.on_commit(start_worker)
+    return snapshot
+
+
+def start_worker():
+    threading.Thread(target=process_pending_screenings, daemon=True).start()
+
+
+def _claim_next_snapshot():
+    with transaction.atomic():
+        snapshot = (ScreeningSnapshot.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='pending')
+            .order_by('created_at')
+            .first())
+        if snapshot is None:
+            return None
+        snapshot.status = 'running'
+        snapshot.started_at = timezone.now()
+        snapshot.save(update_fields=['status', 'started_at'])
+    return snapshot
+
+
+def run_screening_job(snapshot):
+    try:
+        screen_snapshot(snapshot)
+    except Exception as e:
+        logger.exception("Screening %s failed", snapshot.id)
+        snapshot.status = 'failed'
+        snapshot.error = str(e)
+        snapshot.finished_at = timezone.now()
+        snapshot.save(update_fields=['status', 'error', 'finished_at'])
+
+
+def process_pending_screenings():
+    """Run pending screenings until none are left; safe to call from several workers"""
+    try:
+        while True:
+            snapshot = _claim_next_snapshot()
+            if snapshot is None:
+                break
+            run_screening_job(snapshot)
+    finally:
+        # Worker threads get their own connection, which Django won't close for them
+        connection.close()
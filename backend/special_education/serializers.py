@@ -1,5 +1,7 @@
 from rest_framework import serializers
-from .models import AssessmentCategory, Question, StudentAssessment, AssessmentResponse
+from .models import (
+    AssessmentCategory, Question, StudentAssessment, AssessmentResponse, ScreeningSnapshot, StudentScreeningResult
+)
 from user_admin.serializers.accounts.list_account_serializers import StudentListSerializer
 from django.utils import timezone
 from datetime import timedelta
@@ -133,3 +135,26 @@ class AssessmentSerializer(serializers.ModelSerializer):
         validated_data['results_available_date'] = timezone.now() + timedelta(days=30)
         
         return super().create(validated_data)
+
+class ScreeningSnapshotSerializer(serializers.ModelSerializer):
+    created_by_name = serializers.CharField(source='created_by.username', read_only=True, default=None)
+
+    class Meta:
+        model = ScreeningSnapshot
+        fields = ['id', 'branch_name', 'grade_level', 'created_by', 'created_by_name',
+                 'created_at', 'status', 'error', 'finished_at', 'student_count', 'flagged_count']
+        read_only_fields = fields
+
+class StudentScreeningResultSerializer(serializers.ModelSerializer):
+    student_name = serializers.SerializerMethodField()
+    grade_level = serializers.CharField(source='student.grade_level', read_only=True)
+
+    class Meta:
+        model = StudentScreeningResult
+        fields = ['id', 'student', 'student_name', 'grade_level', 'total_assessments',
+                 'category_percentages', 'dominant_category', 'diagnosis_results', 'flagged']
+        read_only_fields = fields
+
+    def get_student_name(self, obj):
+        user = obj.student.student_info.user
+        return f"{user.first_name} {user.last_name}"
@@ -0,0 +1,12 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import AssessmentCategory, Question
+from .question_bank import invalidate_question_bank
+
+
+@receiver([post_save, post_delete], sender=Question)
+@receiver([post_save, post_delete], sender=AssessmentCategory)
+def question_bank_changed(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_question_bank)
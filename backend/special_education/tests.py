@@ -0,0 +1,115 @@
+from django.test import TestCase
+
+from api.models import CustomUser
+from user_admin.models.account_models import StudentInfo, UserInfo
+from special_education.models import (
+    AssessmentCategory, AssessmentResponse, Question, StudentAssessment, StudentCategoryScore
+)
+from special_education.scoring import (
+    get_student_category_scores, rebuild_student_category_scores, record_completed_assessment, record_responses
+)
+
+
+class AssessmentTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.assessor = CustomUser.objects.create(username='admin', role='admin')
+        user = CustomUser.objects.create(username='stu-1', role='student')
+        cls.student = StudentInfo.objects.create(student_info=UserInfo.objects.create(user=user))
+        cls.category = AssessmentCategory.objects.create(title='Screening', description='')
+        cls.questions = {
+            name: Question.objects.create(question_text=name, category=cls.category, question_category=name)
+            for name in ('Attention', 'Hyperactivity')
+        }
+
+    def make_assessment(self, responses, completed=False):
+        """Create an assessment with {question_category: response} answers"""
+        assessment = StudentAssessment.objects.create(
+            student=self.student, category=self.category, assessor=self.assessor, completed=completed
+        )
+        AssessmentResponse.objects.bulk_create([
+            AssessmentResponse(assessment=assessment, question=self.questions[name], response=response)
+            for name, response in responses.items()
+        ])
+        return assessment
+
+
+class CategoryScoreReadTests(AssessmentTestCase):
+    def test_scores_of_unbackfilled_assessments_are_computed_without_writing(self):
+        assessment = self.make_assessment({'Attention': 'often', 'Hyperactivity': 'never'}, completed=True)
+
+        with self.assertNumQueries(1):
+            scores = assessment.calculate_category_scores()
+        self.assertEqual(scores, {'Attention': 66.7, 'Hyperactivity': 0.0})
+        self.assertIsNone(StudentAssessment.objects.get(pk=assessment.pk).category_scores)
+
+    def test_stored_scores_are_returned_as_is(self):
+        assessment = self.make_assessment({'Attention': 'often'}, completed=True)
+        assessment.category_scores = {'Attention': 50.0}
+
+        with self.assertNumQueries(0):
+            self.assertEqual(assessment.calculate_category_scores(), {'Attention': 50.0})
+
+
+class CategoryScoreRollupTests(AssessmentTestCase):
+    def totals(self):
+        return {
+            score.question_category: (score.score_sum, score.response_count)
+            for score in StudentCategoryScore.objects.filter(student=self.student)
+        }
+
+    def complete(self, assessment):
+        assessment.completed = True
+        assessment.save()
+        record_completed_assessment(assessment)
+
+    def assertMatchesRebuild(self):
+        totals = self.totals()
+        rebuild_student_category_scores([self.student.id])
+        self.assertEqual(self.totals(), totals)
+
+    def test_completion_adds_to_the_totals(self):
+        self.complete(self.make_assessment({'Attention': 'very_often', 'Hyperactivity': 'sometimes'}))
+        self.complete(self.make_assessment({'Attention': 'often'}))
+
+        self.assertEqual(self.totals(), {'Attention': (5, 2), 'Hyperactivity': (1, 1)})
+        self.assertAlmostEqual(get_student_category_scores(self.student.id)['Attention'], 5 / 6 * 100)
+        self.assertMatchesRebuild()
+
+    def test_reopening_removes_from_the_totals(self):
+        first = self.make_assessment({'Attention': 'very_often', 'Hyperactivity': 'sometimes'})
+        second = self.make_assessment({'Attention': 'never'})
+        self.complete(first)
+        self.complete(second)
+
+        first.completed = False
+        first.save()
+        record_completed_assessment(first, -1)
+
+        self.assertEqual(self.totals(), {'Attention': (0, 1), 'Hyperactivity': (0, 0)})
+        self.assertIsNone(StudentAssessment.objects.get(pk=first.pk).category_scores)
+        self.assertEqual(get_student_category_scores(self.student.id), {'Attention': 0})
+        self.assertMatchesRebuild()
+
+    def test_responses_saved_after_completion_are_added(self):
+        assessment = self.make_assessment({'Attention': 'often'})
+        self.complete(assessment)
+
+        late = AssessmentResponse.objects.create(
+            assessment=assessment, question=self.questions['Hyperactivity'], response='very_often'
+        )
+        record_responses(assessment, [late.id])
+
+        self.assertEqual(self.totals(), {'Attention': (2, 1), 'Hyperactivity': (3, 1)})
+        self.assertEqual(
+            StudentAssessment.objects.get(pk=assessment.pk).category_scores,
+            {'Attention': 66.7, 'Hyperactivity': 100.0}
+        )
+        self.assertMatchesRebuild()
+
+    def test_responses_of_open_assessments_are_not_counted(self):
+        assessment = self.make_assessment({'Attention': 'often'})
+        record_responses(assessment, list(assessment.responses.values_list('id', flat=True)))
+
+        self.assertEqual(self.totals(), {})
+        self.assertMatchesRebuild()
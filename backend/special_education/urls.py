@@ -10,7 +10,9 @@ from .views import (
     AssessmentDeleteView,
     AssessmentDetailView,
     AssessmentAnalysisView,
-    RandomQuestionView
+    RandomQuestionView,
+    ScreeningView,
+    ScreeningResultsView
 )
 
 app_name = 'special_education'
@@ -27,4 +29,6 @@ urlpatterns = [
     path('assessments/<int:pk>/delete/', AssessmentDeleteView.as_view(), name='assessment-delete'),
     path('assessments/analysis/<int:student_id>/', AssessmentAnalysisView.as_view(), name='assessment-analysis'),
     path('responses/bulk-create/', ResponseBulkCreateView.as_view(), name='response-bulk-create'),
+    path('screenings/', ScreeningView.as_view(), name='screening-list'),
+    path('screenings/<int:pk>/', ScreeningResultsView.as_view(), name='screening-results'),
 ]
@@ -3,21 +3,29 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
-from django.utils import timezone
-from datetime import datetime, timedelta
-from .models import AssessmentCategory, Question, StudentAssessment, AssessmentResponse
+from .models import AssessmentCategory, Question, StudentAssessment, AssessmentResponse, ScreeningSnapshot
+from .analysis import analyze_assessments
+from .question_bank import get_question_bank
+from .screening import enqueue_screening
+from .scoring import (
+    DIAGNOSIS_CRITERIA, get_student_category_scores, record_completed_assessment, record_responses, response_score
+)
 from .serializers import (
     CategorySerializer,
     QuestionSerializer,
     AssessmentSerializer,
-    ResponseSerializer
+    ResponseSerializer,
+    ScreeningSnapshotSerializer,
+    StudentScreeningResultSerializer
 )
+import logging
 import random
 from rest_framework import status
-from django.db.models import Count, Avg
-from collections import defaultdict
+from django.db import IntegrityError, transaction
 from django.http import JsonResponse
 
+logger = logging.getLogger(__name__)
+
 class CategoryListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     queryset = AssessmentCategory.objects.all()
@@ -50,33 +58,28 @@ class AutoAssessmentView(APIView):
     def get(self, request):
         try:
             language = request.query_params.get('language', 'en')
+            bank = get_question_bank()
+
             # Get all active categories and randomly select one
-            categories = AssessmentCategory.objects.filter(is_active=True)
-            if not categories:
+            category_ids = bank.active_category_ids()
+            if not category_ids:
                 return Response(
                     {'error': 'No active assessment categories available'}, 
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            selected_category = random.choice(categories)
+            selected_category = random.choice(category_ids)
             
             # Get 10 random questions from the selected category
-            questions = list(Question.objects.filter(
-                category=selected_category,
-                is_active=True
-            ))
-            
-            if len(questions) < 10:
+            if bank.question_count(selected_category, active_only=True) < 10:
                 return Response(
                     {'error': 'Insufficient questions in selected category'}, 
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            random_questions = random.sample(questions, 10)
-            
             return Response({
-                'category': CategorySerializer(selected_category, context={'language': language}).data,
-                'questions': QuestionSerializer(random_questions, many=True).data
+                'category': bank.category(selected_category, language),
+                'questions': bank.sample(selected_category, 10, active_only=True)
             })
             
         except Exception as e:
@@ -91,7 +94,11 @@ class AssessmentListView(generics.ListAPIView):
 
     def get_queryset(self):
         student_id = self.request.query_params.get('student')
-        queryset = StudentAssessment.objects.all()
+        # Category scores are stored on completed assessments, so the related rows
+        # joined here are all the list needs
+        queryset = StudentAssessment.objects.select_related(
+            'student__student_info__user', 'category', 'assessor'
+        )
         
         if student_id:
             queryset = queryset.filter(student_id=student_id)
@@ -176,33 +183,26 @@ class AssessmentUpdateView(generics.UpdateAPIView):
 
     def update(self, request, *args, **kwargs):
         try:
-            instance = self.get_object()
-            
-            # Update completion status
-            instance.completed = request.data.get('completed', instance.completed)
-            instance.save()
+            with transaction.atomic():
+                # Lock the row so concurrent updates can't record the same completion twice
+                instance = StudentAssessment.objects.select_for_update().get(pk=self.get_object().pk)
+                was_completed = instance.completed
+
+                # Update completion status
+                completed = request.data.get('completed', instance.completed)
+                instance.completed = completed if isinstance(completed, bool) else str(completed).lower() in ('true', '1')
+                instance.save()
+
+                if instance.completed != was_completed:
+                    record_completed_assessment(instance, 1 if instance.completed else -1)
 
-            # Get all completed assessments for this student
-            completed_assessments = StudentAssessment.objects.filter(
-                student=instance.student,
+            completed_count = StudentAssessment.objects.filter(
+                student_id=instance.student_id,
                 completed=True
-            ).order_by('date')
-            
-            completed_count = completed_assessments.count()
-
-            # Calculate cumulative scores
-            cumulative_scores = defaultdict(list)
-            for assessment in completed_assessments:
-                responses = AssessmentResponse.objects.filter(assessment=assessment)
-                for response in responses:
-                    score = self.calculate_response_score(response.response)
-                    cumulative_scores[response.question.question_category].append(score)
-
-            # Calculate average scores
-            final_scores = {
-                category: (sum(scores) / len(scores)) * (100/3)
-                for category, scores in cumulative_scores.items()
-            }
+            ).count()
+
+            # Cumulative scores over every completed assessment, read from the rollup
+            final_scores = get_student_category_scores(instance.student_id)
 
             response_data = {
                 'message': f'Assessment {completed_count}/30 completed successfully',
@@ -228,33 +228,9 @@ class AssessmentUpdateView(generics.UpdateAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-    def calculate_response_score(self, response):
-        score_mapping = {
-            'never': 0,
-            'sometimes': 1,
-            'often': 2,
-            'very_often': 3
-        }
-        return score_mapping.get(response.lower(), 0)
-
     def calculate_diagnosis_probabilities(self, category_scores):
-        diagnosis_criteria = {
-            'ASD': {
-                'categories': ['Social', 'Behavioral', 'Communication'],
-                'threshold': 70
-            },
-            'ADHD': {
-                'categories': ['Attention', 'Hyperactivity', 'Impulsivity'],
-                'threshold': 65
-            },
-            'Learning Disability': {
-                'categories': ['Academic', 'Cognitive', 'Processing'],
-                'threshold': 60
-            }
-        }
-
         results = {}
-        for diagnosis, criteria in diagnosis_criteria.items():
+        for diagnosis, criteria in DIAGNOSIS_CRITERIA.items():
             relevant_scores = [
                 category_scores.get(cat, 0)
                 for cat in criteria['categories']
@@ -272,7 +248,7 @@ class AssessmentUpdateView(generics.UpdateAPIView):
 class AssessmentDetailView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = AssessmentSerializer
-    queryset = StudentAssessment.objects.all()
+    queryset = StudentAssessment.objects.select_related('student__student_info__user', 'category', 'assessor')
 
     def retrieve(self, request, *args, **kwargs):
         try:
@@ -281,7 +257,7 @@ class AssessmentDetailView(generics.RetrieveAPIView):
             data = serializer.data
 
             # Get all responses for this assessment
-            responses = AssessmentResponse.objects.filter(assessment=instance)
+            responses = AssessmentResponse.objects.filter(assessment=instance).select_related('question')
             response_data = ResponseSerializer(responses, many=True).data
 
             # Add responses to the data
@@ -306,7 +282,10 @@ class AssessmentDeleteView(generics.DestroyAPIView):
     def destroy(self, request, *args, **kwargs):
         try:
             instance = self.get_object()
-            self.perform_destroy(instance)
+            with transaction.atomic():
+                if instance.completed:
+                    record_completed_assessment(instance, -1)
+                self.perform_destroy(instance)
             return Response({'message': 'Assessment deleted successfully'}, status=status.HTTP_200_OK)
         except Exception as e:
             return Response(
@@ -319,7 +298,6 @@ class ResponseBulkCreateView(APIView):
 
     def post(self, request):
         try:
-            print('Received response data:', request.data)
             responses_data = request.data.get('responses', [])
             if not responses_data:
                 return Response(
@@ -327,31 +305,8 @@ class ResponseBulkCreateView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            created_responses = []
-            errors = []
-
-            for response_data in responses_data:
-                print('Processing response:', response_data)
-                serializer = ResponseSerializer(data=response_data)
-                if serializer.is_valid():
-                    try:
-                        response = serializer.save()
-                        created_responses.append(ResponseSerializer(response).data)
-                    except Exception as e:
-                        print('Error saving response:', str(e))
-                        errors.append({
-                            'data': response_data,
-                            'error': str(e)
-                        })
-                else:
-                    print('Validation errors:', serializer.errors)
-                    errors.append({
-                        'data': response_data,
-                        'error': serializer.errors
-                    })
-
+            responses, errors = self.validate_responses(responses_data)
             if errors:
-                print('Errors during bulk create:', errors)
                 return Response(
                     {
                         'error': 'Some responses failed to save',
@@ -360,10 +315,23 @@ class ResponseBulkCreateView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
+            # All or nothing: one insert, and a duplicate that slipped past validation rolls it back
+            try:
+                with transaction.atomic():
+                    AssessmentResponse.objects.bulk_create(responses)
+                    assessments = {response.assessment_id: response.assessment for response in responses}
+                    for assessment in assessments.values():
+                        record_responses(assessment, [r.id for r in responses if r.assessment_id == assessment.id])
+            except IntegrityError:
+                return Response(
+                    {'error': 'A response for one of these questions already exists'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
             return Response(
                 {
                     'message': 'Responses saved successfully',
-                    'responses': created_responses
+                    'responses': ResponseSerializer(responses, many=True).data
                 },
                 status=status.HTTP_201_CREATED
             )
@@ -375,9 +343,74 @@ class ResponseBulkCreateView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def validate_responses(self, responses_data):
+        """
+        Validate every response in one pass against prefetched assessments, questions
+        and existing responses. Returns (unsaved AssessmentResponses, errors).
+        """
+        def to_pk(value):
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                return None
+
+        assessment_ids = {to_pk(data.get('assessment')) for data in responses_data if isinstance(data, dict)}
+        question_ids = {to_pk(data.get('question')) for data in responses_data if isinstance(data, dict)}
+        assessments = StudentAssessment.objects.in_bulk(assessment_ids - {None})
+        questions = Question.objects.in_bulk(question_ids - {None})
+        existing = set(AssessmentResponse.objects.filter(
+            assessment_id__in=assessments,
+            question_id__in=questions
+        ).values_list('assessment_id', 'question_id'))
+
+        valid_choices = [choice[0] for choice in AssessmentResponse.RESPONSE_CHOICES]
+        responses = []
+        errors = []
+        for data in responses_data:
+            if not isinstance(data, dict):
+                errors.append({'data': data, 'error': {'non_field_errors': ['Invalid data. Expected a dictionary.']}})
+                continue
+
+            field_errors = {}
+            for field, objects in (('assessment', assessments), ('question', questions)):
+                value = data.get(field)
+                if value in (None, ''):
+                    field_errors[field] = ['This field is required.']
+                elif to_pk(value) not in objects:
+                    field_errors[field] = [f'Invalid pk "{value}" - object does not exist.']
+
+            answer = str(data.get('response') or '').lower()
+            if not answer:
+                field_errors['response'] = ['This field is required.']
+            elif answer not in valid_choices:
+                field_errors['response'] = [f"Invalid response. Must be one of: {', '.join(valid_choices)}"]
+
+            if field_errors:
+                errors.append({'data': data, 'error': field_errors})
+                continue
+
+            assessment = assessments[to_pk(data['assessment'])]
+            question = questions[to_pk(data['question'])]
+            if question.category_id != assessment.category_id:
+                message = 'Question does not belong to the assessment category'
+            elif (assessment.id, question.id) in existing:
+                message = 'A response for this question already exists'
+            else:
+                message = None
+            if message:
+                errors.append({'data': data, 'error': {'non_field_errors': [message]}})
+                continue
+
+            # Later duplicates within the same submission count as existing
+            existing.add((assessment.id, question.id))
+            responses.append(AssessmentResponse(assessment=assessment, question=question, response=answer))
+
+        return responses, errors
+
 class RandomQuestionView(APIView):
     """View to get random questions for public assessment."""
     permission_classes = []  # Public access
+    authentication_classes = []  # Nothing here depends on the user, so skip the token lookup
 
     def get(self, request):
         try:
@@ -391,28 +424,18 @@ class RandomQuestionView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            # Get questions for the specified category
-            questions = Question.objects.filter(category_id=category_id)
+            # Questions are sampled from the in-memory bank; steady-state traffic never queries
+            bank = get_question_bank()
+            category_id = int(category_id)
             
-            if not questions.exists():
+            if not bank.question_count(category_id):
                 return Response(
                     {'error': 'No questions found for this category'},
                     status=status.HTTP_404_NOT_FOUND
                 )
 
-            # Randomly select the specified number of questions
-            selected_questions = random.sample(
-                list(questions),
-                min(count, len(questions))
-            )
-
-            # Serialize and return the questions with language context
-            serializer = QuestionSerializer(
-                selected_questions, 
-                many=True,
-                context={'language': language}  # Add language to serializer context
-            )
-            return Response(serializer.data)
+            # Randomly select the specified number of questions, already serialized in the language
+            return Response(bank.sample(category_id, count, language))
 
         except ValueError:
             return Response(
@@ -428,164 +451,113 @@ class RandomQuestionView(APIView):
 class AssessmentAnalysisView(APIView):
     def get(self, request, student_id):
         try:
-            print(f"Analyzing assessments for student ID: {student_id}")  # Debug log
-
             # Get all completed assessments for the student
-            assessments = StudentAssessment.objects.filter(
+            assessments = list(StudentAssessment.objects.filter(
                 student_id=student_id,
                 completed=True
-            ).order_by('date')
-
-            total_assessments = assessments.count()
-            print(f"Found {total_assessments} completed assessments")  # Debug log
+            ).order_by('date', 'id').values('id', 'date', 'assessment_number'))
 
+            total_assessments = len(assessments)
             if total_assessments == 0:
                 return Response({
                     'error': 'No completed assessments found for this student'
                 }, status=status.HTTP_404_NOT_FOUND)
 
-            # Initialize data structures
-            all_responses = []
-            category_totals = defaultdict(lambda: {'total': 0, 'count': 0})
-            assessment_timeline = []
-
-            # Process each assessment
-            for assessment in assessments:
-                # Get responses directly without using prefetch_related
-                responses = AssessmentResponse.objects.filter(assessment=assessment).select_related('question')
-                assessment_scores = defaultdict(list)
-
-                for response in responses:
-                    category = response.question.question_category
-                    score = self.calculate_response_score(response.response)
-                    
-                    # Add to category totals
-                    category_totals[category]['total'] += score
-                    category_totals[category]['count'] += 1
-                    
-                    # Add to assessment scores
-                    assessment_scores[category].append(score)
-                    
-                    # Add to all responses
-                    all_responses.append({
-                        'category': category,
-                        'score': score,
-                        'assessment_number': assessment.assessment_number
-                    })
-
-                # Calculate average scores for this assessment
-                assessment_averages = {
-                    category: (sum(scores) / len(scores)) * (100/3)  # Normalize to percentage
-                    for category, scores in assessment_scores.items()
-                    if scores  # Only include categories with scores
-                }
-
-                # Add to timeline
-                assessment_timeline.append({
-                    'id': assessment.id,
-                    'date': assessment.date,
-                    'assessment_number': assessment.assessment_number,
-                    'scores': assessment_averages
-                })
-
-            # Calculate overall category percentages
-            category_percentages = {}
-            for category, data in category_totals.items():
-                if data['count'] > 0:  # Prevent division by zero
-                    category_percentages[category] = (data['total'] / data['count']) * (100/3)  # Normalize to percentage
-
-            # Find dominant category
-            if category_percentages:
-                dominant_category = max(category_percentages.items(), key=lambda x: x[1])[0]
-            else:
-                dominant_category = None
-
-            # Calculate progress trends
-            progress_trend = defaultdict(list)
-            for response in all_responses:
-                progress_trend[response['category']].append({
-                    'assessment_number': response['assessment_number'],
-                    'score': response['score'] * (100/3)  # Normalize to percentage
-                })
+            include_details = request.query_params.get('detailed_responses', '').lower() in ('true', '1')
 
-            # Calculate diagnosis thresholds
-            diagnosis_results = {}
-            diagnosis_criteria = {
-                'ASD': {
-                    'categories': ['Social', 'Behavioral', 'Communication'],
-                    'threshold': 70
-                },
-                'ADHD': {
-                    'categories': ['Attention', 'Hyperactivity', 'Impulsivity'],
-                    'threshold': 65
-                },
-                'Learning Disability': {
-                    'categories': ['Academic', 'Cognitive', 'Processing'],
-                    'threshold': 60
-                }
-            }
+            # Every response of those assessments in one joined query, in assessment order
+            fields = ['assessment_id', 'question__question_category', 'response']
+            if include_details:
+                fields.append('question__question_text')
+            responses = list(AssessmentResponse.objects.filter(
+                assessment__student_id=student_id,
+                assessment__completed=True
+            ).order_by('assessment__date', 'assessment_id', 'id').values_list(*fields))
 
-            # Calculate diagnosis probabilities
-            for diagnosis, criteria in diagnosis_criteria.items():
-                relevant_scores = [
-                    category_percentages[cat] 
-                    for cat in criteria['categories'] 
-                    if cat in category_percentages
-                ]
-                if relevant_scores:
-                    avg_score = sum(relevant_scores) / len(relevant_scores)
-                    probability = (avg_score / criteria['threshold']) * 100
-                    diagnosis_results[diagnosis] = {
-                        'probability': min(probability, 100),
-                        'relevant_categories': relevant_scores,
-                        'threshold_met': avg_score >= criteria['threshold']
-                    }
+            analysis = analyze_assessments(assessments, [response[:3] for response in responses])
 
             response_data = {
                 'total_assessments': total_assessments,
-                'category_percentages': category_percentages,
-                'dominant_category': dominant_category,
-                'assessment_timeline': assessment_timeline,
-                'progress_trend': dict(progress_trend),
-                'latest_assessment': assessments.last().id if assessments else None,
+                'category_percentages': analysis['category_percentages'],
+                'dominant_category': analysis['dominant_category'],
+                'assessment_timeline': analysis['assessment_timeline'],
+                'progress_trend': analysis['progress_trend'],
+                'latest_assessment': assessments[-1]['id'],
                 'completion_status': 'completed' if total_assessments >= 30 else 'in_progress',
                 'completion_percentage': (total_assessments / 30) * 100,
-                'diagnosis_results': diagnosis_results,
-                'detailed_responses': [
+                'diagnosis_results': analysis['diagnosis_results'],
+            }
+
+            # Per-question detail is large, so it is only sent when asked for
+            if include_details:
+                details = {assessment['id']: [] for assessment in assessments}
+                for assessment_id, category, response, question_text in responses:
+                    details[assessment_id].append({
+                        'question': question_text,
+                        'category': category,
+                        'response': response,
+                        'score': response_score(response)
+                    })
+                response_data['detailed_responses'] = [
                     {
-                        'assessment_number': assessment.assessment_number,
-                        'date': assessment.date,
-                        'responses': [
-                            {
-                                'question': response.question.question_text,
-                                'category': response.question.question_category,
-                                'response': response.response,
-                                'score': self.calculate_response_score(response.response)
-                            }
-                            for response in AssessmentResponse.objects.filter(assessment=assessment)
-                        ]
+                        'assessment_number': assessment['assessment_number'],
+                        'date': assessment['date'],
+                        'responses': details[assessment['id']]
                     }
                     for assessment in assessments
                 ]
-            }
 
-            print("Analysis response data:", response_data)  # Debug log
             return Response(response_data)
 
         except Exception as e:
-            print(f"Error in assessment analysis: {str(e)}")  # Debug log
+            logger.exception("Error in assessment analysis")
             return Response({
                 'error': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def calculate_response_score(self, response):
-        score_mapping = {
-            'never': 0,
-            'sometimes': 1,
-            'often': 2,
-            'very_often': 3
-        }
-        return score_mapping.get(response.lower(), 0)
+class ScreeningView(APIView):
+    """List cohort screening snapshots, or queue a new one for a branch and/or grade level"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role != 'admin' and not request.user.is_staff:
+            return Response({'error': 'Only administrators can view screenings'}, status=status.HTTP_403_FORBIDDEN)
+
+        snapshots = ScreeningSnapshot.objects.select_related('created_by')[:50]
+        return Response(ScreeningSnapshotSerializer(snapshots, many=True).data)
+
+    def post(self, request):
+        if request.user.role != 'admin' and not request.user.is_staff:
+            return Response({'error': 'Only administrators can run screenings'}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            # Screening a whole branch can take a while; poll the snapshot for its status
+            snapshot = enqueue_screening(
+                branch_name=request.data.get('branch_name') or None,
+                grade_level=request.data.get('grade_level') or None,
+                created_by=request.user
+            )
+            return Response(ScreeningSnapshotSerializer(snapshot).data, status=status.HTTP_202_ACCEPTED)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class ScreeningResultsView(APIView):
+    """Per-student results of one screening snapshot; ?flagged=true keeps only flagged students"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        if request.user.role != 'admin' and not request.user.is_staff:
+            return Response({'error': 'Only administrators can view screenings'}, status=status.HTTP_403_FORBIDDEN)
+
+        snapshot = get_object_or_404(ScreeningSnapshot.objects.select_related('created_by'), pk=pk)
+        results = snapshot.results.select_related('student__student_info__user').order_by('-flagged', 'student_id')
+        if request.query_params.get('flagged', '').lower() in ('true', '1'):
+            results = results.filter(flagged=True)
+
+        return Response({
+            'snapshot': ScreeningSnapshotSerializer(snapshot).data,
+            'results': StudentScreeningResultSerializer(results, many=True).data
+        })
 
 def get_student_analysis(request, student_id):
     try:
@@ -600,9 +572,13 @@ def get_student_analysis(request, student_id):
 
 def update_assessment(request, assessment_id):
     try:
-        assessment = StudentAssessment.objects.get(id=assessment_id)
-        assessment.completed = True
-        assessment.save()
+        with transaction.atomic():
+            assessment = StudentAssessment.objects.select_for_update().get(id=assessment_id)
+            was_completed = assessment.completed
+            assessment.completed = True
+            assessment.save()
+            if not was_completed:
+                record_completed_assessment(assessment)
 
         # Get category scores for this assessment
         category_scores = assessment.calculate_category_scores()
@@ -0,0 +1,56 @@
+from django.db.models import Case, CharField, IntegerField, Q, Value, When
+from django.db.models.functions import Cast
+from django.db.models.lookups import Contains
+from rest_framework import filters
+
+
+def normalize_search(term):
+    return ' '.join((term or '').lower().split())
+
+
+def search_accounts(queryset, term):
+    """
+    Filter users so every word of `term` starts a word of their name or username.
+
+    Matches are annotated with `search_rank`: 3 for the exact name, 2 when the
+    name starts with the whole term, 1 when it starts with the first word.
+    An all-digit term also matches users whose id contains it.
+    """
+    term = normalize_search(term)
+    if not term:
+        return queryset
+
+    words = term.split(' ')
+    condition = Q()
+    for word in words:
+        condition &= Q(search_name__startswith=word) | Q(search_name__contains=f' {word}')
+    if term.isdigit():
+        condition |= Q(Contains(Cast('pk', output_field=CharField()), term))
+
+    return queryset.filter(condition).annotate(search_rank=Case(
+        When(search_name__startswith=f'{term} ', then=Value(3)),
+        When(search_name__startswith=term, then=Value(2)),
+        When(search_name__startswith=words[0], then=Value(1)),
+        default=Value(0),
+        output_field=IntegerField(),
+    ))
+
+
+class AccountSearchFilter(filters.BaseFilterBackend):
+    """
+    Search accounts with the `search` query param, best matches first.
+
+    Place it after OrderingFilter: the current ordering is kept as the
+    tie-breaker, and an explicit ?ordering= overrides the ranking.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param)
+        if not normalize_search(term):
+            return queryset
+
+        queryset = search_accounts(queryset, term)
+        if request.query_params.get('ordering'):
+            return queryset
+        return queryset.order_by('-search_rank', *queryset.query.order_by)
@@ -26,8 +26,17 @@ class ParentInfoAdmin(UserInfoAdmin):
         ('Parent', {'fields': ('parent_info',)}),
     )
 
+class UsernameSequenceAdmin(admin.ModelAdmin):
+    list_display = ('prefix', 'year', 'last_value')
+
+class UserDeletionJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'requested_by', 'status', 'total', 'processed', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = ('user_ids',)
+
 admin.site.register(UserInfo, UserInfoAdmin)
 admin.site.register(TeacherInfo, TeacherInfoAdmin)
 admin.site.register(StudentInfo, StudentInfoAdmin)  
 admin.site.register(ParentInfo, ParentInfoAdmin)
-
+admin.site.register(UsernameSequence, UsernameSequenceAdmin)
+admin.site.register(UserDeletionJob, UserDeletionJobAdmin)
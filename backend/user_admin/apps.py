@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class UserAdminConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'user_admin'
+
+    def ready(self):
+        from . import signals  # noqa: F401
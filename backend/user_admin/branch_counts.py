@@ -0,0 +1,69 @@
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Q
+
+from api.models import CustomUser
+
+BRANCH_COUNTS_CACHE_KEY = 'user_admin:branch_user_counts'
+# Signals drop the cached counts on every relevant change; the timeout only
+# bounds how stale they can get after writes that bypass signals.
+BRANCH_COUNTS_CACHE_TIMEOUT = 60 * 60
+
+# Fields of a user whose change moves the counts
+COUNTED_FIELDS = {'role', 'branch_name', 'is_active'}
+
+
+def count_users_by_branch():
+    """
+    Count users per branch in one grouped query.
+
+    The *_count fields count users by role, for the branch lists; the *_profiles
+    fields count the users with a TeacherInfo, StudentInfo or ParentInfo row,
+    which is what the dashboard has always shown.
+    """
+    return list(CustomUser.objects
+        .values('branch_name')
+        .annotate(
+            teacher_count=Count('id', filter=Q(role='teacher')),
+            student_count=Count('id', filter=Q(role='student')),
+            parent_count=Count('id', filter=Q(role='parent')),
+            public_count=Count('id', filter=Q(role='public')),
+            teacher_profiles=Count('user_info__teacher_info'),
+            student_profiles=Count('user_info__student_info'),
+            parent_profiles=Count('user_info__parent_info'),
+            active_users=Count('id', filter=Q(is_active=True)),
+            total_users=Count('id'),
+        )
+        .order_by('branch_name'))
+
+
+def get_branch_user_counts():
+    """Return the per-branch role counts, computing them at most once per change"""
+    counts = cache.get(BRANCH_COUNTS_CACHE_KEY)
+    if counts is None:
+        counts = count_users_by_branch()
+        cache.set(BRANCH_COUNTS_CACHE_KEY, counts, BRANCH_COUNTS_CACHE_TIMEOUT)
+    return counts
+
+
+def get_role_totals():
+    """Sum the branch counts into school-wide totals"""
+    fields = ('teacher_count', 'student_count', 'parent_count', 'public_count',
+              'teacher_profiles', 'student_profiles', 'parent_profiles', 'active_users', 'total_users')
+    totals = dict.fromkeys(fields, 0)
+    for branch in get_branch_user_counts():
+        for field in fields:
+            totals[field] += branch[field]
+    return totals
+
+
+def invalidate_branch_user_counts():
+    cache.delete(BRANCH_COUNTS_CACHE_KEY)
+
+
+def invalidate_branch_user_counts_on_commit():
+    """Drop the cached counts when the current transaction commits, once per savepoint however many rows it touches"""
+    savepoint_ids = set(connection.savepoint_ids)
+    if not any(func is invalidate_branch_user_counts and sids == savepoint_ids
+               for sids, func, _ in connection.run_on_commit):
+        transaction.on_commit(invalidate_branch_user_counts)
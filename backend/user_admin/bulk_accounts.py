@@ -0,0 +1,130 @@
+import math
+import multiprocessing
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from api.models import CustomUser
+from .branch_counts import invalidate_branch_user_counts_on_commit
+from .models.account_models import ParentInfo, StudentInfo, TeacherInfo, UserInfo
+
+# Below this many passwords per worker, starting processes costs more than it saves
+PARALLEL_HASH_THRESHOLD = 50
+BULK_BATCH_SIZE = 500
+
+
+def _hash_chunk(passwords):
+    return [make_password(password) for password in passwords]
+
+
+def available_cpus():
+    """CPUs this process may run on, which in a container can be far fewer than the host has"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def hash_passwords(passwords):
+    """Hash passwords with the configured hasher, spreading large batches over worker processes"""
+    workers = min(available_cpus(), math.ceil(len(passwords) / PARALLEL_HASH_THRESHOLD))
+    if workers <= 1:
+        return _hash_chunk(passwords)
+
+    size = math.ceil(len(passwords) / workers)
+    chunks = [passwords[i:i + size] for i in range(0, len(passwords), size)]
+    # Spawned rather than forked: the server process may hold locks in other threads
+    with ProcessPoolExecutor(max_workers=len(chunks), mp_context=multiprocessing.get_context('spawn'),
+                             initializer=django.setup) as pool:
+        return [hashed for chunk in pool.map(_hash_chunk, chunks) for hashed in chunk]
+
+
+def find_taken_usernames(usernames):
+    """Return the usernames that repeat within the batch or already belong to a user"""
+    repeated = {username for username, count in Counter(usernames).items() if count > 1}
+    existing = set(CustomUser.objects.filter(username__in=usernames).values_list('username', flat=True))
+    return sorted(repeated | existing)
+
+
+def create_accounts(accounts):
+    """
+    Create users with their UserInfo and role info in one transaction.
+
+    `accounts` are dicts with username, password, role and branch_name; students
+    also carry parent_username and parent_password for their linked parent account.
+    Optional keys fill in the profile: first_name, last_name, contact_no, and for
+    students grade_level, has_special_needs, parent_first_name, parent_last_name
+    and parent_contact_no.
+    Returns (users, parent_users, elapsed seconds) where parent_users[i] is the
+    parent of the i-th student in `accounts`.
+    """
+    started = time.perf_counter()
+    students = [account for account in accounts if account['role'] == 'student']
+    rows = accounts + [
+        {
+            'username': account['parent_username'],
+            'password': account['parent_password'],
+            'role': 'parent',
+            'branch_name': account['branch_name'],
+            'first_name': account.get('parent_first_name', ''),
+            'last_name': account.get('parent_last_name', ''),
+            'contact_no': account.get('parent_contact_no'),
+        }
+        for account in students
+    ]
+
+    hashed = hash_passwords([row['password'] for row in rows])
+    users = [
+        CustomUser(
+            username=row['username'],
+            password=password,
+            role=row['role'],
+            branch_name=row['branch_name'],
+            first_name=row.get('first_name', ''),
+            last_name=row.get('last_name', ''),
+        )
+        for row, password in zip(rows, hashed)
+    ]
+
+    with transaction.atomic():
+        CustomUser.objects.bulk_create(users, batch_size=BULK_BATCH_SIZE)
+        user_infos = UserInfo.objects.bulk_create(
+            [UserInfo(user=user, contact_no=row.get('contact_no')) for row, user in zip(rows, users)],
+            batch_size=BULK_BATCH_SIZE
+        )
+
+        TeacherInfo.objects.bulk_create(
+            [TeacherInfo(teacher_info=info) for info in user_infos[:len(accounts)] if info.user.role == 'teacher'],
+            batch_size=BULK_BATCH_SIZE
+        )
+        student_infos = StudentInfo.objects.bulk_create(
+            [
+                StudentInfo(
+                    student_info=info,
+                    grade_level=account.get('grade_level'),
+                    has_special_needs=account.get('has_special_needs', False),
+                )
+                for account, info in zip(accounts, user_infos) if account['role'] == 'student'
+            ],
+            batch_size=BULK_BATCH_SIZE
+        )
+        parent_infos = ParentInfo.objects.bulk_create(
+            [ParentInfo(parent_info=info) for info in user_infos[len(accounts):]],
+            batch_size=BULK_BATCH_SIZE
+        )
+        ParentStudent = ParentInfo.student_info.through
+        ParentStudent.objects.bulk_create(
+            [
+                ParentStudent(parentinfo_id=parent_info.id, studentinfo_id=student_info.id)
+                for parent_info, student_info in zip(parent_infos, student_infos)
+            ],
+            batch_size=BULK_BATCH_SIZE
+        )
+        # bulk_create skips the save signals that keep the branch counts fresh
+        invalidate_branch_user_counts_on_commit()
+
+    return users[:len(accounts)], users[len(accounts):], time.perf_counter() - started
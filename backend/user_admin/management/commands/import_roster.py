@@ -0,0 +1,36 @@
+import csv
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from user_admin.roster_import import REPORT_HEADER, ROSTER_CHUNK_SIZE, RosterError, import_roster, read_roster
+
+
+class Command(BaseCommand):
+    help = 'Creates student and parent accounts from a CSV roster (name, grade level, branch, special needs, parent contact)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help='Roster CSV file')
+        parser.add_argument('--report', help='Where to write the per-row report (default: stdout)')
+        parser.add_argument('--chunk-size', type=int, default=ROSTER_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        stats = {}
+        report_file = open(options['report'], 'w', newline='') if options['report'] else sys.stdout
+        try:
+            with open(options['csv_file'], newline='', encoding='utf-8-sig') as roster:
+                try:
+                    rows = read_roster(roster)
+                except RosterError as e:
+                    raise CommandError(str(e))
+
+                writer = csv.writer(report_file)
+                writer.writerow(REPORT_HEADER)
+                for row in import_roster(rows, chunk_size=options['chunk_size'], stats=stats):
+                    writer.writerow(row)
+        finally:
+            if report_file is not sys.stdout:
+                report_file.close()
+
+        self.stderr.write(self.style.SUCCESS(
+            f"Created {stats['created']} students, {stats['failed']} rows failed ({stats['elapsed']:.1f}s)"
+        ))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from user_admin.models.account_models import UserDeletionJob
+from user_admin.user_deletion import process_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Run pending user deletion jobs, e.g. ones left behind when the server restarted'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requeue-running',
+            action='store_true',
+            help='Reset jobs stuck in "running" (their worker died) back to pending first',
+        )
+
+    def handle(self, *args, **options):
+        if options['requeue_running']:
+            requeued = UserDeletionJob.objects.filter(status='running').update(status='pending', processed=0)
+            self.stdout.write(f'Requeued {requeued} running jobs')
+
+        pending = UserDeletionJob.objects.filter(status='pending').count()
+        process_pending_jobs()
+        self.stdout.write(self.style.SUCCESS(f'Processed {pending} user deletion jobs'))
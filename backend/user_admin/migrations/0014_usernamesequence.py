@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_admin', '0013_remove_parentinfo_has_special_needs_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsernameSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefix', models.CharField(max_length=10)),
+                ('year', models.PositiveSmallIntegerField()),
+                ('last_value', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('prefix', 'year'), name='unique_username_sequence')],
+            },
+        ),
+    ]
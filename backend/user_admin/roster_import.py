@@ -0,0 +1,196 @@
+import csv
+import time
+from itertools import islice
+
+from django.db import IntegrityError
+
+from .bulk_accounts import create_accounts, find_taken_usernames
+from .models.account_models import GRADE_LEVEL_CHOICES
+from .serializers.accounts.create_account_serializers import AccountGenerator
+from .usernames import allocate_usernames
+
+ROSTER_CHUNK_SIZE = 500
+REQUIRED_COLUMNS = ('name', 'grade_level', 'branch_name')
+REPORT_HEADER = ['row', 'status', 'name', 'username', 'password', 'parent_username', 'parent_password', 'errors']
+
+# Header spellings accepted for each column
+COLUMN_ALIASES = {
+    'name': 'name',
+    'student_name': 'name',
+    'grade': 'grade_level',
+    'grade_level': 'grade_level',
+    'branch': 'branch_name',
+    'branch_name': 'branch_name',
+    'special_needs': 'has_special_needs',
+    'has_special_needs': 'has_special_needs',
+    'parent_contact': 'parent_contact_no',
+    'parent_contact_no': 'parent_contact_no',
+    'parent': 'parent_name',
+    'parent_name': 'parent_name',
+    'guardian': 'parent_name',
+}
+
+GRADE_LEVELS = {value.lower(): value for value, _ in GRADE_LEVEL_CHOICES}
+TRUE_VALUES = {'1', 'true', 'yes', 'y'}
+FALSE_VALUES = {'', '0', 'false', 'no', 'n'}
+
+
+class RosterError(ValueError):
+    pass
+
+
+def _column(header):
+    return COLUMN_ALIASES.get(header.strip().lower().replace(' ', '_').replace('-', '_'))
+
+
+def split_name(name):
+    """Split "Last, First" or "First Last" into (first_name, last_name)"""
+    if ',' in name:
+        last_name, first_name = name.split(',', 1)
+    else:
+        first_name, _, last_name = name.rpartition(' ')
+        if not first_name:
+            first_name, last_name = last_name, ''
+    return first_name.strip(), last_name.strip()
+
+
+def validate_row(row):
+    """Return (account, errors) for one CSV row mapped to column names"""
+    errors = []
+    name = (row.get('name') or '').strip()
+    if not name:
+        errors.append('name is required')
+    first_name, last_name = split_name(name)
+    if len(first_name) > 150 or len(last_name) > 150:
+        errors.append('name is too long')
+
+    grade_level = GRADE_LEVELS.get((row.get('grade_level') or '').strip().lower())
+    if grade_level is None:
+        errors.append(f"grade_level must be one of: {', '.join(GRADE_LEVELS.values())}")
+
+    branch_name = (row.get('branch_name') or '').strip()
+    if not branch_name:
+        errors.append('branch_name is required')
+    elif len(branch_name) > 50:
+        errors.append('branch_name is too long')
+
+    flag = (row.get('has_special_needs') or '').strip().lower()
+    if flag not in TRUE_VALUES | FALSE_VALUES:
+        errors.append('special_needs must be yes or no')
+
+    parent_contact_no = (row.get('parent_contact_no') or '').strip() or None
+    if parent_contact_no and len(parent_contact_no) > 20:
+        errors.append('parent_contact is too long')
+
+    # Without a parent name column the parent at least shares the student's family name
+    parent_name = (row.get('parent_name') or '').strip()
+    parent_first_name, parent_last_name = split_name(parent_name) if parent_name else ('', last_name)
+    if len(parent_first_name) > 150 or len(parent_last_name) > 150:
+        errors.append('parent_name is too long')
+
+    return {
+        'role': 'student',
+        'first_name': first_name,
+        'last_name': last_name,
+        'grade_level': grade_level,
+        'branch_name': branch_name,
+        'has_special_needs': flag in TRUE_VALUES,
+        'parent_first_name': parent_first_name,
+        'parent_last_name': parent_last_name,
+        'parent_contact_no': parent_contact_no,
+    }, errors
+
+
+def read_roster(lines):
+    """
+    Return a row iterator for CSV text lines, mapping headers to column names.
+
+    Raises RosterError when the header is missing a required column.
+    """
+    reader = csv.reader(lines)
+    try:
+        header = next(reader)
+    except StopIteration:
+        raise RosterError('The file is empty')
+
+    columns = [_column(name) for name in header]
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+    if missing:
+        raise RosterError(f"Missing columns: {', '.join(missing)}")
+
+    def rows():
+        for values in reader:
+            if any(value.strip() for value in values):
+                yield reader.line_num, {column: value for column, value in zip(columns, values) if column}
+    return rows()
+
+
+def _report(line, status, account, errors=()):
+    return [
+        line,
+        status,
+        f"{account['first_name']} {account['last_name']}".strip(),
+        account.get('username', ''),
+        account.get('password', ''),
+        account.get('parent_username', ''),
+        account.get('parent_password', ''),
+        '; '.join(errors),
+    ]
+
+
+def _import_chunk(chunk):
+    valid = [(line, account) for line, account, errors in chunk if not errors]
+    results = {line: _report(line, 'error', account, errors) for line, account, errors in chunk if errors}
+
+    if valid:
+        usernames = allocate_usernames('student', len(valid))
+        parent_usernames = allocate_usernames('parent', len(valid))
+        for (line, account), username, parent_username in zip(valid, usernames, parent_usernames):
+            account['username'] = username
+            account['password'] = AccountGenerator().generate_password('student')
+            account['parent_username'] = parent_username
+            account['parent_password'] = AccountGenerator().generate_password('parent')
+
+        taken = set(find_taken_usernames(
+            [account['username'] for _, account in valid] + [account['parent_username'] for _, account in valid]
+        ))
+        accounts = []
+        for line, account in valid:
+            if account['username'] in taken or account['parent_username'] in taken:
+                results[line] = _report(line, 'error', account, ['username already exists'])
+            else:
+                accounts.append((line, account))
+
+        try:
+            if accounts:
+                create_accounts([account for _, account in accounts])
+            for line, account in accounts:
+                results[line] = _report(line, 'created', account)
+        except IntegrityError as e:
+            for line, account in accounts:
+                results[line] = _report(line, 'error', account, [f'Could not save this chunk: {e}'])
+
+    return [results[line] for line, _, _ in chunk]
+
+
+def import_roster(rows, chunk_size=ROSTER_CHUNK_SIZE, stats=None):
+    """
+    Create student and parent accounts from roster rows, yielding one report row per input row.
+
+    Rows are validated and inserted `chunk_size` at a time, each chunk in its own
+    transaction, so memory stays bounded by the chunk whatever the file size.
+    Invalid rows are reported and skipped without affecting the rest of the chunk.
+    `stats`, if given, is a dict updated with created/failed counts and elapsed seconds.
+    """
+    stats = stats if stats is not None else {}
+    stats.update(created=0, failed=0, elapsed=0)
+    started = time.perf_counter()
+
+    while True:
+        chunk = [(line, *validate_row(row)) for line, row in islice(rows, chunk_size)]
+        if not chunk:
+            break
+        for report in _import_chunk(chunk):
+            stats['created' if report[1] == 'created' else 'failed'] += 1
+            yield report
+        stats['elapsed'] = time.perf_counter() - started
@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.utils.text import slugify
 from api.models import CustomUser, UserRole
 from ...models.account_models import *
+from ...usernames import allocate_usernames
 import random
 import datetime
 
@@ -16,26 +17,10 @@ class AccountGenerator:
 
     # Generate a unique username based on the user's role and current year
     def generate_username(self, role, random_part=None):
-        current_year = datetime.datetime.now().year % 100
-        username_role_map = {
-            'teacher': 'TCH',
-            'student': 'STU',
-            'parent': 'PAR',
-            'public': 'PUB', # must be delete before deploying
-        }
-
-        username_role = username_role_map.get(role, 'PUB')
-
         if random_part is None:
-            username = slugify(f"{username_role}-{current_year}-{self.random_number}")
-
-            # Ensure the username is unique by checking against existing usernames
-            while CustomUser.objects.filter(username=username).exists():
-                self.random_number = random.randint(1000, 9999)
-                username = slugify(f"{role}-{current_year}-{self.random_number}")
-
-            return username # Ex: tch-24-1234
+            return allocate_usernames(role)[0] # Ex: tch-24-000123
         else:
+            current_year = datetime.datetime.now().year % 100
             return slugify(f"{role}-{current_year}-{random_part}")
     
     # Generate a password based on the user's role
@@ -56,25 +41,26 @@ class CreateAccountSerializer(serializers.ModelSerializer):
         fields = ('role', 'branch_name', 'generated_username', 'generated_password', 'account_count')
 
     def generate_account(self, validated_data):
-        role = validated_data['role']
+        return self.generate_accounts(validated_data, 1)[0]
 
-        account_generator = AccountGenerator()
+    # Generate several accounts, reserving all their usernames at once
+    def generate_accounts(self, validated_data, count):
+        role = validated_data['role']
 
-        username = account_generator.generate_username(role)
-        password = account_generator.generate_password(role)
-        parent_username = None
-        parent_password = None
+        usernames = allocate_usernames(role, count)
+        parent_usernames = allocate_usernames("parent", count) if role == "student" else [None] * count
 
-        if(role == "student"):
-            parent_username = account_generator.generate_username("parent")
-            parent_password = account_generator.generate_password("parent")
+        accounts = []
+        for username, parent_username in zip(usernames, parent_usernames):
+            account_generator = AccountGenerator()
+            accounts.append({
+                'generated_username': username,
+                'generated_password': account_generator.generate_password(role),
+                'parent_username': parent_username,
+                'parent_password': AccountGenerator().generate_password("parent") if parent_username else None
+            })
 
-        return {
-            'generated_username': username,
-            'generated_password': password,
-            'parent_username': parent_username,
-            'parent_password': parent_password
-        }
+        return accounts
 
     # Create a new user account
     def create(self, validated_data):
@@ -6,7 +6,30 @@ import logging
 
 # logger = logging.getLogger(__name__)
 
-class TeacherListSerializer(serializers.ModelSerializer):
+class ValuesListMixin:
+    """
+    Fast read path for listings: fetch `values_fields` with .values() and shape each
+    row the way the serializer would, skipping per-field serializer overhead.
+    """
+    values_fields = ()
+
+    @classmethod
+    def values_queryset(cls, queryset, *extra_fields):
+        # Prefetches only apply to model instances
+        return queryset.prefetch_related(None).values(*cls.values_fields, *extra_fields)
+
+    @classmethod
+    def rows(cls, values):
+        return [cls.row(value) for value in values]
+
+    @staticmethod
+    def user_info(value):
+        return {
+            'id': value['user_info__id'],
+            'contact_no': value['user_info__contact_no']
+        }
+
+class TeacherListSerializer(ValuesListMixin, serializers.ModelSerializer):
     user_info = serializers.SerializerMethodField()
     teacher_info = serializers.SerializerMethodField()
 
@@ -29,7 +52,28 @@ class TeacherListSerializer(serializers.ModelSerializer):
         model = CustomUser
         fields = ('id', 'first_name', 'last_name', 'username', 'email', 'branch_name', 'user_info', 'teacher_info')
 
-class StudentListSerializer(serializers.ModelSerializer):
+    values_fields = (
+        'id', 'first_name', 'last_name', 'username', 'email', 'branch_name', 'user_info__id', 'user_info__contact_no',
+        'user_info__teacher_info__id', 'user_info__teacher_info__staff_position',
+    )
+
+    @classmethod
+    def row(cls, value):
+        return {
+            'id': value['id'],
+            'first_name': value['first_name'],
+            'last_name': value['last_name'],
+            'username': value['username'],
+            'email': value['email'],
+            'branch_name': value['branch_name'],
+            'user_info': cls.user_info(value),
+            'teacher_info': {
+                'id': value['user_info__teacher_info__id'],
+                'staff_position': value['user_info__teacher_info__staff_position']
+            },
+        }
+
+class StudentListSerializer(ValuesListMixin, serializers.ModelSerializer):
     user_info = serializers.SerializerMethodField()
     student_info = serializers.SerializerMethodField()
     
@@ -62,7 +106,31 @@ class StudentListSerializer(serializers.ModelSerializer):
         model = CustomUser
         fields = ('id', 'first_name', 'last_name', 'username', 'email', 'branch_name', 'user_info', 'student_info')
 
-class ParentListSerializer(serializers.ModelSerializer):
+    values_fields = (
+        'id', 'first_name', 'last_name', 'username', 'email', 'branch_name', 'user_info__id', 'user_info__contact_no',
+        'user_info__student_info__id', 'user_info__student_info__grade_level',
+        'user_info__student_info__has_special_needs', 'user_info__student_info__special_needs_details',
+    )
+
+    @classmethod
+    def row(cls, value):
+        return {
+            'id': value['id'],
+            'first_name': value['first_name'],
+            'last_name': value['last_name'],
+            'username': value['username'],
+            'email': value['email'],
+            'branch_name': value['branch_name'],
+            'user_info': cls.user_info(value),
+            'student_info': {
+                'id': value['user_info__student_info__id'],
+                'grade_level': value['user_info__student_info__grade_level'],
+                'has_special_needs': value['user_info__student_info__has_special_needs'],
+                'special_needs_details': value['user_info__student_info__special_needs_details']
+            },
+        }
+
+class ParentListSerializer(ValuesListMixin, serializers.ModelSerializer):
     parent_info_id = serializers.IntegerField(source='user_info.parent_info.id', read_only=True)
     user_info = serializers.SerializerMethodField()
     student_info = serializers.SerializerMethodField()
@@ -82,7 +150,7 @@ class ParentListSerializer(serializers.ModelSerializer):
             for student_info in parent_info.student_info.all():
                 user_info = student_info.student_info
                 
-                custom_user_id = user_info.user.id if user_info and user_info.user else None
+                custom_user_id = user_info.user_id if user_info else None
                 
                 student_info_list.append({
                     'student_user_id': custom_user_id,
@@ -96,7 +164,46 @@ class ParentListSerializer(serializers.ModelSerializer):
         model = CustomUser
         fields = ('id', 'parent_info_id', 'first_name', 'last_name', 'username', 'email', 'branch_name', 'user_info', 'student_info')
 
-class PublicUserListSerializer(serializers.ModelSerializer):
+    values_fields = (
+        'id', 'user_info__parent_info__id', 'first_name', 'last_name', 'username', 'email', 'branch_name',
+        'user_info__id', 'user_info__contact_no',
+    )
+
+    @classmethod
+    def rows(cls, values):
+        # The linked students of the whole batch come from one query on the link table
+        values = list(values)
+        students = {}
+        links = (ParentInfo.student_info.through.objects
+            .filter(parentinfo_id__in=[value['user_info__parent_info__id'] for value in values])
+            .order_by('studentinfo_id')
+            .values_list('parentinfo_id', 'studentinfo__student_info__user_id', 'studentinfo_id', 'studentinfo__grade_level'))
+        for parent_info_id, student_user_id, student_info_id, grade_level in links:
+            students.setdefault(parent_info_id, []).append({
+                'student_user_id': student_user_id,
+                'student_info_id': student_info_id,
+                'grade_level': grade_level
+            })
+
+        rows = []
+        for value in values:
+            parent_info_id = value['user_info__parent_info__id']
+            row = {'id': value['id']}
+            if parent_info_id is not None:
+                row['parent_info_id'] = parent_info_id
+            row.update({
+                'first_name': value['first_name'],
+                'last_name': value['last_name'],
+                'username': value['username'],
+                'email': value['email'],
+                'branch_name': value['branch_name'],
+                'user_info': cls.user_info(value),
+                'student_info': students.get(parent_info_id, []) if parent_info_id is not None else None,
+            })
+            rows.append(row)
+        return rows
+
+class PublicUserListSerializer(ValuesListMixin, serializers.ModelSerializer):
     user_info = serializers.SerializerMethodField()
 
     def get_user_info (self, instance):
@@ -108,4 +215,17 @@ class PublicUserListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = CustomUser
-        fields = ('id', 'first_name', 'last_name', 'username', 'email', 'user_info')
\ No newline at end of file
+        fields = ('id', 'first_name', 'last_name', 'username', 'email', 'user_info')
+
+    values_fields = ('id', 'first_name', 'last_name', 'username', 'email', 'user_info__id', 'user_info__contact_no')
+
+    @classmethod
+    def row(cls, value):
+        return {
+            'id': value['id'],
+            'first_name': value['first_name'],
+            'last_name': value['last_name'],
+            'username': value['username'],
+            'email': value['email'],
+            'user_info': cls.user_info(value),
+        }
@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.models import CustomUser
+from .branch_counts import COUNTED_FIELDS, invalidate_branch_user_counts_on_commit
+from .models.account_models import ParentInfo, StudentInfo, TeacherInfo
+
+
+@receiver(post_save, sender=CustomUser)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Logins save last_login alone, which doesn't move any count
+    if not created and update_fields is not None and not COUNTED_FIELDS & set(update_fields):
+        return
+    invalidate_branch_user_counts_on_commit()
+
+
+@receiver(post_delete, sender=CustomUser)
+def user_deleted(sender, instance, **kwargs):
+    invalidate_branch_user_counts_on_commit()
+
+
+@receiver(post_save, sender=TeacherInfo)
+@receiver(post_save, sender=StudentInfo)
+@receiver(post_save, sender=ParentInfo)
+def profile_saved(sender, instance, created, **kwargs):
+    # The dashboard counts profile rows, which only move on create and delete
+    if created:
+        invalidate_branch_user_counts_on_commit()
+
+
+@receiver(post_delete, sender=TeacherInfo)
+@receiver(post_delete, sender=StudentInfo)
+@receiver(post_delete, sender=ParentInfo)
+def profile_deleted(sender, instance, **kwargs):
+    invalidate_branch_user_counts_on_commit()
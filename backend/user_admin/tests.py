@@ -1,3 +1,428 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from api.models import CustomUser
+from user_admin import roster_import
+from user_admin.branch_counts import invalidate_branch_user_counts
+from user_admin.bulk_accounts import create_accounts
+from user_admin.models.account_models import (
+    ParentInfo, PublicInfo, StudentInfo, TeacherInfo, UserDeletionJob, UserInfo, UsernameSequence
+)
+from user_admin.serializers.accounts.list_account_serializers import (
+    ParentListSerializer, PublicUserListSerializer, StudentListSerializer, TeacherListSerializer,
+)
+from user_admin.usernames import allocate_usernames
+from user_admin.user_deletion import collect_user_ids, delete_users, run_deletion_job
+from user_admin.views.account.account_views_list import (
+    ParentListView, PublicUserListView, StudentListView, TeacherListView,
+)
+from user_teacher.models.classroom_models import Classroom
+from user_teacher.models.quizzes_models import Question, QuestionStats, Quiz, QuizScore, ResponseItem, StudentResponse
+
+LISTS = [
+    ('/user-admin/teacher-list/', TeacherListView, TeacherListSerializer),
+    ('/user-admin/student-list/', StudentListView, StudentListSerializer),
+    ('/user-admin/parent-list/', ParentListView, ParentListSerializer),
+    ('/user-admin/public-user-list/', PublicUserListView, PublicUserListSerializer),
+]
+
+
+class AccountListQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create(username='admin', role='admin', is_staff=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def add_accounts(self, count):
+        start = CustomUser.objects.count()
+        for index in range(start, start + count):
+            teacher = CustomUser.objects.create(username=f'tch-{index}', first_name=f'T{index}', role='teacher')
+            TeacherInfo.objects.create(teacher_info=UserInfo.objects.create(user=teacher, contact_no='0917'))
+
+            student = CustomUser.objects.create(username=f'stu-{index}', first_name=f'S{index}', role='student')
+            student_info = StudentInfo.objects.create(
+                student_info=UserInfo.objects.create(user=student), grade_level='Grade 1'
+            )
+            sibling = CustomUser.objects.create(username=f'stu-{index}-b', role='student')
+            sibling_info = StudentInfo.objects.create(student_info=UserInfo.objects.create(user=sibling))
+
+            parent = CustomUser.objects.create(username=f'par-{index}', first_name=f'P{index}', role='parent')
+            parent_info = ParentInfo.objects.create(parent_info=UserInfo.objects.create(user=parent))
+            parent_info.student_info.set([student_info, sibling_info])
+
+            public = CustomUser.objects.create(username=f'pub-{index}', role='public')
+            PublicInfo.objects.create(user_info=UserInfo.objects.create(user=public))
+
+    def view_queryset(self, view_class, url):
+        view = view_class(request=Request(APIRequestFactory().get(url)), format_kwarg=None, kwargs={})
+        return view.get_queryset()
+
+    def count_queries(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries.captured_queries)
+
+    def test_list_queries_do_not_grow_with_rows(self):
+        for params in ({}, {'page_size': 50}, {'search': 'p'}):
+            self.add_accounts(3)
+            small = {url: self.count_queries(url, params) for url, _, _ in LISTS}
+            self.add_accounts(12)
+            for url, _, _ in LISTS:
+                with self.subTest(url=url, params=params):
+                    self.assertEqual(self.count_queries(url, params), small[url])
+
+    def test_fast_rows_match_serializer(self):
+        self.add_accounts(4)
+        ParentInfo.objects.create(parent_info=UserInfo.objects.create(
+            user=CustomUser.objects.create(username='par-unlinked', role='parent')
+        ))
+        for url, view_class, serializer_class in LISTS:
+            with self.subTest(url=url):
+                queryset = self.view_queryset(view_class, url).order_by('-date_joined', '-id')
+                expected = serializer_class(queryset, many=True).data
+                self.assertEqual(serializer_class.rows(serializer_class.values_queryset(queryset)), expected)
+
+    def pages(self, url, params):
+        rows, cursor = [], None
+        while True:
+            response = self.client.get(url, {**params, **({'cursor': cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            rows.extend(row['id'] for row in data['teacher_list'])
+            cursor = data['next_cursor']
+            if cursor is None:
+                return rows
+
+    def test_keyset_pages_cover_the_list_once(self):
+        self.add_accounts(7)
+        url = '/user-admin/teacher-list/'
+        newest_first = [row['id'] for row in self.client.get(url).json()['teacher_list']]
+        self.assertEqual(len(newest_first), 7)
+
+        self.assertEqual(self.pages(url, {'page_size': 3}), newest_first)
+        self.assertEqual(self.pages(url, {'page_size': 3, 'ordering': 'date_joined'}), newest_first[::-1])
+        searched = [row['id'] for row in self.client.get(url, {'search': 'T1'}).json()['teacher_list']]
+        self.assertEqual(self.pages(url, {'page_size': 1, 'search': 'T1'}), searched)
+
+    def test_orderings_the_key_cannot_follow_are_rejected(self):
+        url = '/user-admin/teacher-list/'
+        for params in ({'page_size': 3, 'ordering': 'first_name'}, {'export': 'ndjson', 'ordering': 'first_name'}):
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('ordering must be one of', response.json()['error'])
+        self.assertEqual(self.client.get(url, {'ordering': 'first_name'}).status_code, 200)
+
+    def test_ndjson_export_streams_every_row(self):
+        self.add_accounts(3)
+        for url, _, _ in LISTS:
+            with self.subTest(url=url):
+                listed = next(value for key, value in self.client.get(url).json().items() if key.endswith('_list'))
+                response = self.client.get(url, {'export': 'ndjson'})
+                self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+                lines = b''.join(response.streaming_content).decode().splitlines()
+                self.assertEqual([json.loads(line) for line in lines], listed)
+
+    def test_serializer_plan_queries_do_not_grow_with_rows(self):
+        # The serializers themselves stay N+1 free with the views' select/prefetch plans
+        for url, view_class, serializer_class in LISTS:
+            counts = []
+            for count in (2, 8):
+                self.add_accounts(count)
+                queryset = self.view_queryset(view_class, url)
+                with CaptureQueriesContext(connection) as queries:
+                    serializer_class(queryset, many=True).data
+                counts.append(len(queries.captured_queries))
+            with self.subTest(url=url):
+                self.assertEqual(counts[0], counts[1])
+
+
+class UserDeletionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def make_student(self, username):
+        user = CustomUser.objects.create(username=username, role='student')
+        StudentInfo.objects.create(student_info=UserInfo.objects.create(user=user))
+        return user
+
+    def make_parent(self, username, students):
+        user = CustomUser.objects.create(username=username, role='parent')
+        parent = ParentInfo.objects.create(parent_info=UserInfo.objects.create(user=user))
+        parent.student_info.set([student.user_info.student_info for student in students])
+        return user
+
+    def test_parent_kept_while_a_sibling_remains(self):
+        first, second = self.make_student('stu-1'), self.make_student('stu-2')
+        self.make_parent('par-1', [first, second])
+        self.assertEqual(collect_user_ids([first.id]), [first.id])
+
+    def test_parent_removed_with_their_last_student(self):
+        first, second = self.make_student('stu-1'), self.make_student('stu-2')
+        parent = self.make_parent('par-1', [first, second])
+        self.assertEqual(
+            collect_user_ids([first.id, second.id]),
+            sorted([first.id, second.id, parent.id]),
+        )
+
+    def test_deleting_a_parent_removes_their_students(self):
+        first, second = self.make_student('stu-1'), self.make_student('stu-2')
+        parent = self.make_parent('par-1', [first, second])
+        self.assertEqual(
+            collect_user_ids([parent.id]),
+            sorted([first.id, second.id, parent.id]),
+        )
+
+    def test_chunks_delete_submissions_and_rebuild_stats(self):
+        teacher_user = CustomUser.objects.create(username='tch-1', role='teacher')
+        teacher = TeacherInfo.objects.create(teacher_info=UserInfo.objects.create(user=teacher_user))
+        classroom = Classroom.objects.create(class_instructor=teacher, grade_level='Grade 1', class_section='A', subject_name='MATH')
+        quiz = Quiz.objects.create(classroom=classroom, title='Quiz', created_by=teacher, due_date=timezone.now())
+        question = Question.objects.create(quiz=quiz, text='Question', question_type='true_false', correct_answer='true')
+
+        students = [self.make_student(f'stu-{index}') for index in range(5)]
+        for student in (user.user_info.student_info for user in students):
+            response = StudentResponse.objects.create(student=student, quiz=quiz, classroom=classroom, responses={str(question.id): 'true'})
+            QuizScore.objects.create(student=student, quiz=quiz, classroom=classroom, student_response=response, total_score=1, total_possible=1, percentage_score=100, status='passed')
+            ResponseItem.objects.create(student_response=response, question=question, question_type='true_false', answer='true', is_correct=True)
+        QuestionStats.objects.create(question=question, attempts=5, correct=5)
+
+        progress = []
+        deleted = delete_users([student.id for student in students[:3]], chunk_size=2, on_progress=progress.append)
+
+        self.assertEqual((deleted, progress), (3, [2, 3]))
+        self.assertEqual(StudentResponse.objects.count(), 2)
+        self.assertEqual(QuizScore.objects.count(), 2)
+        self.assertEqual(ResponseItem.objects.count(), 2)
+        stats = QuestionStats.objects.get(question=question)
+        self.assertEqual((stats.attempts, stats.correct), (2, 2))
+
+    def test_job_runs_every_chunk(self):
+        user_ids = [self.make_student(f'stu-{index}').id for index in range(3)]
+        job = UserDeletionJob.objects.create(user_ids=user_ids, total=len(user_ids))
+        run_deletion_job(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed), ('completed', 3))
+        self.assertFalse(CustomUser.objects.filter(pk__in=user_ids).exists())
+
+    def test_status_visible_to_admins_and_the_requester_only(self):
+        admin = CustomUser.objects.create(username='admin', role='admin')
+        requester = CustomUser.objects.create(username='tch-1', role='teacher')
+        job = UserDeletionJob.objects.create(requested_by=requester, user_ids=[1, 2], total=2)
+        url = f'/user-admin/custom-user/delete/status/{job.id}/'
+
+        for user, expected in ((admin, 200), (requester, 200), (self.make_student('stu-1'), 403)):
+            self.client.force_authenticate(user)
+            with self.subTest(user=user.username):
+                self.assertEqual(self.client.get(url).status_code, expected)
+
+        self.client.force_authenticate(admin)
+        self.assertEqual(self.client.get('/user-admin/custom-user/delete/status/999999/').status_code, 404)
+
+
+class AccountCreationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(CustomUser.objects.create(username='admin', role='admin'))
+
+    def test_created_parents_keep_the_generated_usernames(self):
+        response = self.client.post('/user-admin/generate-account/', {
+            'role': 'student', 'branch_name': 'Bauan', 'account_count': 2
+        }, format='json')
+        generated = response.json()['accounts']
+        self.assertTrue(all(account['parent_username'].startswith('par-') for account in generated))
+
+        response = self.client.post('/user-admin/create-account/', {'accounts': generated}, format='json')
+        self.assertEqual(response.status_code, 201)
+        created = response.json()['accounts']
+        self.assertEqual(
+            [account['parent_username'] for account in created],
+            [account['parent_username'] for account in generated]
+        )
+        for account in generated:
+            parent = CustomUser.objects.get(username=account['parent_username'])
+            self.assertTrue(parent.check_password(account['parent_password']))
+
+    def test_missing_parent_usernames_come_from_the_sequence(self):
+        response = self.client.post('/user-admin/create-account/', {'accounts': [
+            {'role': 'student', 'branch_name': 'Bauan', 'username': 'stu-manual', 'password': 'secret'}
+        ]}, format='json')
+        self.assertEqual(response.status_code, 201)
+        parent_username = response.json()['accounts'][0]['parent_username']
+        self.assertTrue(parent_username.startswith('par-'))
+        self.assertTrue(CustomUser.objects.filter(username=parent_username, role='parent').exists())
+
+
+class RosterImportTests(TestCase):
+    header = 'Name,Grade,Branch,Special Needs,Parent Contact,Parent Name\n'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(CustomUser.objects.create(username='admin', role='admin'))
+
+    def upload(self, text):
+        roster = SimpleUploadedFile('roster.csv', text.encode(), content_type='text/csv')
+        return self.client.post('/user-admin/roster-import/', {'file': roster}, format='multipart')
+
+    def test_report_has_credentials_and_row_errors(self):
+        response = self.upload(self.header + (
+            '"Dela Cruz, Juan",Grade 1,Bauan,yes,0917,"Dela Cruz, Maria"\n'
+            'Ana Reyes,grade 2,Bauan,no,,\n'
+            'Pedro Santos,Grade 13,Bauan,maybe,,\n'
+            ',Grade 1,,,,\n'
+        ))
+        self.assertEqual(response.status_code, 200)
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0], roster_import.REPORT_HEADER)
+        self.assertEqual([(row[0], row[1]) for row in rows[1:]], [('2', 'created'), ('3', 'created'), ('4', 'error'), ('5', 'error')])
+        self.assertIn('grade_level must be one of', rows[3][7])
+        self.assertIn('special_needs must be yes or no', rows[3][7])
+        self.assertIn('name is required', rows[4][7])
+        self.assertIn('branch_name is required', rows[4][7])
+
+        juan, ana = rows[1], rows[2]
+        self.assertTrue(juan[3].startswith('stu-') and juan[5].startswith('par-'))
+        student = CustomUser.objects.get(username=juan[3])
+        self.assertTrue(student.check_password(juan[4]))
+        self.assertEqual((student.first_name, student.last_name), ('Juan', 'Dela Cruz'))
+        self.assertTrue(student.user_info.student_info.has_special_needs)
+
+        parent = CustomUser.objects.get(username=juan[5])
+        self.assertTrue(parent.check_password(juan[6]))
+        self.assertEqual((parent.first_name, parent.last_name, parent.user_info.contact_no), ('Maria', 'Dela Cruz', '0917'))
+        self.assertEqual(
+            list(parent.user_info.parent_info.student_info.all()), [student.user_info.student_info]
+        )
+        # No parent name column value: the parent gets the student's family name
+        self.assertEqual(CustomUser.objects.get(username=ana[5]).last_name, 'Reyes')
+
+    def test_missing_columns_are_rejected(self):
+        response = self.upload('Name,Grade\nJuan,Grade 1\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('branch_name', response.json()['error'])
+
+    def test_each_chunk_commits_on_its_own(self):
+        rows = roster_import.read_roster(io.StringIO(self.header + ''.join(
+            f'Student {n},Grade 1,Bauan,no,,\n' for n in range(5)
+        )))
+        create_accounts = roster_import.create_accounts
+        calls = []
+
+        def fail_second_chunk(accounts):
+            calls.append(len(accounts))
+            if len(calls) == 2:
+                raise IntegrityError('duplicate key')
+            return create_accounts(accounts)
+
+        stats = {}
+        with mock.patch.object(roster_import, 'create_accounts', side_effect=fail_second_chunk):
+            report = list(roster_import.import_roster(rows, chunk_size=2, stats=stats))
+
+        self.assertEqual(calls, [2, 2, 1])
+        self.assertEqual([row[1] for row in report], ['created', 'created', 'error', 'error', 'created'])
+        self.assertIn('Could not save this chunk', report[2][7])
+        self.assertEqual((stats['created'], stats['failed']), (3, 2))
+        self.assertEqual(CustomUser.objects.filter(role='student').count(), 3)
+        self.assertEqual(CustomUser.objects.filter(role='parent').count(), 3)
+
+
+class BranchCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create(username='admin', role='admin', branch_name='Main')
+        teacher = CustomUser.objects.create(username='tch-1', role='teacher', branch_name='Bauan')
+        TeacherInfo.objects.create(teacher_info=UserInfo.objects.create(user=teacher))
+        student = CustomUser.objects.create(username='stu-1', role='student', branch_name='Bauan')
+        StudentInfo.objects.create(student_info=UserInfo.objects.create(user=student))
+        # A student user whose StudentInfo was never created
+        cls.bare_student = CustomUser.objects.create(username='stu-2', role='student', branch_name='Lipa')
+        parent = CustomUser.objects.create(username='par-1', role='parent', branch_name='Lipa')
+        ParentInfo.objects.create(parent_info=UserInfo.objects.create(user=parent))
+        CustomUser.objects.create(username='pub-1', role='public', branch_name='Lipa', is_active=False)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def branch(self, branch_name):
+        return self.client.post('/user-admin/branch/user-list/', {'branch_name': branch_name}, format='json').json()['data']
+
+    def dashboard(self):
+        return self.client.get('/user-admin/dashboard/metrics/').json()
+
+    def test_branches_count_roles_and_the_dashboard_counts_profiles(self):
+        self.assertEqual(self.branch('Lipa'), {
+            'branch_name': 'Lipa', 'teacher_count': 0, 'student_count': 1, 'parent_count': 1, 'total_users': 3
+        })
+        metrics = self.dashboard()
+        self.assertEqual(
+            (metrics['teacher_count'], metrics['student_count'], metrics['parent_count'], metrics['public_user_count']),
+            (1, 1, 1, 1)
+        )
+        self.assertEqual((metrics['total_users'], metrics['active_users']), (6, 5))
+
+    def test_counts_refresh_when_users_and_profiles_change(self):
+        self.assertEqual(self.dashboard()['student_count'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            StudentInfo.objects.create(student_info=UserInfo.objects.create(user=self.bare_student))
+        self.assertEqual(self.dashboard()['student_count'], 2)
+
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            self.bare_student.branch_name = 'Bauan'
+            self.bare_student.save()
+        self.assertEqual(self.branch('Bauan')['student_count'], 2)
+
+        with self.captureOnCommitCallbacks() as callbacks, transaction.atomic():
+            self.bare_student.save(update_fields=['last_login'])
+        self.assertEqual(callbacks, [])
+
+    def test_bulk_creation_invalidates_once(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            create_accounts([
+                {'username': f'stu-new-{n}', 'password': 'secret', 'role': 'student', 'branch_name': 'Lipa',
+                 'parent_username': f'par-new-{n}', 'parent_password': 'secret'}
+                for n in range(3)
+            ])
+        self.assertEqual(callbacks.count(invalidate_branch_user_counts), 1)
+        self.assertEqual(self.branch('Lipa')['student_count'], 4)
+
+
+class UsernameAllocationTests(TestCase):
+    def setUp(self):
+        self.year = datetime.datetime.now().year % 100
+
+    def test_batches_reserve_consecutive_numbers(self):
+        self.assertEqual(allocate_usernames('student', 2), [f'stu-{self.year}-000001', f'stu-{self.year}-000002'])
+        self.assertEqual(allocate_usernames('student'), [f'stu-{self.year}-000003'])
+        # Each role and year has its own sequence
+        self.assertEqual(allocate_usernames('parent'), [f'par-{self.year}-000001'])
+        self.assertEqual(UsernameSequence.objects.get(prefix='STU', year=self.year).last_value, 3)
+
+    def test_existing_usernames_are_skipped(self):
+        CustomUser.objects.create(username=f'tch-{self.year}-000002', role='teacher')
+        CustomUser.objects.create(username=f'tch-{self.year}-000003', role='teacher')
+
+        self.assertEqual(
+            allocate_usernames('teacher', 3),
+            [f'tch-{self.year}-000001', f'tch-{self.year}-000004', f'tch-{self.year}-000005']
+        )
+
+    @override_settings(USERNAME_SUFFIX_DIGITS=4)
+    def test_suffix_digits_setting(self):
+        self.assertEqual(allocate_usernames('teacher'), [f'tch-{self.year}-0001'])
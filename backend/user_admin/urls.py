@@ -6,6 +6,7 @@ from .views.account.account_views_create import *
 from .views.account.account_views_list import *
 from .views.account.account_views_edit import *
 from .views.account.pdf_accounts import *
+from .views.account.roster_import_views import *
 from .views.branches.user_count_views import *
 from .views.profile.admin_profile_views import *
 from .views.events.event_manage_views import *
@@ -21,7 +22,9 @@ urlpatterns = [
     
     path('generate-account/', GenerateAccountView.as_view(), name="generate_account" ),
     path("create-account/", CreateAccountView.as_view(), name='create_account'),
+    path("roster-import/", RosterImportView.as_view(), name='roster_import'),
     path("custom-user/delete/", CustomUserDeleteView.as_view(), name="custom_user_delete"),
+    path("custom-user/delete/status/<int:pk>/", UserDeletionStatusView.as_view(), name="user_deletion_status"),
     path("custom-user/edit/<int:pk>/", CustomUserEditView.as_view(), name='custom_user_edit'),
     path("user-info/edit/<int:pk>/", UserInfoEditView.as_view(), name='user_info_edit'),
     path('user-info/profile-image/', AdminProfileImageView.as_view(), name='admin_profile_image'),
@@ -0,0 +1,186 @@
+import logging
+import threading
+
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from api.models import CustomUser
+from special_education.models import AssessmentResponse, StudentAssessment, StudentCategoryScore, StudentScreeningResult
+from special_education.scoring import rebuild_student_category_scores
+from user_teacher.analytics_cache import GLOBAL_SCOPE, bump_versions_on_commit, quiz_scope, teacher_scope
+from user_teacher.grading.question_stats import rebuild_question_stats
+from user_teacher.models.quizzes_models import (
+    Choice, Question, QuestionStats, Quiz, QuizScore, RegradeJob, ResponseItem, StudentResponse,
+)
+from .models.account_models import ParentInfo, StudentInfo, TeacherInfo, UserDeletionJob
+from .models.notification_models import EventNotification
+
+logger = logging.getLogger(__name__)
+
+USER_DELETION_CHUNK_SIZE = 100
+
+
+def collect_user_ids(user_ids):
+    """
+    Expand the requested users to everything that goes with them.
+
+    Deleting a parent also deletes their students, and a parent is deleted
+    along with their students once none of their students would remain.
+    """
+    requested = dict(CustomUser.objects.filter(pk__in=user_ids).values_list('id', 'role'))
+    parent_ids = [user_id for user_id, role in requested.items() if role == 'parent']
+
+    ParentStudent = ParentInfo.student_info.through
+
+    student_ids = {user_id for user_id, role in requested.items() if role == 'student'}
+    student_ids.update(ParentStudent.objects
+        .filter(parentinfo__parent_info__user_id__in=parent_ids)
+        .values_list('studentinfo__student_info__user_id', flat=True))
+
+    remaining_students = ParentStudent.objects.filter(parentinfo=OuterRef('pk')).exclude(
+        studentinfo__student_info__user_id__in=student_ids
+    )
+    orphaned_parent_ids = (ParentInfo.objects
+        .filter(student_info__student_info__user_id__in=student_ids)
+        .exclude(Exists(remaining_students))
+        .values_list('parent_info__user_id', flat=True)
+        .distinct())
+
+    return sorted(set(requested) | student_ids | set(orphaned_parent_ids))
+
+
+def _raw_delete(queryset):
+    # Skips the per-row signals (and the SELECT) a cascading delete would run
+    return queryset._raw_delete(queryset.db)
+
+
+def _delete_dependents(user_ids):
+    """
+    Delete, a table at a time, the quiz and assessment rows the users' cascade would
+    otherwise remove one signal at a time. Returns the cache scopes left stale.
+    """
+    students = StudentInfo.objects.filter(student_info__user_id__in=user_ids)
+    teachers = TeacherInfo.objects.filter(teacher_info__user_id__in=user_ids)
+    quizzes = Quiz.objects.filter(Q(created_by__in=teachers) | Q(classroom__class_instructor__in=teachers))
+    responses = StudentResponse.objects.filter(Q(student__in=students) | Q(quiz__in=quizzes))
+    scores = QuizScore.objects.filter(Q(student__in=students) | Q(quiz__in=quizzes))
+
+    deleted_quiz_ids = set(quizzes.values_list('id', flat=True))
+    quiz_ids = deleted_quiz_ids | set(responses.values_list('quiz_id', flat=True)) | set(scores.values_list('quiz_id', flat=True))
+    owner_ids = set()
+    for created_by_id, instructor_id in Quiz.objects.filter(pk__in=quiz_ids).values_list('created_by_id', 'classroom__class_instructor_id'):
+        owner_ids.update((created_by_id, instructor_id))
+
+    _raw_delete(ResponseItem.objects.filter(student_response__in=responses))
+    _raw_delete(scores)
+    _raw_delete(responses)
+
+    if deleted_quiz_ids:
+        questions = Question.objects.filter(quiz_id__in=deleted_quiz_ids)
+        _raw_delete(Choice.objects.filter(question__in=questions))
+        _raw_delete(QuestionStats.objects.filter(question__in=questions))
+        _raw_delete(questions)
+        _raw_delete(RegradeJob.objects.filter(quiz_id__in=deleted_quiz_ids))
+        _raw_delete(Quiz.objects.filter(pk__in=deleted_quiz_ids))
+
+    # The surviving quizzes lost attempts; recount them in one pass
+    if quiz_ids - deleted_quiz_ids:
+        rebuild_question_stats(quiz_ids - deleted_quiz_ids)
+
+    assessments = StudentAssessment.objects.filter(Q(student__in=students) | Q(assessor_id__in=user_ids))
+    assessed_student_ids = set(assessments.exclude(student__in=students).values_list('student_id', flat=True))
+    AssessmentResponse.objects.filter(assessment__in=assessments).delete()
+    assessments.delete()
+    if assessed_student_ids:
+        rebuild_student_category_scores(assessed_student_ids)
+    StudentCategoryScore.objects.filter(student__in=students).delete()
+    StudentScreeningResult.objects.filter(student__in=students).delete()
+    EventNotification.objects.filter(user_id__in=user_ids).delete()
+
+    scopes = {quiz_scope(quiz_id) for quiz_id in quiz_ids}
+    scopes.update(teacher_scope(teacher_id) for teacher_id in owner_ids if teacher_id is not None)
+    if deleted_quiz_ids:
+        scopes.add(GLOBAL_SCOPE)
+    return scopes
+
+
+def delete_users(user_ids, chunk_size=USER_DELETION_CHUNK_SIZE, on_progress=None):
+    """
+    Delete users `chunk_size` at a time, each chunk and its cascade in its own transaction.
+
+    Quiz and assessment rows are deleted set-wise first, so what's left of the
+    cascade fires no per-row signals; question stats are rebuilt and cached
+    analytics invalidated once per chunk instead.
+
+    `on_progress(processed)` is called after every chunk.
+    """
+    processed = 0
+    for start in range(0, len(user_ids), chunk_size):
+        chunk = user_ids[start:start + chunk_size]
+        with transaction.atomic():
+            scopes = _delete_dependents(chunk)
+            CustomUser.objects.filter(pk__in=chunk).delete()
+            bump_versions_on_commit(scopes)
+        processed += len(chunk)
+        if on_progress:
+            on_progress(processed)
+    return processed
+
+
+def enqueue_user_deletion(user_ids, requested_by=None):
+    """
+    Queue the deletion of users, as returned by collect_user_ids, and start a
+    worker once the current transaction commits.
+    """
+    job = UserDeletionJob.objects.create(requested_by=requested_by, user_ids=user_ids, total=len(user_ids))
+    transaction.on_commit(start_worker)
+    return job
+
+
+def start_worker():
+    threading.Thread(target=process_pending_jobs, daemon=True).start()
+
+
+def _claim_next_job():
+    with transaction.atomic():
+        job = (UserDeletionJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='pending')
+            .order_by('created_at')
+            .first())
+        if job is None:
+            return None
+        job.status = 'running'
+        job.started_at = timezone.now()
+        job.save(update_fields=['status', 'started_at'])
+    return job
+
+
+def run_deletion_job(job):
+    def on_progress(processed):
+        job.processed = processed
+        job.save(update_fields=['processed'])
+
+    try:
+        delete_users(job.user_ids, on_progress=on_progress)
+        job.status = 'completed'
+    except Exception as e:
+        logger.exception("User deletion job %s failed", job.id)
+        job.status = 'failed'
+        job.error = str(e)
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'finished_at'])
+
+
+def process_pending_jobs():
+    """Run pending user deletion jobs until none are left; safe to call from several workers"""
+    try:
+        while True:
+            job = _claim_next_job()
+            if job is None:
+                break
+            run_deletion_job(job)
+    finally:
+        # Worker threads get their own connection, which Django won't close for them
+        connection.close()
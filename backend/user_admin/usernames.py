@@ -0,0 +1,54 @@
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.text import slugify
+
+from api.models import CustomUser
+from .models.account_models import UsernameSequence
+
+USERNAME_ROLE_MAP = {
+    'teacher': 'TCH',
+    'student': 'STU',
+    'parent': 'PAR',
+    'public': 'PUB', # must be delete before deploying
+}
+
+
+def username_prefix(role):
+    return USERNAME_ROLE_MAP.get(role, 'PUB')
+
+
+def format_username(prefix, year, number):
+    digits = getattr(settings, 'USERNAME_SUFFIX_DIGITS', 6)
+    return slugify(f"{prefix}-{year}-{number:0{digits}d}") # Ex: stu-24-000123
+
+
+def _reserve(prefix, year, count):
+    # The row lock serializes concurrent allocators of the same role and year
+    with transaction.atomic():
+        sequence, _ = UsernameSequence.objects.select_for_update().get_or_create(prefix=prefix, year=year)
+        start = sequence.last_value + 1
+        sequence.last_value += count
+        sequence.save(update_fields=['last_value'])
+    return range(start, start + count)
+
+
+def allocate_usernames(role, count=1):
+    """
+    Reserve `count` unique usernames for a role in the current year.
+
+    Numbers come from a locked counter row, so concurrent requests never hand
+    out the same name. One existence query per batch skips names that were
+    created by hand or by the old random generator.
+    """
+    prefix = username_prefix(role)
+    year = datetime.datetime.now().year % 100
+    usernames = []
+
+    while len(usernames) < count:
+        candidates = [format_username(prefix, year, number) for number in _reserve(prefix, year, count - len(usernames))]
+        taken = set(CustomUser.objects.filter(username__in=candidates).values_list('username', flat=True))
+        usernames.extend(username for username in candidates if username not in taken)
+
+    return usernames
@@ -1,9 +1,17 @@
+import logging
+
+from django.db import IntegrityError
 from django.http.response import JsonResponse
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.exceptions import ValidationError
 from api.models import CustomUser
 from ...serializers.accounts.create_account_serializers import *
+from ...bulk_accounts import create_accounts, find_taken_usernames
+from ...usernames import allocate_usernames
+from ...user_deletion import USER_DELETION_CHUNK_SIZE, collect_user_ids, delete_users, enqueue_user_deletion
+
+logger = logging.getLogger(__name__)
 
 class GenerateAccountView(generics.CreateAPIView):
     permission_classes = [IsAuthenticated]
@@ -22,9 +30,8 @@ class GenerateAccountView(generics.CreateAPIView):
         if not isinstance(account_count, int)  or account_count <= 0:
             raise ValidationError({"account_count": "Must be a positive integer"})
         
-         # Loop to create the specified number of accounts.
-        for  _ in range(account_count): 
-            account_data = serializer.generate_account(serializer.validated_data)
+        # Usernames for the whole batch are reserved in one go instead of checked one by one.
+        for account_data in serializer.generate_accounts(serializer.validated_data, account_count):
             account_storage.append({
                 'username': account_data['generated_username'],
                 'password': account_data['generated_password'],
@@ -44,9 +51,9 @@ class CreateAccountView(generics.CreateAPIView):
     def post(self, request):
          # Handle POST request to create user accounts.
         generated_accounts = request.data.get("accounts", []) 
-        response_data = []
+        accounts = []
 
-        # Loop through each generated account and create it.
+        # Validate every account before anything is written.
         for generated_account in generated_accounts:
             serializer_data = {
                 'role': generated_account.get('role'),
@@ -56,39 +63,76 @@ class CreateAccountView(generics.CreateAPIView):
             }
             serializer = self.get_serializer(data=serializer_data)
 
-            if serializer.is_valid():
-                user = serializer.save()
-                user_data = self.get_serializer(user).data
-            
-                account_data = {
-                    'message':  f'{user.role} account created successfully',
-                    'user': user_data,
-                    'username':  generated_account['username'],
-                    'password': generated_account['password']
-                }
-
-                # If the user is a student, create a linked parent account.
-                if user.role == 'student':
-                    parent_data = {
-                        'student_username': generated_account['username']
-                    }
-                    parent_link_serializer = ParentStudentLinkSerializer(data=parent_data)
-                    parent_link_serializer.is_valid(raise_exception=True)
-                    parent_user = parent_link_serializer.save()
-
-                    account_data.update({
-                        'parent_username': parent_user['generated_username'],
-                        'parent_password': parent_user['generated_password'],
-                        'linked_student': user.username
-                    })
-                
-                response_data.append(account_data)
-
-            else:
-                print("Serializer Errors:", serializer.errors)  # Print errors if not valid 
+            if not serializer.is_valid():
+                logger.warning("Invalid account data: %s", serializer.errors)
                 return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        return JsonResponse({'accounts': response_data}, status=status.HTTP_201_CREATED)
+            username = serializer.validated_data.get('generated_username')
+            password = serializer.validated_data.get('generated_password')
+            if not username or not password:
+                return JsonResponse({"error": "Generated username and password must be provided."}, status=status.HTTP_400_BAD_REQUEST)
+
+            account = {
+                'username': username,
+                'password': password,
+                'role': serializer.validated_data['role'],
+                'branch_name': serializer.validated_data.get('branch_name'),
+            }
+
+            # Students get a linked parent account, keeping the one GenerateAccountView reserved.
+            if account['role'] == 'student':
+                account['parent_username'] = generated_account.get('parent_username')
+                account['parent_password'] = generated_account.get('parent_password') or AccountGenerator().generate_password('parent')
+
+            accounts.append(account)
+
+        # Students sent without a parent username get one from the same sequence, in one batch.
+        missing_parents = [account for account in accounts if account['role'] == 'student' and not account['parent_username']]
+        for account, parent_username in zip(missing_parents, allocate_usernames('parent', len(missing_parents))):
+            account['parent_username'] = parent_username
+
+        taken = find_taken_usernames(
+            [account['username'] for account in accounts] +
+            [account['parent_username'] for account in accounts if account['role'] == 'student']
+        )
+        if taken:
+            return JsonResponse({"error": "Usernames already exist.", "usernames": taken}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            users, parent_users, elapsed = create_accounts(accounts)
+        except IntegrityError:
+            # Another request claimed one of these usernames after the check above
+            return JsonResponse({"error": "Usernames already exist. Generate new accounts and try again."}, status=status.HTTP_409_CONFLICT)
+        parents = iter(parent_users)
+
+        response_data = []
+        for account, user in zip(accounts, users):
+            account_data = {
+                'message':  f'{user.role} account created successfully',
+                'user': self.get_serializer(user).data,
+                'username':  account['username'],
+                'password': account['password']
+            }
+
+            if user.role == 'student':
+                account_data.update({
+                    'parent_username': next(parents).username,
+                    'parent_password': account['parent_password'],
+                    'linked_student': user.username
+                })
+
+            response_data.append(account_data)
+
+        created_count = len(users) + len(parent_users)
+        accounts_per_second = round(created_count / elapsed, 1) if elapsed else None
+        logger.info("Created %d accounts in %.2fs (%s accounts/sec)", created_count, elapsed, accounts_per_second)
+
+        return JsonResponse({
+            'accounts': response_data,
+            'created_count': created_count,
+            'elapsed_seconds': round(elapsed, 3),
+            'accounts_per_second': accounts_per_second,
+        }, status=status.HTTP_201_CREATED)
 
 class CustomUserDeleteView(generics.DestroyAPIView):
     permission_classes = [IsAuthenticated]
@@ -102,49 +146,41 @@ class CustomUserDeleteView(generics.DestroyAPIView):
         if not user_ids:
             return JsonResponse({"error": "User IDs is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-        deleted_count = 0
-        # Loop through each user ID to attempt deletion.
-        for user_id in user_ids:
-            try:
-                user = CustomUser.objects.get(pk=user_id)
-
-                if user.role == 'student':
-                    try:
-                        user_info_instance = user.user_info # Get the user_info instance associated with the student user.
-                        student_info_instance = user_info_instance.student_info # Get the student_info instance associated with the user_info
-                        parent_infos = student_info_instance.parent_student.all() # Retrieve all parent_info instances associated with the student_info.
-
-                        parent_infos_count = len(parent_infos)
-                        print(f"\nNumber of parent info instances associated with the student: {parent_infos_count}\n")
-                        
-                        for parent_info in parent_infos: 
-                            
-                            if parent_infos_count == 1:
-                                parent_user = parent_info.parent_info.user  # Get the parent user associated with the parent_info.
-                                parent_user.delete()
-
-                    except StudentInfo.DoesNotExist:
-                        pass
-                
-                elif user.role == 'parent':
-                    try:
-                        user_info_instance = user.user_info # Get the user_info instance associated with the parent user.
-                        parent_info = user_info_instance.parent_info # Get the parent_info instance associated with the user_info.
-                        students = parent_info.student_info.all()
-
-                        for student in students:
-                            student_user = student.student_info.user  # Get the student user associated with the student_info.
-                            student_user.delete()
-
-                    except ParentInfo.DoesNotExist:
-                        pass                        
-
-                user.delete()
-            except CustomUser.DoesNotExist:
-              pass
-        
-        return JsonResponse({"success": "User deleted successfully."}, status=status.HTTP_200_OK)
+        # Students of deleted parents and parents left without students go too.
+        user_ids = collect_user_ids(user_ids)
 
+        # A handful of users is deleted right away; bigger batches go to a background worker.
+        if len(user_ids) <= USER_DELETION_CHUNK_SIZE:
+            deleted_count = delete_users(user_ids)
+            return JsonResponse({"success": "User deleted successfully.", "deleted_count": deleted_count}, status=status.HTTP_200_OK)
 
+        job = enqueue_user_deletion(user_ids, requested_by=request.user)
+        return JsonResponse({
+            "success": "User deletion started.",
+            "job_id": job.id,
+            "total": job.total,
+        }, status=status.HTTP_200_OK)
 
+class UserDeletionStatusView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
 
+    def get(self, request, pk):
+        try:
+            job = UserDeletionJob.objects.get(pk=pk)
+        except UserDeletionJob.DoesNotExist:
+            return JsonResponse({"error": "Deletion job not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        if request.user.role != 'admin' and not request.user.is_staff and job.requested_by_id != request.user.id:
+            return JsonResponse({"error": "Not authorized"}, status=status.HTTP_403_FORBIDDEN)
+
+        return JsonResponse({
+            "id": job.id,
+            "status": job.status,
+            "total": job.total,
+            "processed": job.processed,
+            "progress": job.progress,
+            "error": job.error,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+        }, status=status.HTTP_200_OK)
@@ -1,46 +1,108 @@
-from django.db.models import Q
-from django.http.response import JsonResponse
+import json
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch, Q
+from django.http.response import JsonResponse, StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, status, filters
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from ...models.account_models import UserInfo
+from api.pagination import InvalidCursor, get_page_size, paginate_keyset
+from ...models.account_models import StudentInfo, UserInfo
+from ...account_search import AccountSearchFilter
 from ...serializers.accounts.list_account_serializers import *
 
 def filter_queryset(queryset, params):
     if not params.get('ordering'):
         queryset = queryset.order_by('-date_joined')
 
-    search_term = params.get('search', None)
-    if search_term:
-        search_term = search_term.lower()
-        query = Q()
-        for i in range(1, len(search_term) + 1):
-            substring = search_term[:i]
-            query &= Q(first_name__istartswith=substring) | Q(last_name__istartswith=substring) | Q(id__icontains=substring)
-        queryset = queryset.filter(query)
-
     branch_name = params.get('branch_name', None)
     if branch_name:
         queryset = queryset.filter(branch_name__icontains=branch_name)
 
     return queryset
 
+NDJSON_CHUNK_SIZE = 500
+# Keyset pages and exports can only follow the (date_joined, id) key
+KEYSET_ORDERINGS = ('date_joined', '-date_joined')
+
+def account_list_ordering(queryset, params, default_ordering=None):
+    # Pages are keyed on (date_joined, id), oldest first for ?ordering=date_joined or a view
+    # whose default ordering starts with it, newest first otherwise; search results keep
+    # their best matches first
+    requested = params.get('ordering') or (default_ordering[0] if default_ordering else None)
+    direction = '' if requested == 'date_joined' else '-'
+    ordering = (f'{direction}date_joined', f'{direction}id')
+    if 'search_rank' in queryset.query.annotations and not params.get('ordering'):
+        ordering = ('-search_rank',) + ordering
+    return ordering
+
+def account_list_response(view, request, queryset, list_key, message):
+    """
+    Respond with the whole list, one keyset page (?cursor= / ?page_size=), or every
+    row streamed as newline-delimited JSON (?export=ndjson).
+
+    Rows are read with .values() and shaped by the serializer's fast path, so a
+    page costs the same few queries however many accounts it holds.
+    """
+    params = request.query_params
+    export = params.get('export') == 'ndjson'
+    paginated = 'cursor' in params or 'page_size' in params
+    if (export or paginated) and params.get('ordering') and params.get('ordering') not in KEYSET_ORDERINGS:
+        return JsonResponse(
+            {'error': f"ordering must be one of {', '.join(KEYSET_ORDERINGS)} when paginating or exporting."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    serializer_class = view.get_serializer_class()
+    ordering = account_list_ordering(queryset, params, getattr(view, 'ordering', None))
+    ordering_fields = [field.lstrip('-') for field in ordering if field.lstrip('-') not in serializer_class.values_fields]
+    values = serializer_class.values_queryset(queryset, *ordering_fields)
+
+    if export:
+        ordered = values.order_by(*ordering).iterator(chunk_size=NDJSON_CHUNK_SIZE)
+
+        def rows():
+            while True:
+                chunk = list(islice(ordered, NDJSON_CHUNK_SIZE))
+                if not chunk:
+                    break
+                for row in serializer_class.rows(chunk):
+                    yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+        response = StreamingHttpResponse(rows(), content_type='application/x-ndjson')
+        response['Content-Disposition'] = f'attachment; filename="{list_key}.ndjson"'
+        return response
+
+    payload = {'message': message}
+
+    # Pagination is opt-in so existing screens keep receiving the full list
+    if paginated:
+        try:
+            accounts, next_cursor = paginate_keyset(values, ordering, params.get('cursor'), get_page_size(request))
+        except InvalidCursor as e:
+            return JsonResponse({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        payload['next_cursor'] = next_cursor
+    else:
+        accounts = values
+
+    payload[list_key] = serializer_class.rows(accounts)
+    return JsonResponse(payload, status=status.HTTP_200_OK)
+
 class TeacherListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = TeacherListSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['id', 'first_name', 'last_name']
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, AccountSearchFilter]
     ordering_fields = ['date_joined', 'first_name']
     filterset_fields = ['branch_name']
 
     def get_queryset(self):
-        queryset = CustomUser.objects.filter(role='teacher')
+        queryset = CustomUser.objects.select_related('user_info__teacher_info').filter(role='teacher')
 
         params = {
             'ordering': self.request.query_params.get('ordering'),
-            'search': self.request.query_params.get('search'),
             'branch_name': self.request.query_params.get('branch_name'),
         }
 
@@ -49,18 +111,12 @@ class TeacherListView(generics.ListAPIView):
     
     def list(self, request):
         queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
-        teacher_list = serializer.data
-
-        return JsonResponse({'message': 'Teacher list retrieved successfully',
-                             'teacher_list': teacher_list}, status=status.HTTP_200_OK)
-
+        return account_list_response(self, request, queryset, 'teacher_list', 'Teacher list retrieved successfully')
 
 class StudentListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = StudentListSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['id', 'first_name', 'last_name']
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, AccountSearchFilter]
     ordering_fields = ['date_joined', 'first_name']
     filterset_fields = ['branch_name',]
 
@@ -72,7 +128,6 @@ class StudentListView(generics.ListAPIView):
 
         params = {
             'ordering': self.request.query_params.get('ordering'),
-            'search': self.request.query_params.get('search'),
             'branch_name': self.request.query_params.get('branch_name'),
         }
 
@@ -93,37 +148,38 @@ class StudentListView(generics.ListAPIView):
             'id', 
             'first_name', 
             'last_name',
+            'username',
             'email',
             'date_joined',
+            'user_info__contact_no',
             'user_info__student_info__grade_level',
             'user_info__student_info__has_special_needs',
+            'user_info__student_info__special_needs_details',
             'branch_name'
         )
     
     def list(self, request):
         queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
-        student_list = serializer.data
-
-        return JsonResponse({
-            'message': 'Student list retrieved successfully',
-            'student_list': student_list
-        }, status=status.HTTP_200_OK)
+        return account_list_response(self, request, queryset, 'student_list', 'Student list retrieved successfully')
 
 class ParentListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ParentListSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['id', 'first_name', 'last_name']
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, AccountSearchFilter]
     ordering = ['date_joined', 'first_name']
     filterset_fields = ['branch_name']
 
     def get_queryset(self):
-        queryset = CustomUser.objects.filter(role="parent")
+        queryset = (CustomUser.objects
+            .select_related('user_info__parent_info')
+            .prefetch_related(Prefetch(
+                'user_info__parent_info__student_info',
+                queryset=StudentInfo.objects.select_related('student_info').order_by('id')
+            ))
+            .filter(role="parent"))
 
         params = {
             'ordering': self.request.query_params.get("ordering"),
-            'search': self.request.query_params.get('search'),
             'branch_name': self.request.query_params.get('branch_name'),
         }
 
@@ -132,25 +188,19 @@ class ParentListView(generics.ListAPIView):
     
     def list(self, request):
         queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
-        parent_list = serializer.data
-
-        return JsonResponse({'message': 'Parent list retrieved successfully',
-                                'parent_list': parent_list}, status=status.HTTP_200_OK)
+        return account_list_response(self, request, queryset, 'parent_list', 'Parent list retrieved successfully')
 
 class PublicUserListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = PublicUserListSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['id', 'first_name', 'last_name']
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, AccountSearchFilter]
     ordering = ['date_joined', 'first_name']
 
     def get_queryset(self):
-        queryset = CustomUser.objects.filter(role="public")
+        queryset = CustomUser.objects.select_related('user_info').filter(role="public")
 
         params = {
             'ordering': self.request.query_params.get('ordering'),
-            'search': self.request.query_params.get('search')
         }
 
         queryset = filter_queryset(queryset, params)
@@ -158,8 +208,4 @@ class PublicUserListView(generics.ListAPIView):
 
     def list(self, request):
         queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
-        public_user_list = serializer.data
-
-        return JsonResponse({'message': 'Public user list retrieved successfully', 
-                             'public_user_list': public_user_list}, status=status.HTTP_200_OK)
+        return account_list_response(self, request, queryset, 'public_user_list', 'Public user list retrieved successfully')
@@ -0,0 +1,48 @@
+import codecs
+import csv
+
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import generics, status
+from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.permissions import IsAuthenticated
+from ...roster_import import REPORT_HEADER, RosterError, import_roster, read_roster
+
+
+class Echo:
+    # csv.writer only needs an object with write(); hand each line straight back
+    def write(self, value):
+        return value
+
+
+class RosterImportView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = (MultiPartParser, FormParser)
+
+    def post(self, request):
+        # Import a CSV roster and stream back a per-row report with the new credentials
+        if request.user.role != 'admin' and not request.user.is_staff:
+            return JsonResponse({'error': 'Only admins can import rosters.'}, status=status.HTTP_403_FORBIDDEN)
+
+        roster_file = request.FILES.get('file')
+        if roster_file is None:
+            return JsonResponse({'error': 'A CSV file is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            rows = read_roster(codecs.iterdecode(roster_file, 'utf-8-sig'))
+        except (RosterError, UnicodeDecodeError, csv.Error) as e:
+            return JsonResponse({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        writer = csv.writer(Echo())
+
+        def report():
+            yield writer.writerow(REPORT_HEADER)
+            try:
+                for row in import_roster(rows):
+                    yield writer.writerow(row)
+            except (UnicodeDecodeError, csv.Error) as e:
+                # Rows before the unreadable line are already imported and reported
+                yield writer.writerow(['', 'error', '', '', '', '', '', f'Stopped reading the file: {e}'])
+
+        response = StreamingHttpResponse(report(), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="roster_import_report.csv"'
+        return response
@@ -13,9 +13,10 @@ class BranchUserCountView(generics.CreateAPIView):
     def create(self, request, *args, **kwargs):
         branch_name = request.data.get('branch_name')
 
+        branches = UserRoleCountSerializer.get_role_counts_by_branch()
+
         # If no branch name is provided, return all branches
         if not branch_name:
-            branches = CustomUser.objects.values('branch_name').distinct()
             serializer = self.get_serializer(branches, many=True)
             return JsonResponse({
                 'message': 'All branch user counts retrieved successfully',
@@ -24,14 +25,14 @@ class BranchUserCountView(generics.CreateAPIView):
             })
 
         # Check if branch exists
-        if not CustomUser.objects.filter(branch_name=branch_name).exists():
+        branch_data = next((branch for branch in branches if branch['branch_name'] == branch_name), None)
+        if branch_data is None:
             return JsonResponse({
                 'error': 'Branch not found',
                 'status': 'error'
             }, status=status.HTTP_404_NOT_FOUND)
 
         # Get counts for specific branch
-        branch_data = {'branch_name': branch_name}
         serializer = self.get_serializer(branch_data)
         
         return JsonResponse({
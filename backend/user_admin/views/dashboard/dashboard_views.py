@@ -1,10 +1,11 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Count, Q
+from django.db.models import Count
 from django.db.models.functions import ExtractMonth, TruncDate
-from user_admin.models.account_models import CustomUser, StudentInfo, TeacherInfo, ParentInfo
+from user_admin.models.account_models import CustomUser
 from user_teacher.models.classroom_models import Classroom, ClassRoomStudent
+from user_admin.branch_counts import get_role_totals
 from datetime import datetime, timedelta
 from django.utils import timezone
 
@@ -12,18 +13,19 @@ class DashboardMetricsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        # Get counts for different user types
-        student_count = StudentInfo.objects.count()
-        teacher_count = TeacherInfo.objects.count()
-        parent_count = ParentInfo.objects.count()
-        public_user_count = CustomUser.objects.filter(role='public').count()
+        # Get counts for different user types, summed from the cached branch counts
+        role_totals = get_role_totals()
+        student_count = role_totals['student_profiles']
+        teacher_count = role_totals['teacher_profiles']
+        parent_count = role_totals['parent_profiles']
+        public_user_count = role_totals['public_count']
         
         # Get total class count
         total_class_count = Classroom.objects.count()
 
         # Get active vs inactive users
-        total_users = CustomUser.objects.count()
-        active_users = CustomUser.objects.filter(is_active=True).count()
+        total_users = role_totals['total_users']
+        active_users = role_totals['active_users']
         inactive_users = total_users - active_users
 
         # Get user type percentages
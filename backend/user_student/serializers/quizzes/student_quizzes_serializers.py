@@ -4,6 +4,8 @@ from user_teacher.models.classroom_models import Classroom,  SUBJECT_CHOICES
 from user_admin.models.account_models import StudentInfo
 from django.utils import timezone
 
+SUBJECT_DISPLAY = dict(SUBJECT_CHOICES)
+
 class StudentQuizListSerializer(serializers.ModelSerializer):
     classroom_details = serializers.SerializerMethodField()
     subject_name = serializers.SerializerMethodField()
@@ -40,49 +42,21 @@ class StudentQuizListSerializer(serializers.ModelSerializer):
 
     def get_subject_display(self, obj):
         # Get the display value from SUBJECT_CHOICES
-        subject_dict = dict(SUBJECT_CHOICES)
-        return subject_dict.get(obj.classroom.subject_name, obj.classroom.subject_name)
+        return SUBJECT_DISPLAY.get(obj.classroom.subject_name, obj.classroom.subject_name)
 
     def get_subject_name(self, obj):
         return obj.classroom.subject_name if obj.classroom else None
 
     def get_has_submitted(self, obj):
-        request = self.context.get('request')
-        if request and hasattr(request.user, 'user_info'):
-            
-            try:
-                student_info = StudentInfo.objects.get(student_info=request.user.user_info)
-                has_submitted = StudentResponse.objects.filter(
-                    student=student_info,
-                    quiz=obj
-                ).exists()
-
-                return has_submitted
-            except Exception as e:
-                print(f"Error checking submission: {str(e)}")
-                return False
-                
-        print("No request or user doesn't have user_info")
-        return False
+        # Annotated by StudentQuizListView for the requesting student
+        return getattr(obj, 'has_submitted', False)
 
     def get_score_details(self, obj):
-        request = self.context.get('request')
-        if request and hasattr(request.user, 'user_info'):
-            try:
-                student_info = StudentInfo.objects.get(student_info=request.user.user_info)
-                quiz_score = QuizScore.objects.filter(
-                    student=student_info,
-                    quiz=obj
-                ).first()
-
-                if quiz_score:
-                    return {
-                        'status': quiz_score.status,
-                        'total_score': quiz_score.total_score,
-                        'total_possible': quiz_score.total_possible,
-                        'percentage_score': float(quiz_score.percentage_score)
-                    }
-            except Exception as e:
-                print(f"Error fetching score details: {str(e)}")
-                return None
-        return None
\ No newline at end of file
+        if getattr(obj, 'score_status', None) is None:
+            return None
+        return {
+            'status': obj.score_status,
+            'total_score': obj.score_total,
+            'total_possible': obj.score_possible,
+            'percentage_score': float(obj.score_percentage)
+        }
@@ -1,31 +1,32 @@
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
+from django.utils.http import parse_etags, quote_etag
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status, generics
-from django.shortcuts import get_object_or_404
 from user_teacher.models.quizzes_models import Quiz, Question
+from user_teacher.quiz_paper import get_quiz_paper
 from user_student.serializers.quizzes.quiz_serializers import QuestionSerializer
 
 class StudentQuizQuestionsView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = QuestionSerializer
     
-    def get_queryset(self):
-        quiz_id = self.kwargs.get('quiz_id')
-        quiz = get_object_or_404(Quiz, id=quiz_id)
-        return Question.objects.filter(quiz=quiz)
-    
     def list(self, request, *args, **kwargs):
         quiz_id = self.kwargs.get('quiz_id')
-        quiz = get_object_or_404(Quiz, id=quiz_id)
-        
-        # Get the questions using the get_queryset method
-        questions = self.get_queryset()
-        serializer = self.get_serializer(questions, many=True)
-        
-        return Response({
-            'quiz_title': quiz.title,
-            'quiz_description': quiz.description,
-            'due_date': quiz.due_date,
-            'questions': serializer.data
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+        try:
+            # Every student gets the same paper, rendered once per quiz edit
+            paper, etag = get_quiz_paper(quiz_id, request)
+        except Quiz.DoesNotExist:
+            raise Http404("No Quiz matches the given query.")
+
+        etag = quote_etag(etag)
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match and (etag in parse_etags(if_none_match) or if_none_match.strip() == '*'):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(paper, status=status.HTTP_200_OK)
+
+        response['ETag'] = etag
+        # Clients may keep the paper but must revalidate it, so edits show up immediately
+        response['Cache-Control'] = 'private, no-cache'
+        return response
@@ -1,51 +1,72 @@
+from datetime import datetime, timezone as dt_timezone
+
 from rest_framework import generics, status
+from django.db.models import Exists, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.http import JsonResponse
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
-from user_teacher.models.quizzes_models import Quiz
+from api.pagination import InvalidCursor, get_page_size, paginate_keyset
+from user_teacher.models.quizzes_models import Quiz, QuizScore, StudentResponse
 from user_teacher.models.classroom_models import ClassRoomStudent
 from user_student.serializers.quizzes.student_quizzes_serializers import *
-from django.shortcuts import get_object_or_404
-from user_admin.models.account_models import StudentInfo
+
+# Quizzes without a due date sort after every dated one
+NO_DUE_DATE = datetime(9999, 12, 31, tzinfo=dt_timezone.utc)
+
 
 class StudentQuizListView(generics.ListAPIView):
     serializer_class = StudentQuizListSerializer
     permission_classes = [IsAuthenticated]
-    
+    ordering = ('due_sort', 'id')
+
     def get_queryset(self):
-        print("View is running...")
-        try:
-            # Get student info from user info
-            student = StudentInfo.objects.get(student_info__user=self.request.user)
-            print(f"Student: {student}")
-
-            # Get enrolled classrooms
-            enrolled_classrooms = ClassRoomStudent.objects.filter(
-                student=student,
-                is_active=True
-            ).values_list('classroom', flat=True)
-
-            print(f"Enrolled Classroom IDs: {list(enrolled_classrooms)}")
-
-            # Get the actual classroom details for better debugging
-            classroom_details = Classroom.objects.filter(id__in=enrolled_classrooms)
-            for classroom in classroom_details:
-                print(f"Enrolled in: Grade {classroom.grade_level} Section {classroom.class_section} - {classroom.subject_name}")
-
-            # Get quizzes from enrolled classrooms
-            return Quiz.objects.filter(
-                classroom__in=enrolled_classrooms
-            ).select_related('classroom')
-
-        except Exception as e:
-            print(f"Error getting student quizzes: {str(e)}")
-            return Quiz.objects.none()
+        user = self.request.user
+        enrolled_classrooms = ClassRoomStudent.objects.filter(
+            student__student_info__user=user,
+            is_active=True
+        ).values('classroom')
+        scores = QuizScore.objects.filter(
+            student__student_info__user=user,
+            quiz=OuterRef('pk')
+        ).order_by('id')
+
+        # Submission and score state are correlated subqueries of the same statement,
+        # so the whole list is one query however many quizzes the student has
+        return (Quiz.objects
+            .filter(classroom__in=enrolled_classrooms)
+            .select_related('classroom__class_instructor__teacher_info__user')
+            .annotate(
+                due_sort=Coalesce('due_date', Value(NO_DUE_DATE)),
+                has_submitted=Exists(StudentResponse.objects.filter(
+                    student__student_info__user=user,
+                    quiz=OuterRef('pk')
+                )),
+                score_status=Subquery(scores.values('status')[:1]),
+                score_total=Subquery(scores.values('total_score')[:1]),
+                score_possible=Subquery(scores.values('total_possible')[:1]),
+                score_percentage=Subquery(scores.values('percentage_score')[:1]),
+            )
+            .order_by(*self.ordering))
 
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return JsonResponse({
+        payload = {
             'status': 'success',
             'message': 'Quizzes retrieved successfully',
-            'student_quizzes': serializer.data
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+        }
+
+        # Pagination is opt-in so the student dashboard keeps receiving the full list
+        if 'cursor' in request.query_params or 'page_size' in request.query_params:
+            try:
+                quizzes, next_cursor = paginate_keyset(
+                    queryset, self.ordering, request.query_params.get('cursor'), get_page_size(request)
+                )
+            except InvalidCursor as e:
+                return JsonResponse({'status': 'error', 'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            payload['next_cursor'] = next_cursor
+        else:
+            quizzes = queryset
+
+        payload['student_quizzes'] = self.get_serializer(quizzes, many=True).data
+        return JsonResponse(payload, status=status.HTTP_200_OK)
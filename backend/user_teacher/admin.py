@@ -70,4 +70,24 @@ class QuizScoreAdmin(admin.ModelAdmin):
     
     def has_change_permission(self, request, obj=None):
         # Scores shouldn't be manually edited
-        return False
\ No newline at end of file
+        return False
+
+@admin.register(ResponseItem)
+class ResponseItemAdmin(admin.ModelAdmin):
+    list_display = ('student_response', 'question', 'question_type', 'answer', 'is_correct')
+    list_filter = ('question_type', 'is_correct')
+    search_fields = ('question__text', 'student_response__quiz__title')
+    readonly_fields = ('student_response', 'question', 'question_type', 'answer', 'is_correct')
+
+@admin.register(QuestionStats)
+class QuestionStatsAdmin(admin.ModelAdmin):
+    list_display = ('question', 'attempts', 'correct', 'last_updated')
+    search_fields = ('question__text', 'question__quiz__title')
+    readonly_fields = ('question', 'attempts', 'correct', 'last_updated')
+
+@admin.register(RegradeJob)
+class RegradeJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'quiz', 'status', 'processed', 'total', 'created_at', 'finished_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('quiz__title',)
+    readonly_fields = ('quiz', 'status', 'total', 'processed', 'error', 'created_at', 'started_at', 'finished_at')
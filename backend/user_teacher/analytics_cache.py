@@ -0,0 +1,177 @@
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from user_teacher.models.quizzes_models import Quiz
+
+# Results are dropped as soon as their scope's version moves; the timeout only
+# bounds how long data outside the tracked models (e.g. student names) can lag.
+RESULT_CACHE_TIMEOUT = 60 * 60
+QUIZ_OWNERS_TIMEOUT = 60 * 60 * 24
+
+GLOBAL_SCOPE = 'global'
+
+
+def teacher_scope(teacher_id):
+    return f'teacher:{teacher_id}'
+
+
+def quiz_scope(quiz_id):
+    return f'quiz:{quiz_id}'
+
+
+def _version_key(scope):
+    return f'analytics:version:{scope}'
+
+
+def get_version(scope):
+    version = cache.get(_version_key(scope))
+    if version is None:
+        # Seeded from the clock so an evicted counter never reuses an old version
+        cache.add(_version_key(scope), time.time_ns(), timeout=None)
+        version = cache.get(_version_key(scope))
+    return version
+
+
+def bump_versions(scopes):
+    """Move every scope to a new version in one cache write"""
+    if scopes:
+        # A fresh clock reading differs from any version the scope had before
+        version = time.time_ns()
+        cache.set_many({_version_key(scope): version for scope in scopes}, timeout=None)
+
+
+def bump_version(scope):
+    bump_versions([scope])
+
+
+def _count(name, outcome):
+    for key in (f'analytics:stats:{outcome}', f'analytics:stats:{name}:{outcome}'):
+        if not cache.add(key, 1, timeout=None):
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, timeout=None)
+
+
+def cached_result(name, scope, params, compute):
+    """
+    Return compute() for an analytics endpoint, cached under the scope's current version.
+
+    `params` holds everything besides the scope that changes the result (query
+    parameters); it is hashed into the key.
+    """
+    params_hash = hashlib.md5(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+    key = f'analytics:result:{name}:{scope}:{get_version(scope)}:{params_hash}'
+
+    result = cache.get(key)
+    if result is not None:
+        _count(name, 'hits')
+        return result
+
+    _count(name, 'misses')
+    result = compute()
+    cache.set(key, result, RESULT_CACHE_TIMEOUT)
+    return result
+
+
+def get_cache_stats(names):
+    """Hit/miss counters overall and per endpoint name"""
+    def stats(prefix):
+        hits = cache.get(f'{prefix}:hits', 0)
+        misses = cache.get(f'{prefix}:misses', 0)
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total * 100, 1) if total else 0,
+        }
+
+    return {
+        'total': stats('analytics:stats'),
+        'endpoints': {name: stats(f'analytics:stats:{name}') for name in names},
+    }
+
+
+def _quiz_owners_key(quiz_id):
+    return f'analytics:quiz_owners:{quiz_id}'
+
+
+def get_quiz_owner_ids(quiz_id):
+    """Return the teacher ids whose analytics include a quiz: its creator and classroom instructor"""
+    owners = cache.get(_quiz_owners_key(quiz_id))
+    if owners is None:
+        owners = list(
+            Quiz.objects.filter(pk=quiz_id)
+            .values_list('created_by_id', 'classroom__class_instructor_id')
+            .first() or ()
+        )
+        cache.set(_quiz_owners_key(quiz_id), owners, QUIZ_OWNERS_TIMEOUT)
+    return set(owners)
+
+
+def forget_quiz_owners(quiz_id):
+    cache.delete(_quiz_owners_key(quiz_id))
+
+
+def _quiz_scopes(quiz_id, owner_ids=None):
+    owner_ids = owner_ids if owner_ids is not None else get_quiz_owner_ids(quiz_id)
+    return {quiz_scope(quiz_id)} | {teacher_scope(teacher_id) for teacher_id in owner_ids if teacher_id is not None}
+
+
+def bump_quiz_versions(quiz_id, owner_ids=None):
+    """Invalidate cached analytics of a quiz and of every teacher who sees it"""
+    bump_versions(_quiz_scopes(quiz_id, owner_ids))
+
+
+class _PendingBumps:
+    """Scopes to bump when the current transaction commits, written together"""
+
+    def __init__(self, savepoint_ids):
+        self.savepoint_ids = savepoint_ids
+        self.scopes = set()
+        self.quiz_ids = set()
+        self.flushed = False
+
+    def __call__(self):
+        self.flushed = True
+        bump_versions(self.scopes)
+
+
+def _pending_bumps():
+    connection = transaction.get_connection()
+    savepoint_ids = set(connection.savepoint_ids)
+    pending = getattr(connection, 'pending_analytics_bumps', None)
+    # Collect per atomic block; a rollback discards the block's callback, so start
+    # over rather than feed one that will never run
+    if (pending is None or pending.flushed or pending.savepoint_ids != savepoint_ids
+            or not any(callback is pending for _, callback, _ in connection.run_on_commit)):
+        pending = connection.pending_analytics_bumps = _PendingBumps(savepoint_ids)
+        transaction.on_commit(pending)
+    return pending
+
+
+def bump_versions_on_commit(scopes):
+    """Bump scopes once the current transaction commits, in one write however often this is called"""
+    if not transaction.get_connection().in_atomic_block:
+        bump_versions(scopes)
+        return
+    _pending_bumps().scopes.update(scopes)
+
+
+def bump_quiz_versions_on_commit(quiz_id, owner_ids=None):
+    """
+    bump_quiz_versions once the current transaction commits. Owners are resolved
+    now, while the quiz row is still visible, and only once per quiz and transaction.
+    """
+    if not transaction.get_connection().in_atomic_block:
+        bump_quiz_versions(quiz_id, owner_ids)
+        return
+    pending = _pending_bumps()
+    if quiz_id in pending.quiz_ids and owner_ids is None:
+        return
+    pending.quiz_ids.add(quiz_id)
+    pending.scopes.update(_quiz_scopes(quiz_id, owner_ids))
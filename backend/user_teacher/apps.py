@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class UserTeacherConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'user_teacher'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,245 @@
+from dataclasses import dataclass, field
+import threading
+import time
+
+from django.core.cache import cache
+
+from user_teacher.models.quizzes_models import Question
+
+# Cache entries live for a day; the version counter makes stale entries unreachable
+# long before that, so the timeout only bounds memory.
+ANSWER_KEY_CACHE_TIMEOUT = 60 * 60 * 24
+# Freshness comes from the shared version, which is read on every call. This only
+# bounds memory: in-process copies older than this are re-read from the shared
+# cache, and pruned when new keys are stored, so quizzes nobody takes any more
+# don't stay resident.
+LOCAL_KEY_TTL = 60
+TRUE_VALUES = ('true', '1', 'yes')
+
+_local_keys = {}  # quiz_id -> (AnswerKey, loaded_at)
+_local_lock = threading.Lock()
+
+
+def normalize_answer(value):
+    """Lowercase a value and keep only its alphanumeric characters"""
+    return ''.join(c for c in str(value).lower() if c.isalnum())
+
+
+def is_true_value(value):
+    return str(value).lower().strip() in TRUE_VALUES
+
+
+@dataclass(frozen=True)
+class QuestionKey:
+    question_id: int
+    question_type: str
+    correct_choice_ids: frozenset = frozenset()
+    correct_texts: frozenset = frozenset()
+    correct_bool: bool = False
+
+    def is_correct(self, answer):
+        """Check an answer against this question's key, mirroring the grading rules"""
+        if answer is None:
+            return False
+
+        if self.question_type == 'true_false':
+            return is_true_value(answer) == self.correct_bool
+
+        if self.question_type == 'single':
+            if str(answer).strip() in self.correct_choice_ids:
+                return True
+            return normalize_answer(answer) in self.correct_texts
+
+        if self.question_type == 'multi':
+            answer_list = answer if isinstance(answer, list) else [answer]
+            if {str(ans).strip() for ans in answer_list} == self.correct_choice_ids:
+                return True
+            return {normalize_answer(ans) for ans in answer_list} == self.correct_texts
+
+        if self.question_type == 'identification':
+            return normalize_answer(answer) in self.correct_texts
+
+        return False
+
+    def normalize(self, answer):
+        """Return the canonical string form of an answer for storage, or None if unanswered"""
+        if answer is None:
+            return None
+        if self.question_type == 'true_false':
+            return 'true' if is_true_value(answer) else 'false'
+        if self.question_type == 'multi':
+            answer_list = answer if isinstance(answer, list) else [answer]
+            return ','.join(sorted(str(ans).strip() for ans in answer_list))
+        if self.question_type == 'identification':
+            return normalize_answer(answer)
+        return str(answer).strip()
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    """Compiled, read-only answer key for every question of a quiz"""
+    quiz_id: int
+    version: int
+    questions: dict = field(default_factory=dict)
+
+    def __len__(self):
+        return len(self.questions)
+
+    def __contains__(self, question_id):
+        return str(question_id) in self.questions
+
+    def get(self, question_id):
+        return self.questions.get(str(question_id))
+
+    def question_type(self, question_id):
+        question_key = self.get(question_id)
+        return question_key.question_type if question_key else None
+
+    def is_correct(self, question_id, answer):
+        question_key = self.get(question_id)
+        return question_key.is_correct(answer) if question_key else False
+
+    def grade(self, responses):
+        """Return the number of correct answers in a responses dict"""
+        return sum(
+            1 for question_id, answer in responses.items()
+            if self.is_correct(question_id, answer)
+        )
+
+
+def compile_question_key(question):
+    """Build a QuestionKey from a question whose choices are prefetched"""
+    correct_choices = [choice for choice in question.choices.all() if choice.is_correct]
+    correct_texts = {normalize_answer(choice.text) for choice in correct_choices}
+
+    if question.question_type == 'identification' and not correct_texts and question.correct_answer:
+        correct_texts = {normalize_answer(question.correct_answer)}
+
+    return QuestionKey(
+        question_id=question.id,
+        question_type=question.question_type,
+        correct_choice_ids=frozenset(str(choice.id) for choice in correct_choices),
+        correct_texts=frozenset(correct_texts),
+        correct_bool=is_true_value(question.correct_answer),
+    )
+
+
+def compile_answer_key(quiz_id, version=0, questions=None):
+    """Compile a quiz's answer key, querying its questions and choices if not given"""
+    if questions is None:
+        questions = Question.objects.filter(quiz_id=quiz_id).prefetch_related('choices')
+    return AnswerKey(
+        quiz_id=int(quiz_id),
+        version=version,
+        questions={str(question.id): compile_question_key(question) for question in questions},
+    )
+
+
+def _version_cache_key(quiz_id):
+    return f'answer_key:version:{quiz_id}'
+
+
+def _key_cache_key(quiz_id, version):
+    return f'answer_key:{quiz_id}:{version}'
+
+
+def _new_version():
+    # Seeded from the clock so a counter evicted from the cache never restarts
+    # at a value some process still holds a stale key for.
+    return time.time_ns()
+
+
+def get_answer_key_version(quiz_id):
+    version_key = _version_cache_key(quiz_id)
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, _new_version(), timeout=None)
+        version = cache.get(version_key)
+    return version
+
+
+def _local_key(quiz_id, version):
+    entry = _local_keys.get(quiz_id)
+    if entry is None:
+        return None
+    answer_key, loaded_at = entry
+    if answer_key.version != version or time.monotonic() - loaded_at > LOCAL_KEY_TTL:
+        return None
+    return answer_key
+
+
+def _store_local(answer_keys):
+    now = time.monotonic()
+    with _local_lock:
+        for quiz_id in [quiz_id for quiz_id, (_, loaded_at) in _local_keys.items() if now - loaded_at > LOCAL_KEY_TTL]:
+            del _local_keys[quiz_id]
+        _local_keys.update((quiz_id, (answer_key, now)) for quiz_id, answer_key in answer_keys.items())
+
+
+def get_answer_key(quiz_id):
+    """
+    Return the compiled answer key for a quiz.
+
+    Keys are held in-process (for at most LOCAL_KEY_TTL seconds) and in the shared
+    cache under a per-quiz version; invalidate_answer_key bumps the version so every
+    process recompiles once.
+    """
+    quiz_id = int(quiz_id)
+    version = get_answer_key_version(quiz_id)
+
+    answer_key = _local_key(quiz_id, version)
+    if answer_key is not None:
+        return answer_key
+
+    answer_key = cache.get(_key_cache_key(quiz_id, version))
+    if answer_key is None:
+        answer_key = compile_answer_key(quiz_id, version)
+        cache.set(_key_cache_key(quiz_id, version), answer_key, ANSWER_KEY_CACHE_TIMEOUT)
+
+    _store_local({quiz_id: answer_key})
+    return answer_key
+
+
+def get_answer_keys(quiz_ids):
+    """Return {quiz_id: AnswerKey}, compiling every missing key from one prefetched query"""
+    answer_keys = {}
+    loaded = {}  # Keys that weren't served from this process
+    missing = {}
+    for quiz_id in {int(quiz_id) for quiz_id in quiz_ids}:
+        version = get_answer_key_version(quiz_id)
+        answer_key = _local_key(quiz_id, version)
+        if answer_key is not None:
+            answer_keys[quiz_id] = answer_key
+            continue
+        answer_key = cache.get(_key_cache_key(quiz_id, version))
+        if answer_key is None:
+            missing[quiz_id] = version
+        else:
+            loaded[quiz_id] = answer_key
+
+    if missing:
+        questions_by_quiz = {quiz_id: [] for quiz_id in missing}
+        questions = Question.objects.filter(quiz_id__in=missing).prefetch_related('choices')
+        for question in questions:
+            questions_by_quiz[question.quiz_id].append(question)
+        for quiz_id, version in missing.items():
+            answer_key = compile_answer_key(quiz_id, version, questions_by_quiz[quiz_id])
+            cache.set(_key_cache_key(quiz_id, version), answer_key, ANSWER_KEY_CACHE_TIMEOUT)
+            loaded[quiz_id] = answer_key
+
+    if loaded:
+        _store_local(loaded)
+    answer_keys.update(loaded)
+    return answer_keys
+
+
+def invalidate_answer_key(quiz_id):
+    """Drop the cached key of a quiz after one of its questions or choices changed"""
+    quiz_id = int(quiz_id)
+    version_key = _version_cache_key(quiz_id)
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.set(version_key, _new_version(), timeout=None)
+    with _local_lock:
+        _local_keys.pop(quiz_id, None)
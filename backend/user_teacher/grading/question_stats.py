@@ -0,0 +1,99 @@
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from user_teacher.models.quizzes_models import Question, QuestionStats, Quiz, ResponseItem
+
+
+def lock_quiz_stats(quiz_ids=None):
+    """
+    Serialize writers of the given quizzes' stats (every quiz if None) until the
+    transaction ends, so a rebuild never overwrites an increment it didn't count.
+
+    Locks the quiz rows with FOR NO KEY UPDATE, which doesn't block inserts that
+    only reference the quiz.
+    """
+    quizzes = Quiz.objects.select_for_update(no_key=True).order_by('pk')
+    if quiz_ids is not None:
+        quizzes = quizzes.filter(pk__in=quiz_ids)
+    list(quizzes.values_list('pk', flat=True))
+
+
+def record_response_items(quiz_id, items):
+    """Add freshly graded ResponseItems to the per-question totals; call inside the grading transaction"""
+    answered_ids = [item.question_id for item in items if item.answer is not None]
+    if not answered_ids:
+        return
+    correct_ids = [item.question_id for item in items if item.answer is not None and item.is_correct]
+
+    lock_quiz_stats([quiz_id])
+    QuestionStats.objects.bulk_create(
+        [QuestionStats(question_id=question_id) for question_id in answered_ids],
+        ignore_conflicts=True,
+    )
+    QuestionStats.objects.filter(question_id__in=answered_ids).update(
+        attempts=F('attempts') + 1,
+        correct=F('correct') + Case(
+            When(question_id__in=correct_ids, then=Value(1)),
+            default=Value(0),
+        ),
+        last_updated=timezone.now(),
+    )
+
+
+
+def forget_response_items(quiz_id, student_response_id):
+    """Take a response's graded items back out of the per-question totals before it is deleted"""
+    items = list(
+        ResponseItem.objects.filter(student_response_id=student_response_id, answer__isnull=False)
+        .values_list('question_id', 'is_correct')
+    )
+    if not items:
+        return
+    answered_ids = [question_id for question_id, _ in items]
+    correct_ids = [question_id for question_id, is_correct in items if is_correct]
+
+    lock_quiz_stats([quiz_id])
+    QuestionStats.objects.filter(question_id__in=answered_ids).update(
+        attempts=Greatest(F('attempts') - 1, Value(0)),
+        correct=Greatest(F('correct') - Case(
+            When(question_id__in=correct_ids, then=Value(1)),
+            default=Value(0),
+        ), Value(0)),
+        last_updated=timezone.now(),
+    )
+
+
+@transaction.atomic
+def rebuild_question_stats(quiz_ids=None):
+    """Recompute totals from ResponseItem rows, for every quiz or only the given ones"""
+    lock_quiz_stats(quiz_ids)
+    questions = Question.objects.all()
+    if quiz_ids is not None:
+        questions = questions.filter(quiz_id__in=quiz_ids)
+
+    totals = {
+        row['question']: row
+        for row in ResponseItem.objects.filter(question__in=questions, answer__isnull=False)
+        .values('question')
+        .annotate(attempts=Count('id'), correct=Count('id', filter=Q(is_correct=True)))
+    }
+    now = timezone.now()
+    stats = [
+        QuestionStats(
+            question_id=question_id,
+            attempts=totals.get(question_id, {}).get('attempts', 0),
+            correct=totals.get(question_id, {}).get('correct', 0),
+            last_updated=now,
+        )
+        for question_id in questions.values_list('id', flat=True)
+    ]
+    QuestionStats.objects.bulk_create(
+        stats,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['question'],
+        update_fields=['attempts', 'correct', 'last_updated'],
+    )
+    return len(stats)
@@ -0,0 +1,135 @@
+import logging
+import threading
+
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from user_teacher.analytics_cache import bump_quiz_versions
+from user_teacher.grading.answer_key import get_answer_key
+from user_teacher.grading.question_stats import rebuild_question_stats
+from user_teacher.grading.response_items import build_response_items, summarize_items
+from user_teacher.models.quizzes_models import QuizScore, RegradeJob, ResponseItem, StudentResponse
+
+logger = logging.getLogger(__name__)
+
+REGRADE_CHUNK_SIZE = 500
+SCORE_FIELDS = ['total_score', 'total_possible', 'percentage_score', 'status', 'updated_at']
+
+
+def regrade_quiz(quiz_id, chunk_size=REGRADE_CHUNK_SIZE, on_progress=None):
+    """
+    Regrade every response of a quiz against its current answer key.
+
+    Each chunk rewrites the responses' ResponseItems and bulk-updates their
+    QuizScores in its own transaction; question stats are rebuilt at the end.
+    `on_progress(processed)` is called after every chunk.
+    """
+    answer_key = get_answer_key(quiz_id)
+    responses = StudentResponse.objects.filter(quiz_id=quiz_id).select_related('score').order_by('id')
+    processed = 0
+    chunk = []
+
+    def flush(chunk):
+        items = []
+        scores = []
+        now = timezone.now()
+        for response in chunk:
+            response_items = build_response_items(response, answer_key)
+            items.extend(response_items)
+            score = getattr(response, 'score', None)
+            if score is not None:
+                for field, value in summarize_items(response_items).items():
+                    setattr(score, field, value)
+                score.updated_at = now
+                scores.append(score)
+
+        with transaction.atomic():
+            ResponseItem.objects.filter(student_response__in=chunk).delete()
+            ResponseItem.objects.bulk_create(items, batch_size=1000)
+            QuizScore.objects.bulk_update(scores, SCORE_FIELDS, batch_size=1000)
+
+    for response in responses.iterator(chunk_size=chunk_size):
+        chunk.append(response)
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            processed += len(chunk)
+            chunk = []
+            if on_progress:
+                on_progress(processed)
+    if chunk:
+        flush(chunk)
+        processed += len(chunk)
+        if on_progress:
+            on_progress(processed)
+
+    rebuild_question_stats([quiz_id])
+    # bulk_update bypasses the save signals that normally invalidate cached analytics
+    bump_quiz_versions(quiz_id)
+    return processed
+
+
+def enqueue_regrade(quiz_id):
+    """
+    Queue a regrade of a quiz and start a worker once the current transaction commits.
+
+    A quiz has at most one pending job: edits made before the worker picks it up
+    are covered by the same run. The worker is a thread of this process, so jobs
+    queued just before a restart wait for the process_regrade_jobs command.
+    """
+    job = RegradeJob.objects.filter(quiz_id=quiz_id, status='pending').first()
+    if job is None:
+        job = RegradeJob.objects.create(quiz_id=quiz_id)
+    transaction.on_commit(start_worker)
+    return job
+
+
+def start_worker():
+    threading.Thread(target=process_pending_jobs, daemon=True).start()
+
+
+def _claim_next_job():
+    running = RegradeJob.objects.filter(quiz_id=OuterRef('quiz_id'), status='running')
+    with transaction.atomic():
+        job = (RegradeJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='pending')
+            .exclude(Exists(running))
+            .order_by('created_at')
+            .first())
+        if job is None:
+            return None
+        job.status = 'running'
+        job.started_at = timezone.now()
+        job.total = StudentResponse.objects.filter(quiz_id=job.quiz_id).count()
+        job.save(update_fields=['status', 'started_at', 'total'])
+    return job
+
+
+def run_regrade_job(job):
+    def on_progress(processed):
+        job.processed = processed
+        job.save(update_fields=['processed'])
+
+    try:
+        regrade_quiz(job.quiz_id, on_progress=on_progress)
+        job.status = 'completed'
+    except Exception as e:
+        logger.exception("Regrade job %s failed", job.id)
+        job.status = 'failed'
+        job.error = str(e)
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'finished_at'])
+
+
+def process_pending_jobs():
+    """Run pending regrade jobs until none are left; safe to call from several workers"""
+    try:
+        while True:
+            job = _claim_next_job()
+            if job is None:
+                break
+            run_regrade_job(job)
+    finally:
+        # Worker threads get their own connection, which Django won't close for them
+        connection.close()
@@ -0,0 +1,32 @@
+from user_teacher.models.quizzes_models import ResponseItem
+
+PASSING_PERCENTAGE = 50
+
+
+def build_response_items(student_response, answer_key):
+    """Grade every question of the quiz for one response and return unsaved ResponseItems"""
+    responses = student_response.responses if isinstance(student_response.responses, dict) else {}
+    items = []
+    for question_id, question_key in answer_key.questions.items():
+        answer = responses.get(question_id)
+        items.append(ResponseItem(
+            student_response=student_response,
+            question_id=question_key.question_id,
+            question_type=question_key.question_type,
+            answer=question_key.normalize(answer),
+            is_correct=question_key.is_correct(answer),
+        ))
+    return items
+
+
+def summarize_items(items):
+    """Return the QuizScore fields (total_score, total_possible, percentage_score, status) for graded items"""
+    total_possible = len(items)
+    correct_count = sum(1 for item in items if item.is_correct)
+    percentage = (correct_count / total_possible * 100) if total_possible > 0 else 0
+    return {
+        'total_score': correct_count,
+        'total_possible': total_possible,
+        'percentage_score': round(percentage, 2),
+        'status': 'passed' if percentage >= PASSING_PERCENTAGE else 'failed',
+    }
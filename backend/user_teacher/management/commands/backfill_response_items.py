@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from user_teacher.grading.answer_key import get_answer_keys
+from user_teacher.grading.response_items import build_response_items
+from user_teacher.models.quizzes_models import StudentResponse, ResponseItem
+
+
+class Command(BaseCommand):
+    help = 'Create graded ResponseItem rows for quiz responses submitted before they existed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Responses processed per transaction')
+        parser.add_argument('--quiz', type=int, help='Only backfill responses of this quiz')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        responses = StudentResponse.objects.filter(items__isnull=True).order_by('id')
+        if options['quiz']:
+            responses = responses.filter(quiz_id=options['quiz'])
+
+        self.stdout.write('Backfilling response items...')
+        processed = 0
+        items_created = 0
+        chunk = []
+
+        for response in responses.iterator(chunk_size=chunk_size):
+            chunk.append(response)
+            if len(chunk) >= chunk_size:
+                items_created += self._backfill_chunk(chunk)
+                processed += len(chunk)
+                self.stdout.write(f'Processed {processed} responses')
+                chunk = []
+
+        if chunk:
+            items_created += self._backfill_chunk(chunk)
+            processed += len(chunk)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully created {items_created} response items for {processed} responses'
+        ))
+
+    def _backfill_chunk(self, responses):
+        answer_keys = get_answer_keys(response.quiz_id for response in responses)
+        items = []
+        for response in responses:
+            items.extend(build_response_items(response, answer_keys[response.quiz_id]))
+
+        with transaction.atomic():
+            ResponseItem.objects.bulk_create(items, batch_size=1000, ignore_conflicts=True)
+        return len(items)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from user_teacher.grading.regrade import process_pending_jobs
+from user_teacher.models.quizzes_models import RegradeJob
+
+
+class Command(BaseCommand):
+    help = 'Run pending quiz regrade jobs, e.g. ones left behind when the server restarted'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requeue-running',
+            action='store_true',
+            help='Reset jobs stuck in "running" (their worker died) back to pending first',
+        )
+
+    def handle(self, *args, **options):
+        if options['requeue_running']:
+            requeued = RegradeJob.objects.filter(status='running').update(status='pending', processed=0)
+            self.stdout.write(f'Requeued {requeued} running jobs')
+
+        pending = RegradeJob.objects.filter(status='pending').count()
+        process_pending_jobs()
+        self.stdout.write(self.style.SUCCESS(f'Processed {pending} regrade jobs'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from user_teacher.grading.question_stats import rebuild_question_stats
+from user_teacher.grading.regrade import regrade_quiz
+from user_teacher.models.quizzes_models import Quiz
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-question attempt and correct totals used by knowledge-gap analytics'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--quiz', type=int, action='append', help='Only rebuild this quiz (repeatable)')
+        parser.add_argument(
+            '--regrade',
+            action='store_true',
+            help='Regrade stored response items and scores against the current answer key first',
+        )
+        parser.add_argument('--chunk-size', type=int, default=500, help='Responses regraded per transaction')
+
+    def handle(self, *args, **options):
+        quiz_ids = options['quiz']
+
+        if options['regrade']:
+            quizzes = Quiz.objects.all()
+            if quiz_ids:
+                quizzes = quizzes.filter(id__in=quiz_ids)
+            for quiz_id in quizzes.values_list('id', flat=True):
+                regraded = regrade_quiz(quiz_id, chunk_size=options['chunk_size'])
+                self.stdout.write(f'Regraded {regraded} responses for quiz {quiz_id}')
+
+        rebuilt = rebuild_question_stats(quiz_ids)
+        self.stdout.write(self.style.SUCCESS(f'Successfully rebuilt stats for {rebuilt} questions'))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_teacher', '0010_rename_type_quiz_type_of'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResponseItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_type', models.CharField(choices=[('single', 'Single Choice'), ('multi', 'Multiple Choice'), ('identification', 'Identification'), ('true_false', 'True or False')], max_length=50)),
+                ('answer', models.TextField(blank=True, null=True)),
+                ('is_correct', models.BooleanField(default=False)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='response_items', to='user_teacher.question')),
+                ('student_response', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='user_teacher.studentresponse')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['question', 'is_correct'], name='user_teache_questio_5367c5_idx'), models.Index(fields=['question_type', 'is_correct'], name='user_teache_questio_f457c8_idx')],
+                'unique_together': {('student_response', 'question')},
+            },
+        ),
+    ]
@@ -1,4 +1,4 @@
 from .classroom_models import Classroom, ClassRoomStudent
-from .quizzes_models import Quiz, Question, Choice, StudentResponse
+from .quizzes_models import Quiz, Question, Choice, StudentResponse, QuizScore, ResponseItem, QuestionStats, RegradeJob
 
-__all__ = ['Classroom', 'ClassRoomStudent', 'Quiz', 'Question', 'Choice', 'StudentResponse']
\ No newline at end of file
+__all__ = ['Classroom', 'ClassRoomStudent', 'Quiz', 'Question', 'Choice', 'StudentResponse', 'QuizScore', 'ResponseItem', 'QuestionStats', 'RegradeJob']
\ No newline at end of file
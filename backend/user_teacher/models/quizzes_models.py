@@ -62,4 +62,60 @@ class QuizScore(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
-    
\ No newline at end of file
+
+
+class ResponseItem(models.Model):
+    """One graded answer of a StudentResponse, written when the response is scored"""
+    student_response = models.ForeignKey(StudentResponse, on_delete=models.CASCADE, related_name='items')
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='response_items')
+    question_type = models.CharField(max_length=50, choices=Question.QUESTION_TYPES)
+    answer = models.TextField(blank=True, null=True)  # Normalized answer, null when unanswered
+    is_correct = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = ['student_response', 'question']
+        indexes = [
+            models.Index(fields=['question', 'is_correct']),
+            models.Index(fields=['question_type', 'is_correct']),
+        ]
+
+
+class QuestionStats(models.Model):
+    """Running attempt/correct totals per question, kept in step with ResponseItem"""
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, related_name='stats')
+    attempts = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    last_updated = models.DateTimeField(auto_now=True)
+
+    @property
+    def success_rate(self):
+        return (self.correct / self.attempts * 100) if self.attempts > 0 else 0
+
+
+class RegradeJob(models.Model):
+    """Background regrade of a quiz's responses after its answer key was edited"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='regrade_jobs')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    total = models.PositiveIntegerField(default=0)  # Responses to regrade
+    processed = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    @property
+    def progress(self):
+        return round(self.processed / self.total * 100, 1) if self.total > 0 else 0
+
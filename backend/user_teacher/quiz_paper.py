@@ -0,0 +1,81 @@
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+
+from user_teacher.models.quizzes_models import Choice, Question, Quiz
+
+# Papers are replaced as soon as the quiz's version moves; the timeout only bounds memory.
+QUIZ_PAPER_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _version_key(quiz_id):
+    return f'quiz_paper:version:{quiz_id}'
+
+
+def get_quiz_paper_version(quiz_id):
+    version = cache.get(_version_key(quiz_id))
+    if version is None:
+        # Seeded from the clock so an evicted counter never reuses an old version
+        cache.add(_version_key(quiz_id), time.time_ns(), timeout=None)
+        version = cache.get(_version_key(quiz_id))
+    return version
+
+
+def invalidate_quiz_paper(quiz_id):
+    """Drop the cached paper of a quiz after the quiz, a question or a choice changed"""
+    try:
+        cache.incr(_version_key(quiz_id))
+    except ValueError:
+        cache.set(_version_key(quiz_id), time.time_ns(), timeout=None)
+
+
+def render_quiz_paper(quiz, build_url=None):
+    """
+    Render the student-facing payload of a quiz: questions and choices without
+    the answer key. `build_url` turns a media path into the URL sent to clients.
+    """
+    questions = (Question.objects
+        .filter(quiz=quiz)
+        .order_by('id')
+        .prefetch_related(Prefetch('choices', queryset=Choice.objects.order_by('id'))))
+
+    return {
+        'quiz_title': quiz.title,
+        'quiz_description': quiz.description,
+        'due_date': quiz.due_date,
+        'questions': [
+            {
+                'id': question.id,
+                'text': question.text,
+                'image': (build_url(question.image.url) if build_url else question.image.url) if question.image else None,
+                'question_type': question.question_type,
+                'choices': [{'id': choice.id, 'text': choice.text} for choice in question.choices.all()],
+            }
+            for question in questions
+        ],
+    }
+
+
+def get_quiz_paper(quiz_id, request=None):
+    """
+    Return (paper, etag) for a quiz, rendering it at most once per version.
+
+    Image URLs are made absolute for the request's host, which is part of the key.
+    Raises Quiz.DoesNotExist for unknown quizzes.
+    """
+    host = request.build_absolute_uri('/') if request else ''
+    host_hash = hashlib.md5(host.encode()).hexdigest()[:8]
+    key = f'quiz_paper:{quiz_id}:{get_quiz_paper_version(quiz_id)}:{host_hash}'
+
+    cached = cache.get(key)
+    if cached is None:
+        quiz = Quiz.objects.get(pk=quiz_id)
+        paper = render_quiz_paper(quiz, request.build_absolute_uri if request else None)
+        etag = hashlib.md5(json.dumps(paper, cls=DjangoJSONEncoder, sort_keys=True).encode()).hexdigest()
+        cached = (paper, etag)
+        cache.set(key, cached, QUIZ_PAPER_CACHE_TIMEOUT)
+    return cached
@@ -0,0 +1,66 @@
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from user_teacher.analytics_cache import (
+    GLOBAL_SCOPE, bump_quiz_versions_on_commit, bump_versions_on_commit, forget_quiz_owners, get_quiz_owner_ids,
+)
+from user_teacher.grading.answer_key import invalidate_answer_key
+from user_teacher.grading.question_stats import forget_response_items
+from user_teacher.quiz_paper import invalidate_quiz_paper
+from user_teacher.models.quizzes_models import Quiz, Question, Choice, StudentResponse, QuizScore
+
+
+def _quiz_id_for_choice(choice):
+    if Choice.question.is_cached(choice):
+        return choice.question.quiz_id
+    return Question.objects.filter(pk=choice.question_id).values_list('quiz_id', flat=True).first()
+
+
+def _quiz_changed_on_commit(quiz_id, answer_key_changed=False):
+    """Invalidate cached answer keys, papers and analytics for a quiz once the write is committed"""
+    if quiz_id is None:
+        return
+    if answer_key_changed:
+        def invalidate():
+            invalidate_answer_key(quiz_id)
+            invalidate_quiz_paper(quiz_id)
+
+        transaction.on_commit(invalidate)
+    bump_quiz_versions_on_commit(quiz_id)
+
+
+@receiver([post_save, post_delete], sender=Quiz)
+def quiz_changed(sender, instance, **kwargs):
+    owner_ids = get_quiz_owner_ids(instance.pk) | {instance.created_by_id}
+    try:
+        owner_ids.add(instance.classroom.class_instructor_id)
+    except ObjectDoesNotExist:
+        pass
+    forget_quiz_owners(instance.pk)
+    transaction.on_commit(lambda: invalidate_quiz_paper(instance.pk))
+    bump_quiz_versions_on_commit(instance.pk, owner_ids)
+
+
+@receiver([post_save, post_delete], sender=Question)
+def question_changed(sender, instance, **kwargs):
+    _quiz_changed_on_commit(instance.quiz_id, answer_key_changed=True)
+    bump_versions_on_commit([GLOBAL_SCOPE])
+
+
+@receiver([post_save, post_delete], sender=Choice)
+def choice_changed(sender, instance, **kwargs):
+    _quiz_changed_on_commit(_quiz_id_for_choice(instance), answer_key_changed=True)
+
+
+@receiver([post_save, post_delete], sender=StudentResponse)
+@receiver([post_save, post_delete], sender=QuizScore)
+def submission_changed(sender, instance, **kwargs):
+    _quiz_changed_on_commit(instance.quiz_id)
+
+
+@receiver(pre_delete, sender=StudentResponse)
+def response_deleted(sender, instance, **kwargs):
+    # Runs before the cascade removes the ResponseItems, so their totals can still be read
+    forget_response_items(instance.quiz_id, instance.pk)
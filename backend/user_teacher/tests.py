@@ -1,3 +1,122 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.models import CustomUser
+from user_admin.models.account_models import StudentInfo, TeacherInfo, UserInfo
+from user_teacher.models.classroom_models import Classroom
+from user_teacher.models.quizzes_models import Choice, Question, Quiz, QuizScore, QuestionStats
+
+# Queries for one submission once the quiz's answer key is cached, no matter how
+# many questions the quiz has, under the shipped cache settings (a database cache
+# when REDIS_URL is unset):
+# - 12 for the request, grading and stats, including the quiz row lock;
+# - 2 cache reads: the answer key version, and the quiz's owners once per transaction;
+# - 10 for the single post-commit set_many of the quiz and teacher versions,
+#   which the database cache writes key by key (one round trip on Redis).
+SUBMISSION_QUERY_BUDGET = 24
+
+
+class QuizSubmissionQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        teacher_user = CustomUser.objects.create(username='teacher', role='teacher')
+        cls.teacher = TeacherInfo.objects.create(teacher_info=UserInfo.objects.create(user=teacher_user))
+        cls.classroom = Classroom.objects.create(
+            class_instructor=cls.teacher, grade_level='Grade 1', class_section='A', subject_name='MATH'
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def make_quiz(self, question_count):
+        quiz = Quiz.objects.create(
+            classroom=self.classroom, title=f'{question_count} questions',
+            created_by=self.teacher, due_date=timezone.now(),
+        )
+        answers = {}
+        for index in range(question_count):
+            question_type = ['single', 'multi', 'identification', 'true_false'][index % 4]
+            question = Question.objects.create(
+                quiz=quiz, text=f'Question {index}', question_type=question_type,
+                correct_answer={'identification': 'Answer', 'true_false': 'true'}.get(question_type),
+            )
+            if question_type == 'single':
+                correct = Choice.objects.create(question=question, text='A', is_correct=True)
+                Choice.objects.create(question=question, text='B')
+                answers[str(question.id)] = str(correct.id)
+            elif question_type == 'multi':
+                first = Choice.objects.create(question=question, text='A', is_correct=True)
+                second = Choice.objects.create(question=question, text='B', is_correct=True)
+                answers[str(question.id)] = [first.id, second.id]
+            elif question_type == 'identification':
+                Choice.objects.create(question=question, text='Answer', is_correct=True)
+                answers[str(question.id)] = 'answer'
+            else:
+                Choice.objects.create(question=question, text='true', is_correct=True)
+                Choice.objects.create(question=question, text='false')
+                answers[str(question.id)] = 'true'
+        return quiz, answers
+
+    def submit(self, username, quiz, answers):
+        user = CustomUser.objects.create(username=username, role='student')
+        StudentInfo.objects.create(student_info=UserInfo.objects.create(user=user))
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/user-teacher/quiz-responses/create/',
+                {'quiz': quiz.id, 'classroom': self.classroom.id, 'responses': answers},
+                format='json',
+            )
+        self.assertEqual(response.status_code, 201, response.content)
+        return len(queries)
+
+    def test_submission_query_count_does_not_grow_with_quiz_length(self):
+        counts = []
+        for question_count in (4, 40):
+            quiz, answers = self.make_quiz(question_count)
+            self.submit(f'warmup{question_count}', quiz, answers)
+            counts.append(self.submit(f'student{question_count}', quiz, answers))
+
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(counts[1], SUBMISSION_QUERY_BUDGET)
+
+    def test_submission_bumps_versions_in_one_write(self):
+        quiz, answers = self.make_quiz(4)
+        self.submit('warmup', quiz, answers)
+        with mock.patch.object(cache, 'set_many', wraps=cache.set_many) as set_many, \
+                mock.patch.object(cache, 'incr', wraps=cache.incr) as incr:
+            self.submit('student', quiz, answers)
+
+        self.assertEqual(incr.call_count, 0)
+        self.assertEqual(set_many.call_count, 1)
+        self.assertEqual(
+            set(set_many.call_args.args[0]),
+            {f'analytics:version:quiz:{quiz.id}', f'analytics:version:teacher:{self.teacher.id}'},
+        )
+
+    def test_submission_grades_and_records_stats(self):
+        quiz, answers = self.make_quiz(8)
+        answers.pop(next(iter(answers)))
+        self.submit('student', quiz, answers)
+
+        score = QuizScore.objects.get(quiz=quiz)
+        self.assertEqual((score.total_score, score.total_possible, score.status), (7, 8, 'passed'))
+        self.assertEqual(QuestionStats.objects.filter(question__quiz=quiz, attempts=1, correct=1).count(), 7)
 
-# Create your tests here.
+    def test_unknown_question_is_rejected(self):
+        quiz, answers = self.make_quiz(4)
+        user = CustomUser.objects.create(username='student', role='student')
+        StudentInfo.objects.create(student_info=UserInfo.objects.create(user=user))
+        self.client.force_authenticate(user)
+        response = self.client.post(
+            '/user-teacher/quiz-responses/create/',
+            {'quiz': quiz.id, 'classroom': self.classroom.id, 'responses': {'999999': 'A'}},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 400)
@@ -37,6 +37,7 @@ urlpatterns = [
     path('questions/create/', QuestionCreateView.as_view(), name='question-create'),
     path('questions/list/', QuestionListView.as_view(), name='question-list'),
     path('questions/<int:pk>/', QuestionDetailView.as_view(), name='question-detail'),
+    path('quiz/<int:quiz_id>/regrade-status/', RegradeStatusView.as_view(), name='regrade-status'),
 
     path('quiz-responses/create/', QuizResponseCreateView.as_view(), name='quiz-response-create'),
     path('quiz-scores/list/', QuizScoreListView.as_view(), name='quiz-scores-list'),
@@ -47,6 +48,7 @@ urlpatterns = [
     path('analytics/quiz-time/', QuizTimeAnalyticsView.as_view({'get': 'list'})),
     path('analytics/knowledge-gap/', KnowledgeGapAnalyticsView.as_view(), name='knowledge-gap-analytics'),
     path('analytics/student-progress/', StudentProgressView.as_view(), name='student-progress'),
+    path('analytics/cache-stats/', AnalyticsCacheStatsView.as_view(), name='analytics-cache-stats'),
 
     # path('scores/', QuizScoreListView.as_view(), name='quiz-scores-list'),
     # path('scores/<int:pk>/', QuizScoreDetailView.as_view(), name='quiz-score-detail'),
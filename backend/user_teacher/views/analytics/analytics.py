@@ -1,13 +1,22 @@
-from django.db.models import Count, Avg
+from datetime import datetime, time
+from django.db.models import Count, Exists, OuterRef
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from rest_framework.decorators import api_view
 from rest_framework.views import APIView
 from rest_framework import status
 from user_teacher.models.quizzes_models import *
+from user_admin.models.account_models import StudentInfo
+from user_teacher.analytics_cache import (
+    GLOBAL_SCOPE, cached_result, get_cache_stats, quiz_scope, teacher_scope,
+)
+from api.pagination import InvalidCursor, cursor_filter, encode_cursor, get_page_size
 from django.db.models import Q
+from django.core.exceptions import ObjectDoesNotExist
 from rest_framework.permissions import IsAuthenticated
 from django.db.models.functions import TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework.viewsets import ViewSet
 from rest_framework.response import Response
 
@@ -16,226 +25,223 @@ logger = logging.getLogger(__name__)
 
 @require_http_methods(["GET"])
 def question_type_distribution(request):
-    distribution = Question.objects.values('question_type')\
-        .annotate(count=Count('id'))\
-        .order_by('question_type')
+    def compute():
+        distribution = Question.objects.values('question_type')\
+            .annotate(count=Count('id'))\
+            .order_by('question_type')
     
-    # Convert the query results to the format needed for Chart.js
-    labels = [item['question_type'] for item in distribution]
-    data = [item['count'] for item in distribution]
+        # Convert the query results to the format needed for Chart.js
+        labels = [item['question_type'] for item in distribution]
+        data = [item['count'] for item in distribution]
     
-    chart_data = {
-        'labels': labels,
-        'datasets': [{
-            'data': data,
-            'backgroundColor': [
-                '#FF6384',
-                '#36A2EB',
-                '#FFCE56',
-                '#4BC0C0'
-            ]
-        }]
-    }
+        chart_data = {
+            'labels': labels,
+            'datasets': [{
+                'data': data,
+                'backgroundColor': [
+                    '#FF6384',
+                    '#36A2EB',
+                    '#FFCE56',
+                    '#4BC0C0'
+                ]
+            }]
+        }
     
+        return chart_data
+
+    chart_data = cached_result('question_type_distribution', GLOBAL_SCOPE, {}, compute)
     return JsonResponse(chart_data, safe=False)
 
 
 @api_view(['GET'])
 def question_type_performance(request):
     try:
-        performance_data = {
-            'single': {'correct': 0, 'total': 0},
-            'multi': {'correct': 0, 'total': 0},
-            'identification': {'correct': 0, 'total': 0},
-            'true_false': {'correct': 0, 'total': 0}
-        }
-        
-        questions = Question.objects.prefetch_related('choices').all()
-        questions_dict = {str(q.id): q for q in questions}
-        
-        # Debug: Print all questions and their types
-        print("\nAll questions:")
-        for q in questions:
-            print(f"Q{q.id}: Type={q.question_type}, Text={q.text}")
-            if q.question_type == 'true_false':
-                correct = q.choices.filter(is_correct=True).first()
-                print(f"  Correct choice: {correct.text if correct else 'None'}")
-            elif q.question_type == 'identification':
-                print(f"  Correct answer: {q.correct_answer}")
-        
-        correct_answers = {}
-        for q in questions:
-            if q.question_type == 'true_false':
-                correct_choice = q.choices.filter(is_correct=True).first()
-                if correct_choice:
-                    # Store the actual text value from the choice
-                    correct_answers[str(q.id)] = correct_choice.text.lower()
-                    print(f"True/False Q{q.id}: Stored correct answer: {correct_answers[str(q.id)]}")
-            elif q.question_type == 'single':
-                correct_choice = q.choices.filter(is_correct=True).first()
-                if correct_choice:
-                    correct_answers[str(q.id)] = str(correct_choice.id)
-            elif q.question_type == 'identification':
-                if q.correct_answer:
-                    correct_answers[str(q.id)] = ''.join(q.correct_answer.lower().strip().split())
-                    print(f"Identification Q{q.id}: Stored correct answer: {correct_answers[str(q.id)]}")
-        
-        correct_multi_choices = {
-            str(q.id): set(str(x) for x in q.choices.filter(is_correct=True).values_list('id', flat=True))
-            for q in questions 
-            if q.question_type == 'multi'
-        }
+        try:
+            teacher = request.user.user_info.teacher_info
+        except ObjectDoesNotExist:
+            return JsonResponse({'error': 'User is not a teacher'}, status=403)
 
-        student_responses = StudentResponse.objects.all()
-        print("\nProcessing responses...")
+        quiz_id = request.query_params.get('quiz_id')
+        classroom_id = request.query_params.get('classroom_id')
 
-        for response in student_responses:
-            print(f"\nResponse {response.id}:")
-            for question_id, answer in response.responses.items():
-                question = questions_dict.get(question_id)
-                if not question or question.question_type not in performance_data:
-                    continue
-                    
-                q_type = question.question_type
-                performance_data[q_type]['total'] += 1
-                
-                if q_type == 'true_false':
-                    # Keep the answer as is, just normalize case
-                    student_answer = str(answer).lower()
-                    correct_answer = correct_answers.get(question_id)
-                    
-                    print(f"True/False Q{question_id}:")
-                    print(f"  Student answer: '{student_answer}'")
-                    print(f"  Correct answer: '{correct_answer}'")
-                    print(f"  Answer type: {type(answer)}")
-                    
-                    if student_answer and correct_answer:
-                        if student_answer == correct_answer:
-                            performance_data[q_type]['correct'] += 1
-                            print("  Result: CORRECT")
-                        else:
-                            print("  Result: INCORRECT")
-                
-                elif q_type == 'single':
-                    correct_choice = correct_answers.get(question_id)
-                    if answer and str(answer) == correct_choice:
-                        performance_data[q_type]['correct'] += 1
-                        
-                elif q_type == 'multi':
-                    if answer:
-                        student_choices = set(str(x) for x in answer)
-                        correct_choices = correct_multi_choices.get(question_id, set())
-                        if student_choices == correct_choices:
-                            performance_data[q_type]['correct'] += 1
-                        
-                elif q_type == 'identification':
-                    if answer:
-                        student_answer = ''.join(str(answer).lower().strip().split())
-                        correct_answer = correct_answers.get(question_id)
-                        
-                        print(f"Identification Q{question_id}:")
-                        print(f"  Student answer: '{student_answer}'")
-                        print(f"  Correct answer: '{correct_answer}'")
-                        print(f"  Answer type: {type(answer)}")
-                        
-                        if correct_answer:
-                            if student_answer == correct_answer:
-                                performance_data[q_type]['correct'] += 1
-                                print("  Result: CORRECT")
-                            else:
-                                print("  Result: INCORRECT")
-
-        print("\nFinal performance data:", performance_data)
+        def compute():
+            performance_data = {
+                'single': {'correct': 0, 'total': 0},
+                'multi': {'correct': 0, 'total': 0},
+                'identification': {'correct': 0, 'total': 0},
+                'true_false': {'correct': 0, 'total': 0}
+            }
 
-        chart_data = {
-            'labels': [],
-            'datasets': [{
-                'data': [],
-                'label': 'Average Performance (%)'
-            }]
-        }
+            # Only the requesting teacher's quizzes, optionally narrowed to one quiz or classroom
+            quizzes = Quiz.objects.filter(classroom__class_instructor=teacher)
+            if quiz_id:
+                quizzes = quizzes.filter(id=quiz_id)
+            if classroom_id:
+                quizzes = quizzes.filter(classroom_id=classroom_id)
+
+            # One GROUP BY over the graded items instead of regrading every stored response
+            rows = (ResponseItem.objects
+                .filter(student_response__quiz__in=quizzes, answer__isnull=False)
+                .values('question_type')
+                .annotate(total=Count('id'), correct=Count('id', filter=Q(is_correct=True)))
+                .order_by())
+            for row in rows:
+                if row['question_type'] in performance_data:
+                    performance_data[row['question_type']] = {'correct': row['correct'], 'total': row['total']}
+
+            chart_data = {
+                'labels': [],
+                'datasets': [{
+                    'data': [],
+                    'label': 'Average Performance (%)'
+                }]
+            }
         
-        for q_type, data in performance_data.items():
-            if data['total'] > 0:
-                chart_data['labels'].append(q_type)
-                percentage = (data['correct'] / data['total']) * 100
-                chart_data['datasets'][0]['data'].append(round(percentage, 1))
+            for q_type, data in performance_data.items():
+                if data['total'] > 0:
+                    chart_data['labels'].append(q_type)
+                    percentage = (data['correct'] / data['total']) * 100
+                    chart_data['datasets'][0]['data'].append(round(percentage, 1))
         
+            return chart_data
+
+        chart_data = cached_result(
+            'question_type_performance',
+            teacher_scope(teacher.id),
+            {'quiz_id': quiz_id, 'classroom_id': classroom_id},
+            compute
+        )
         return JsonResponse(chart_data, safe=False)
         
     except Exception as e:
-        print(f"Error occurred: {str(e)}")
-        traceback.print_exc()  # Print full stack trace
+        logger.exception("Error in question_type_performance")
         return JsonResponse({'error': str(e)}, status=500)
         
 class QuizPassFailRatioView(APIView):
     permission_classes = [IsAuthenticated]
+    ordering = ('-created_at', '-id')
 
     def get(self, request):
         try:
             # Get the teacher info from the authenticated user
             teacher = request.user.user_info.teacher_info
 
-            # Get all quizzes created by this teacher
-            quizzes = Quiz.objects.filter(created_by=teacher).order_by('-created_at')
-            
-            # Initialize the response data
-            quiz_statistics = []
-            
-            for quiz in quizzes:
-                # Get pass/fail counts for this quiz
-                scores = QuizScore.objects.filter(quiz=quiz)
-                passed = scores.filter(status='passed').count()
-                failed = scores.filter(status='failed').count()
-                
-                # Group by classroom
-                classroom_stats = (QuizScore.objects
-                    .filter(quiz=quiz)
-                    .values('classroom__grade_level', 'classroom__class_section')
-                    .annotate(
-                        passed=Count('id', filter=Q(status='passed')),
-                        failed=Count('id', filter=Q(status='failed'))
-                    ))
-                
-                # Format classroom stats with combined name
-                formatted_classroom_stats = []
-                for stat in classroom_stats:
-                    formatted_classroom_stats.append({
-                        'classroom_name': f"{stat['classroom__grade_level']} - {stat['classroom__class_section']}",
-                        'passed': stat['passed'],
-                        'failed': stat['failed']
-                    })
-                
-                quiz_statistics.append({
-                    'quiz_id': quiz.id,
-                    'quiz_title': quiz.title,
-                    'total_passed': passed,
-                    'total_failed': failed,
-                    'classroom_breakdown': formatted_classroom_stats
-                })
-            
-            return JsonResponse(quiz_statistics, safe=False)
+            since = request.query_params.get('since')
+            if since:
+                since = parse_datetime(since) or self._parse_since_date(since)
+                if since is None:
+                    return JsonResponse({'error': 'Invalid since value'}, status=400)
+
+            # Pagination is opt-in so the existing dashboard keeps receiving a plain list
+            paginate = 'cursor' in request.query_params or 'page_size' in request.query_params
+            page_size = get_page_size(request)
+            cursor = request.query_params.get('cursor')
+
+            payload = cached_result(
+                'quiz_statistics',
+                teacher_scope(teacher.id),
+                {'since': since, 'paginate': paginate, 'page_size': page_size, 'cursor': cursor},
+                lambda: self._build_statistics(teacher, since, paginate, page_size, cursor)
+            )
+            return JsonResponse(payload, safe=False)
+        except InvalidCursor as e:
+            return JsonResponse({'error': str(e)}, status=400)
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=500)
 
+    def _build_statistics(self, teacher, since, paginate, page_size, cursor):
+        # Get all quizzes created by this teacher
+        quizzes = Quiz.objects.filter(created_by=teacher)
+
+        if since:
+            quizzes = quizzes.filter(
+                Q(updated_at__gte=since) |
+                Exists(QuizScore.objects.filter(quiz=OuterRef('pk'), updated_at__gte=since))
+            )
+
+        if paginate:
+            page = quizzes.order_by(*self.ordering)
+            if cursor:
+                page = cursor_filter(page, self.ordering, cursor)
+            quizzes = Quiz.objects.filter(id__in=page.values('id')[:page_size + 1])
+
+        # One conditional aggregation: a row per (quiz, classroom), quizzes without
+        # scores still come back once through the LEFT JOIN
+        rows = (quizzes
+            .values(
+                'id', 'title', 'created_at',
+                'student_scores__classroom__grade_level',
+                'student_scores__classroom__class_section'
+            )
+            .annotate(
+                passed=Count('student_scores', filter=Q(student_scores__status='passed')),
+                failed=Count('student_scores', filter=Q(student_scores__status='failed'))
+            )
+            .order_by(*self.ordering))
+
+        quiz_statistics = {}
+        for row in rows:
+            stats = quiz_statistics.get(row['id'])
+            if stats is None:
+                stats = quiz_statistics[row['id']] = {
+                    'quiz_id': row['id'],
+                    'quiz_title': row['title'],
+                    'total_passed': 0,
+                    'total_failed': 0,
+                    'classroom_breakdown': [],
+                    '_created_at': row['created_at'],
+                }
+            if not row['passed'] and not row['failed']:
+                continue
+            stats['total_passed'] += row['passed']
+            stats['total_failed'] += row['failed']
+            stats['classroom_breakdown'].append({
+                'classroom_name': f"{row['student_scores__classroom__grade_level']} - {row['student_scores__classroom__class_section']}",
+                'passed': row['passed'],
+                'failed': row['failed']
+            })
+
+        quiz_statistics = list(quiz_statistics.values())
+        next_cursor = None
+        if paginate and len(quiz_statistics) > page_size:
+            quiz_statistics = quiz_statistics[:page_size]
+            last = quiz_statistics[-1]
+            next_cursor = encode_cursor([last['_created_at'], last['quiz_id']])
+        for stats in quiz_statistics:
+            del stats['_created_at']
+
+        if paginate:
+            return {'results': quiz_statistics, 'next_cursor': next_cursor}
+        return quiz_statistics
+
+    def _parse_since_date(self, value):
+        since_date = parse_date(value)
+        if since_date is None:
+            return None
+        return timezone.make_aware(datetime.combine(since_date, time.min))
+
 
 class QuizTimeAnalyticsView(ViewSet):
     def list(self, request):
         quiz_id = request.query_params.get('quiz_id')
-        quiz = Quiz.objects.get(id=quiz_id)
-        
-        # Get submission patterns
-        submissions = StudentResponse.objects.filter(quiz=quiz)\
-            .annotate(submission_date=TruncDate('submitted_at'))\
-            .values('submission_date')\
-            .annotate(submission_count=Count('id'))\
-            .order_by('submission_date')
-        
-        return Response({
-            'quiz_title': quiz.title,
-            'due_date': quiz.due_date,
-            'submissions': submissions
-        })
+
+        def compute():
+            quiz = Quiz.objects.get(id=quiz_id)
+            
+            # Get submission patterns
+            submissions = StudentResponse.objects.filter(quiz=quiz)\
+                .annotate(submission_date=TruncDate('submitted_at'))\
+                .values('submission_date')\
+                .annotate(submission_count=Count('id'))\
+                .order_by('submission_date')
+            
+            return {
+                'quiz_title': quiz.title,
+                'due_date': quiz.due_date,
+                'submissions': list(submissions)
+            }
+
+        return Response(cached_result('quiz_time', quiz_scope(quiz_id), {}, compute))
 
 
 class KnowledgeGapAnalyticsView(APIView):
@@ -246,278 +252,137 @@ class KnowledgeGapAnalyticsView(APIView):
             return JsonResponse({"error": "Quiz ID is required"}, status=400)
             
         try:
-            quiz = Quiz.objects.get(id=quiz_id)
-            questions = Question.objects.filter(quiz=quiz)
+            def compute():
+                quiz = Quiz.objects.get(id=quiz_id)
+                questions = Question.objects.filter(quiz=quiz).select_related('stats').order_by('id')
             
-            # Calculate success rate for each question
-            question_stats = []
-            
-            # Get all responses for this quiz
-            student_responses = StudentResponse.objects.filter(quiz=quiz)
-            print(f"\nAnalyzing quiz {quiz_id}: {quiz.title}")
-            print(f"Found {student_responses.count()} student responses")
-            
-            import json
-            
-            for question in questions:
-                print(f"\nProcessing Question {question.id}: {question.text}")
-                print(f"Question type: {question.question_type}")
-                print(f"Correct answer: {question.correct_answer}")
-                
-                correct_count = 0
-                total_count = 0
-                
-                for response in student_responses:
-                    try:
-                        # Get the response for this specific question
-                        responses_data = response.responses
-                        print(f"\nRaw response data: {responses_data}")
-                        
-                        # Ensure we have a dictionary
-                        if isinstance(responses_data, str):
-                            try:
-                                responses_data = json.loads(responses_data)
-                                print(f"Parsed JSON data: {responses_data}")
-                            except json.JSONDecodeError as e:
-                                print(f"JSON decode error for response {response.id}: {str(e)}")
-                                continue
-                        
-                        if not isinstance(responses_data, dict):
-                            print(f"Response data is not a dictionary: {type(responses_data)}")
-                            continue
-                        
-                        question_id_str = str(question.id)
-                        if question_id_str not in responses_data:
-                            print(f"Question {question_id_str} not found in response data")
-                            continue
-                            
-                        question_response = responses_data[question_id_str]
-                        print(f"Question response: {question_response}")
-                        
-                        if isinstance(question_response, str):
-                            try:
-                                question_response = json.loads(question_response)
-                            except json.JSONDecodeError:
-                                # If it's a string but not JSON, treat it as the answer itself
-                                question_response = question_response
-                        
-                        if question_response is not None:
-                            total_count += 1
-                            
-                            # Check if the answer is correct based on question type
-                            if question.question_type == 'single':
-                                try:
-                                    # Get the ID of the correct choice from the database
-                                    correct_choice = Choice.objects.get(
-                                        question=question,
-                                        is_correct=True
-                                    )
-                                    # Convert both to strings and normalize for comparison
-                                    student_ans = str(question_response).strip()
-                                    correct_ans = str(correct_choice.id)
-                                    
-                                    is_correct = student_ans == correct_ans
-                                    print(f"Single comparison: {student_ans} == {correct_ans} = {is_correct}")
-                                    if is_correct:
-                                        correct_count += 1
-                                except Choice.DoesNotExist:
-                                    print(f"No correct choice found for question {question.id}")
-                                    continue
-
-                            elif question.question_type == 'true_false':
-                                try:
-                                    # Handle string or boolean input
-                                    if isinstance(question_response, str):
-                                        student_ans = question_response.strip().lower()
-                                        # Convert 'true'/'false' strings to boolean
-                                        student_ans = student_ans == 'true'
-                                    else:
-                                        # Handle boolean or other types
-                                        student_ans = bool(question_response)
-
-                                    # Get correct answer as boolean
-                                    correct_ans = str(question.correct_answer).strip().lower() == 'true'
-                                    
-                                    is_correct = student_ans == correct_ans
-                                    print(f"True/False comparison: {student_ans} == {correct_ans} = {is_correct}")
-                                    if is_correct:
-                                        correct_count += 1
-                                except Exception as e:
-                                    print(f"Error processing true/false answer: {e}")
-                                    continue
-                                    
-                            elif question.question_type == 'multi':
-                                try:
-                                    # Parse student answer into a list of choice IDs
-                                    if isinstance(question_response, str):
-                                        try:
-                                            student_answers = json.loads(question_response)
-                                        except json.JSONDecodeError:
-                                            student_answers = [question_response]
-                                    else:
-                                        student_answers = question_response if isinstance(question_response, list) else [question_response]
-                                    
-                                    # Convert all answers to strings
-                                    student_choice_ids = set(str(ans).strip() for ans in student_answers)
-                                    
-                                    # Get correct choice IDs from database
-                                    correct_choice_ids = set(str(choice_id) for choice_id in Choice.objects.filter(
-                                        question=question,
-                                        is_correct=True
-                                    ).values_list('id', flat=True))
-                                    
-                                    print(f"Student choice IDs: {student_choice_ids}")
-                                    print(f"Correct choice IDs: {correct_choice_ids}")
-                                    
-                                    # Check if sets match exactly
-                                    is_correct = student_choice_ids == correct_choice_ids
-                                    print(f"Multi comparison result: {is_correct}")
-                                    
-                                    if is_correct:
-                                        correct_count += 1
-                                except Exception as e:
-                                    print(f"Error processing multiple choice answer: {e}")
-                                    continue
-                                    
-                            elif question.question_type == 'identification':
-                                try:
-                                    # Normalize both answers by:
-                                    # 1. Converting to string
-                                    # 2. Removing leading/trailing whitespace
-                                    # 3. Converting to lowercase
-                                    # 4. Removing extra spaces between words
-                                    def normalize_text(text):
-                                        return ' '.join(str(text).strip().lower().split())
-
-                                    student_ans = normalize_text(question_response)
-                                    correct_ans = normalize_text(question.correct_answer)
-                                    
-                                    is_correct = student_ans == correct_ans
-                                    print(f"Identification comparison: '{student_ans}' == '{correct_ans}' = {is_correct}")
-                                    if is_correct:
-                                        correct_count += 1
-                                except Exception as e:
-                                    print(f"Error processing identification answer: {e}")
-                                    continue
-                                    
-                    except Exception as e:
-                        print(f"Error processing response {response.id} for question {question.id}: {str(e)}")
-                        continue
+                # Success rates come from the QuestionStats rollup kept current at grading time
+                question_stats = []
+                for question in questions:
+                    stats = getattr(question, 'stats', None)
+                    total_count = stats.attempts if stats else 0
+                    correct_count = stats.correct if stats else 0
                 
-                print(f"\nQuestion {question.id} Summary:")
-                print(f"Total responses: {total_count}")
-                print(f"Correct responses: {correct_count}")
-                
-                success_rate = (correct_count / total_count * 100) if total_count > 0 else 0
-                print(f"Success rate: {success_rate}%")
-                
-                question_stats.append({
-                    'question_id': question.id,
-                    'question_text': question.text,
-                    'question_type': question.question_type,
-                    'success_rate': success_rate,
-                    'total_attempts': total_count,
-                    'correct_count': correct_count
-                })
-            
-            print(f"\nFinal Stats:")
-            for stat in question_stats:
-                print(f"Question {stat['question_id']}: {stat['success_rate']}% ({stat['correct_count']}/{stat['total_attempts']})")
+                    question_stats.append({
+                        'question_id': question.id,
+                        'question_text': question.text,
+                        'question_type': question.question_type,
+                        'success_rate': stats.success_rate if stats else 0,
+                        'total_attempts': total_count,
+                        'correct_count': correct_count
+                    })
                 
-            return JsonResponse({
-                'quiz_title': quiz.title,
-                'question_stats': question_stats
-            })
-            
+                return {
+                    'quiz_title': quiz.title,
+                    'question_stats': question_stats
+                }
+
+            return JsonResponse(cached_result('knowledge_gap', quiz_scope(quiz_id), {}, compute))
+
         except Quiz.DoesNotExist:
             return JsonResponse({"error": "Quiz not found"}, status=404)
         except Exception as e:
-            print(f"Error in KnowledgeGapAnalyticsView: {str(e)}")
+            logger.exception("Error in KnowledgeGapAnalyticsView")
             return JsonResponse({"error": str(e)}, status=500)
 
 
 class StudentProgressView(APIView):
+    QUESTION_TYPES = [question_type for question_type, _ in Question.QUESTION_TYPES]
+
     def get(self, request):
         try:
             teacher = request.user.user_info.teacher_info
-            classrooms = teacher.classrooms.all()
             
-            # Get all students from teacher's classrooms
-            student_data = {}
-            for classroom in classrooms:
-                student_responses = StudentResponse.objects.filter(
-                    classroom=classroom
-                ).select_related(
-                    'student',
-                    'quiz',
-                    'student__student_info',
-                    'student__student_info__user'
-                )
-                
-                for response in student_responses:
-                    student = response.student
-                    student_id = student.id
-                    if student_id not in student_data:
-                        student_data[student_id] = {
-                            'name': f"{student.student_info.user.first_name} {student.student_info.user.last_name}",
-                            'single': {'correct': 0, 'total': 0},
-                            'multi': {'correct': 0, 'total': 0},
-                            'identification': {'correct': 0, 'total': 0},
-                            'true_false': {'correct': 0, 'total': 0},
-                            'total_attempts': 0
-                        }
-                    
-                    student_data[student_id]['total_attempts'] += 1
-                    # Calculate performance per question type
-                    quiz_questions = response.quiz.questions.all()
-                    for question in quiz_questions:
-                        # Increment total questions for this type
-                        student_data[student_id][question.question_type]['total'] += 1
-                        
-                        answer = response.responses.get(str(question.id))
-                        if answer is not None:  # Only check if answer was provided
-                            is_correct = self._check_answer_correctness(question, answer)
-                            if is_correct:
-                                student_data[student_id][question.question_type]['correct'] += 1
+            # One streamed query over every classroom of the teacher, narrowed by the optional filters
+            student_responses = StudentResponse.objects.filter(classroom__class_instructor=teacher)
+
+            classroom_id = request.query_params.get('classroom_id')
+            if classroom_id:
+                student_responses = student_responses.filter(classroom_id=classroom_id)
+
+            for param, lookup in (('start_date', 'submitted_at__date__gte'), ('end_date', 'submitted_at__date__lte')):
+                value = request.query_params.get(param)
+                if value:
+                    parsed = parse_date(value)
+                    if parsed is None:
+                        return JsonResponse({
+                            'success': False,
+                            'error': f'Invalid {param}, expected YYYY-MM-DD'
+                        }, status=400)
+                    student_responses = student_responses.filter(**{lookup: parsed})
+
+            def compute():
+                # Per student: [correct, total] for each question type, flattened into one list
+                counters = {}
+                names = {}
+                students = (StudentInfo.objects
+                    .filter(pk__in=student_responses.values('student_id'))
+                    .values_list('id', 'student_info__user__first_name', 'student_info__user__last_name'))
+                for student_id, first_name, last_name in students:
+                    counters[student_id] = [0] * (2 * len(self.QUESTION_TYPES))
+                    names[student_id] = f"{first_name} {last_name}"
+
+                # Every question of a submitted quiz counts, unanswered ones as wrong
+                rows = (ResponseItem.objects
+                    .filter(student_response__in=student_responses)
+                    .values_list('student_response__student_id', 'question_type')
+                    .annotate(total=Count('id'), correct=Count('id', filter=Q(is_correct=True)))
+                    .order_by())
+                for student_id, question_type, total, correct in rows:
+                    if question_type not in self.QUESTION_TYPES or student_id not in counters:
+                        continue
+                    type_index = self.QUESTION_TYPES.index(question_type)
+                    counts = counters[student_id]
+                    counts[2 * type_index] += correct
+                    counts[2 * type_index + 1] += total
             
-            # Convert raw counts to percentages
-            for student_id, data in student_data.items():
-                for q_type in ['single', 'multi', 'identification', 'true_false']:
-                    total_questions = data[q_type]['total']
-                    correct_answers = data[q_type]['correct']
+                # Convert raw counts to percentages
+                student_data = {}
+                for student_id, counts in counters.items():
+                    data = {'name': names[student_id]}
+                    for type_index, q_type in enumerate(self.QUESTION_TYPES):
+                        correct_answers = counts[2 * type_index]
+                        total_questions = counts[2 * type_index + 1]
                     
-                    # Calculate percentage only if there were questions of this type
-                    if total_questions > 0:
-                        percentage = (correct_answers / total_questions) * 100
-                        data[q_type] = round(percentage, 2)
-                    else:
-                        data[q_type] = 0  # No questions of this type attempted
-                
-                # Remove the detailed counts from the response
-                data.pop('total_attempts', None)
+                        # Calculate percentage only if there were questions of this type
+                        if total_questions > 0:
+                            data[q_type] = round((correct_answers / total_questions) * 100, 2)
+                        else:
+                            data[q_type] = 0  # No questions of this type attempted
+                    student_data[student_id] = data
             
+                return student_data
+
+            student_data = cached_result(
+                'student_progress',
+                teacher_scope(teacher.id),
+                {param: request.query_params.get(param) for param in ('classroom_id', 'start_date', 'end_date')},
+                compute
+            )
             return JsonResponse({
                 'success': True,
                 'data': student_data
             })
         except Exception as e:
-            print(f"Error in StudentProgressView: {str(e)}")
+            logger.exception("Error in StudentProgressView")
             return JsonResponse({
                 'success': False,
                 'error': str(e)
             }, status=500)
 
-    def _check_answer_correctness(self, question, answer):
-        if question.question_type == 'single':
-            # Get the correct choice ID
-            correct_choice = question.choices.filter(is_correct=True).first()
-            if correct_choice:
-                return str(answer) == str(correct_choice.id)
-            return False
-        elif question.question_type == 'true_false':
-            return str(answer) == str(question.correct_answer)
-        elif question.question_type == 'multi':
-            correct_choices = question.choices.filter(is_correct=True).values_list('id', flat=True)
-            return set(answer) == set(correct_choices)
-        else:  # identification
-            return answer.lower().strip() == question.correct_answer.lower().strip()
\ No newline at end of file
+
+class AnalyticsCacheStatsView(APIView):
+    permission_classes = [IsAuthenticated]
+    ENDPOINTS = [
+        'question_type_distribution',
+        'question_type_performance',
+        'quiz_statistics',
+        'quiz_time',
+        'knowledge_gap',
+        'student_progress',
+    ]
+
+    def get(self, request):
+        if request.user.role != 'admin' and not request.user.is_staff:
+            return JsonResponse({'error': 'Only administrators can view cache statistics'}, status=403)
+        return JsonResponse(get_cache_stats(self.ENDPOINTS))
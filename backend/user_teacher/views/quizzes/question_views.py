@@ -3,8 +3,13 @@ from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 
+from django.db import transaction
+from django.db.models import Q
+
 from user_teacher.models.quizzes_models import *
 from user_teacher.serializers.quizzes.question_serializers import *
+from user_teacher.grading.answer_key import compile_question_key
+from user_teacher.grading.regrade import enqueue_regrade
 
 class QuestionCreateView(generics.CreateAPIView):
     permission_classes = [IsAuthenticated]
@@ -80,12 +85,18 @@ class QuestionCreateView(generics.CreateAPIView):
                         is_correct=choice_data.get('is_correct', False)
                     )
 
+            # A new question changes every existing submission's total
+            regrade_job = None
+            if StudentResponse.objects.filter(quiz_id=question.quiz_id).exists():
+                regrade_job = enqueue_regrade(question.quiz_id)
+
             # Return the updated question data
             updated_serializer = self.get_serializer(question)
             return Response(
                 {
                     "message": "Question created successfully.",
-                    "question": updated_serializer.data
+                    "question": updated_serializer.data,
+                    "regrade_job": regrade_job.id if regrade_job else None
                 },
                 status=status.HTTP_201_CREATED
             )
@@ -128,54 +139,124 @@ class QuestionDetailView(generics.RetrieveUpdateDestroyAPIView):
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
         instance = self.get_object()
-        serializer = self.get_serializer(instance, data=request.data, partial=partial)
-        serializer.is_valid(raise_exception=True)
-        question = serializer.save()
-        
-        # Handle true/false questions
-        if question.question_type == 'true_false':
-            correct_answer = str(request.data.get('correct_answer', 'false')).lower()
-            question.correct_answer = correct_answer
-            question.save()
-            
-            # Clear any existing choices
-            question.choices.all().delete()
+
+        with transaction.atomic():
+            # Read the old key from the locked row, not the cache, so a concurrent
+            # edit can't make the comparison below miss a change
+            instance = Question.objects.select_for_update().get(pk=instance.pk)
+            previous_key = compile_question_key(Question.objects.prefetch_related('choices').get(pk=instance.pk))
+            serializer = self.get_serializer(instance, data=request.data, partial=partial)
+            serializer.is_valid(raise_exception=True)
+
+            question = serializer.save()
             
-            # Create True and False choices
-            Choice.objects.create(
-                question=question,
-                text='true',
-                is_correct=(correct_answer == 'true')
-            )
-            Choice.objects.create(
-                question=question,
-                text='false',
-                is_correct=(correct_answer == 'false')
-            )
-        else:
-            # Handle choices update if provided
-            choices_data = request.data.get('choices')
-            if choices_data:
-                # Clear existing choices
-                question.choices.all().delete()
-                # Create new choices
-                for choice_data in choices_data:
-                    Choice.objects.create(
-                        question=question,
-                        text=choice_data.get('text'),
-                        is_correct=choice_data.get('is_correct', False)
-                    )
+            # Handle true/false questions
+            if question.question_type == 'true_false':
+                correct_answer = str(request.data.get('correct_answer', 'false')).lower()
+                question.correct_answer = correct_answer
+                question.save()
+                
+                self._sync_choices(question, [
+                    {'text': 'true', 'is_correct': correct_answer == 'true'},
+                    {'text': 'false', 'is_correct': correct_answer == 'false'},
+                ])
+            else:
+                # Handle choices update if provided
+                choices_data = request.data.get('choices')
+                if choices_data:
+                    self._sync_choices(question, choices_data)
+
+            # Existing submissions were graded with the old key; regrade them in the background
+            regrade_job = None
+            if previous_key != compile_question_key(Question.objects.prefetch_related('choices').get(pk=question.pk)):
+                regrade_job = enqueue_regrade(question.quiz_id)
 
         # Get updated data with choices
         updated_serializer = self.get_serializer(question)
         return Response({
             "message": "Question updated successfully",
-            "question": updated_serializer.data
+            "question": updated_serializer.data,
+            "regrade_job": regrade_job.id if regrade_job else None
         }, status=status.HTTP_200_OK)
 
+    def _sync_choices(self, question, choices_data):
+        """
+        Update choices in place so their ids, which student answers refer to, stay stable.
+        Incoming choices match existing ones by id when given, otherwise by exact text;
+        anything else becomes a new choice so old answers never point at different text.
+        """
+        existing = {choice.id: choice for choice in question.choices.order_by('id')}
+        requested_ids = {self._choice_id(choice_data) for choice_data in choices_data}
+        kept = set()
+
+        for choice_data in choices_data:
+            text = choice_data.get('text')
+            is_correct = choice_data.get('is_correct', False)
+
+            choice = existing.get(self._choice_id(choice_data))
+            if choice is None or choice.id in kept:
+                choice = next(
+                    (c for c in existing.values()
+                     if c.id not in kept and c.id not in requested_ids and c.text == text),
+                    None
+                )
+
+            if choice is None:
+                choice = Choice.objects.create(question=question, text=text, is_correct=is_correct)
+            elif choice.text != text or choice.is_correct != is_correct:
+                choice.text = text
+                choice.is_correct = is_correct
+                choice.save()
+            kept.add(choice.id)
+
+        for choice_id, choice in existing.items():
+            if choice_id not in kept:
+                choice.delete()
+
+    @staticmethod
+    def _choice_id(choice_data):
+        try:
+            return int(choice_data.get('id'))
+        except (TypeError, ValueError):
+            return None
+
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
-        self.perform_destroy(instance)
+        with transaction.atomic():
+            self.perform_destroy(instance)
+            # Removing a question changes every submission's total
+            regrade_job = enqueue_regrade(instance.quiz_id)
         return Response({
-            "message": "Question deleted successfully"
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+            "message": "Question deleted successfully",
+            "regrade_job": regrade_job.id
+        }, status=status.HTTP_200_OK)
+
+class RegradeStatusView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, quiz_id):
+        # Only the quiz's author or its classroom instructor may watch its regrades
+        owned = Quiz.objects.filter(
+            Q(created_by__teacher_info__user=request.user) |
+            Q(classroom__class_instructor__teacher_info__user=request.user),
+            pk=quiz_id
+        )
+        if not owned.exists():
+            return Response({"error": "Quiz not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        job = RegradeJob.objects.filter(quiz_id=quiz_id).first()
+        if job is None:
+            return Response({"message": "No regrade has been run for this quiz"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            "id": job.id,
+            "quiz": job.quiz_id,
+            "status": job.status,
+            "total": job.total,
+            "processed": job.processed,
+            "progress": job.progress,
+            "error": job.error,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+        }, status=status.HTTP_200_OK)